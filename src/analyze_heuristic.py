@@ -0,0 +1,264 @@
+"""
+Heuristic quality report. Run it from the repository root, e.g.
+
+    python3 src/analyze_heuristic.py --maps 1 4 5
+    python3 src/analyze_heuristic.py --maps 6 --worst 3 --states map6-states.csv
+    python3 src/analyze_heuristic.py --maps 5 6 --heuristic dependency
+
+For every map, all states reachable from the start are explored and the exact
+cost to the goal, h*, of each one is computed (DistanceTable in
+solver/cluster.py). The heuristic of the chosen solver is evaluated on every
+state and compared with h*:
+
+- error: h* - h over the solvable states, mean and largest overestimate
+- admissibility: solvable states with h > h*, of which "dead" are the states
+  the heuristic rejects with h = inf although the goal can be reached
+- consistency: moves s -> s' of cost c with h(s) > c + h(s'), over every move
+  between reachable states
+- h/h*: mean ratio over the solvable states that are not goals, 1 for a
+  perfect heuristic
+
+The solver then searches the map as usual, which gives its nodes, time and
+solution cost next to the optimum, and the effective branching factor b*:
+the branching factor of a uniform tree of the solution's depth d with as many
+nodes as were expanded, N + 1 = 1 + b* + b*^2 + ... + b*^d.
+
+States that cannot reach the goal have no h*; an h of inf on them is correct
+and they are only counted.
+"""
+
+import argparse
+import csv
+import json
+import time
+
+import maps
+from benchmark import print_table
+from solver import ALGORITHMS, AStarSolver
+from solver.cluster import DistanceTable, cluster_layout
+from solver.heuristics import HEURISTICS
+
+INF = float("inf")
+
+
+def state_board(board, ids, start, state):
+    """The board of a cluster state, by moving the vehicles of `board` (at `start`)."""
+    for vehicle_id, old, new in zip(ids, start, state):
+        if new != old:
+            board = board.apply_move(board.move(vehicle_id, new - old))
+    return board
+
+
+def effective_branching_factor(nodes: int, depth: int, tolerance: float = 1e-6):
+    """b* with nodes + 1 = 1 + b* + ... + b*^depth, by bisection. None for depth 0."""
+    if depth == 0:
+        return None
+    if nodes <= depth:
+        return 1.0
+
+    def tree_size(b):
+        return sum(b ** i for i in range(depth + 1))
+
+    low, high = 1.0, float(nodes)
+    while high - low > tolerance:
+        middle = (low + high) / 2
+        if tree_size(middle) < nodes + 1:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def analyze(
+    board, algorithm: str, heuristic=None, worst: int = 0, states_writer=None, name: str = ""
+):
+    """Compare the heuristic of a solver with h* on every reachable state of a board."""
+    table = DistanceTable(board).build([board])
+    _, ids, start = cluster_layout(board)
+    if heuristic is not None:
+        solver = ALGORITHMS[algorithm](board, heuristic=heuristic)
+    else:
+        solver = ALGORITHMS[algorithm](board)
+    solver.measure_memory = False
+
+    # h of every reachable state
+    h_values = {}
+    heuristic_time = 0.0
+    for state in table.reachable:
+        current = state_board(board, ids, start, state)
+        began = time.perf_counter()
+        h_values[state] = solver._heuristic(current)
+        heuristic_time += time.perf_counter() - began
+
+    errors = []
+    ratios = []
+    overestimates = []
+    dead_but_solvable = 0
+    dead_detected = 0
+    for state, h in h_values.items():
+        h_star = table.costs.get(state)
+        if h_star is None:
+            dead_detected += h == INF
+            continue
+        if h == INF:
+            dead_but_solvable += 1
+            overestimates.append((INF, state))
+            continue
+        errors.append(h_star - h)
+        if h > h_star:
+            overestimates.append((h - h_star, state))
+        if h_star > 0:
+            ratios.append(h / h_star)
+
+    consistency_violations = 0
+    edges = 0
+    for state, h in h_values.items():
+        if h == INF:
+            # an inf h is only inconsistent where the goal is reachable, which
+            # is already an admissibility violation
+            continue
+        for _, _, cost, new_state in table.cluster.successors(state):
+            edges += 1
+            if h > cost + h_values[new_state]:
+                consistency_violations += 1
+
+    if states_writer is not None:
+        for state, h in h_values.items():
+            h_star = table.costs.get(state)
+            states_writer.writerow([
+                name,
+                " ".join(map(str, state)),
+                "inf" if h == INF else h,
+                "" if h_star is None else h_star,
+                "" if h_star is None or h == INF else h_star - h,
+                table.moves.get(state, ""),
+            ])
+
+    solution = solver.solve()
+    optimum = table.costs.get(start)
+    depth = len(solution) if solution is not None else 0
+    solvable = len(table.costs)
+    result = {
+        "states": table.states,
+        "solvable": solvable,
+        "dead_detected": dead_detected,
+        "admissibility_violations": len(overestimates),
+        "dead_but_solvable": dead_but_solvable,
+        "consistency_violations": consistency_violations,
+        "edges": edges,
+        "mean_error": sum(errors) / len(errors) if errors else None,
+        "max_overestimate": max((o for o, _ in overestimates if o != INF), default=0),
+        "mean_ratio": sum(ratios) / len(ratios) if ratios else None,
+        "heuristic_us": heuristic_time / len(h_values) * 1e6 if h_values else 0.0,
+        "nodes": solver.nodes_expanded,
+        "search_time": solver.search_time,
+        "depth": depth,
+        "cost": solver.step_g_costs[-1] if solution is not None else None,
+        "optimal_cost": optimum,
+        "branching_factor": effective_branching_factor(solver.nodes_expanded, depth),
+    }
+
+    # largest overestimates first, boards the heuristic rejects before the others
+    overestimates.sort(key=lambda item: item[0], reverse=True)
+    result["worst"] = [
+        {
+            "h": "inf" if h_values[state] == INF else h_values[state],
+            "h_star": table.costs[state],
+            "board": maps.format_map(state_board(board, ids, start, state)),
+        }
+        for _, state in overestimates[:worst]
+    ]
+    return result
+
+
+def format_number(value, digits: int = 2):
+    if value is None:
+        return "-"
+    return f"{value:.{digits}f}" if isinstance(value, float) else str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare a solver's heuristic with the exact cost to the goal."
+    )
+    parser.add_argument(
+        "--maps", type=int, nargs="+", default=[1, 3, 4, 5], help="map numbers to analyze"
+    )
+    parser.add_argument("--map-file", nargs="+", default=[], help="also analyze these map files")
+    parser.add_argument("--algorithm", default="A*", choices=list(ALGORITHMS))
+    parser.add_argument(
+        "--heuristic", choices=list(HEURISTICS), help="heuristic of A*, ARA* and SMA*"
+    )
+    parser.add_argument(
+        "--worst", type=int, default=0, help="print the N states the heuristic overestimates most"
+    )
+    parser.add_argument("--states", metavar="FILE", help="write h and h* of every state as CSV")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    boards = []
+    for number in args.maps:
+        boards.append((f"map{number}", maps.load_map(number)))
+    for path in args.map_file:
+        boards.append((path, maps.load_map_file(path)))
+    for name, board in boards:
+        if board is None:
+            parser.error(f"{name} does not define any vehicles")
+    if args.heuristic is not None and not issubclass(ALGORITHMS[args.algorithm], AStarSolver):
+        parser.error(f"{args.algorithm} has no heuristic to choose")
+
+    states_file = None
+    states_writer = None
+    if args.states:
+        states_file = open(args.states, "w", newline="")
+        states_writer = csv.writer(states_file)
+        states_writer.writerow(["map", "state", "h", "h_star", "error", "moves_to_goal"])
+
+    results = {}
+    try:
+        for name, board in boards:
+            results[name] = analyze(
+                board, args.algorithm, args.heuristic, args.worst, states_writer, name
+            )
+    finally:
+        if states_file is not None:
+            states_file.close()
+
+    if args.json:
+        print(json.dumps(results, indent=2, default=str))
+        return
+
+    print(f"Heuristic of {args.algorithm}: {args.heuristic or 'default'}")
+    rows = []
+    for name, r in results.items():
+        rows.append([
+            name,
+            r["states"],
+            r["solvable"],
+            f'{r["admissibility_violations"]} ({r["dead_but_solvable"]} dead)',
+            f'{r["consistency_violations"]}/{r["edges"]}',
+            format_number(r["mean_error"]),
+            r["max_overestimate"],
+            format_number(r["mean_ratio"], 3),
+            format_number(r["heuristic_us"], 1),
+            r["nodes"],
+            f'{r["search_time"] * 1000:.1f}',
+            f'{format_number(r["cost"])}/{format_number(r["optimal_cost"])}',
+            format_number(r["branching_factor"], 3),
+        ])
+    print_table(
+        [
+            "map", "states", "solvable", "inadmissible", "inconsistent", "mean h*-h",
+            "max h-h*", "h/h*", "h us", "nodes", "ms", "cost/opt", "b*",
+        ],
+        rows,
+    )
+
+    for name, r in results.items():
+        for i, state in enumerate(r["worst"], 1):
+            print(f"\n{name}, overestimate {i}: h = {state['h']}, h* = {state['h_star']}")
+            print(state["board"], end="")
+
+
+if __name__ == "__main__":
+    main()
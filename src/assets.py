@@ -0,0 +1,297 @@
+"""
+Loading, scaling and baking of the GUI images.
+
+Decoding every PNG/JSON and rescaling them is the slowest part of the GUI
+startup, so the scaled images for the cell sizes used by the maps can be
+baked once into a single packed cache file:
+
+    python3 src/assets.py
+
+The GUI loads the baked images when the cache matches the current asset
+files and falls back to decoding and scaling the originals otherwise.
+
+The cache file holds no code: a magic line, the length of a JSON header,
+the header (the structure of the images, every surface replaced by its
+size and offset) and then the raw RGBA pixels of all surfaces.
+"""
+
+import json
+import os
+import struct
+
+import pygame
+
+from spritesheet import SpriteSheet
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMG_DIR = os.path.join(ROOT_DIR, "assets", "img")
+FONT_DIR = os.path.join(ROOT_DIR, "assets", "fonts")
+CACHE_PATH = os.path.join(ROOT_DIR, "assets", "cache", "images.bin")
+
+# Bump whenever scale_images or the file format changes, older cache files are then ignored
+BAKE_VERSION = 2
+CACHE_MAGIC = b"RUSHHOUR-IMAGES\n"
+# Header length that follows the magic line
+CACHE_HEADER = struct.Struct(">Q")
+# Set to False to always load the original images
+CACHE_ENABLED = True
+
+# Native length of each vehicle sprite group
+SPRITE_LENGTHS = {"red": 2, "L2": 2, "L3": 3}
+
+
+def img_path(name):
+    return os.path.join(IMG_DIR, name)
+
+
+def font_path(name):
+    return os.path.join(FONT_DIR, name)
+
+
+def load_original_images():
+    """Decode all images of the GUI at their original size."""
+    sprites = SpriteSheet(img_path("bk_cars1.a.png"))
+    return {
+        "car_images": {
+            "red": sprites.parse_sprite("red_car-0"),
+            "L2": [
+                sprites.parse_sprite("v2_0-0"),
+                sprites.parse_sprite("v2_0-1"),
+                sprites.parse_sprite("v2_1-0"),
+                sprites.parse_sprite("v2_1-1"),
+                sprites.parse_sprite("v2_2-0"),
+                sprites.parse_sprite("v2_2-1"),
+                sprites.parse_sprite("v2_2-2"),
+            ],
+            "L3": [
+                sprites.parse_sprite("v3_0-0"),
+                sprites.parse_sprite("v3_1-0"),
+                sprites.parse_sprite("v3_2-0"),
+            ],
+        },
+        "road": SpriteSheet(img_path("Road_01_Tile_05.png")).parse_sprite("road-0"),
+        "border": SpriteSheet(img_path("Road_Side_02.png")).parse_sprite("border-0"),
+        "corner": SpriteSheet(img_path("Road_Round_Corner.png")).parse_sprite("corner-0"),
+        "grass": SpriteSheet(img_path("Grass_Tile.png")).parse_sprite("grass-0"),
+        "logo": pygame.image.load(img_path("logo.png")),
+        "bar": pygame.image.load(img_path("Table.png")),
+        "left_arrow": SpriteSheet(img_path("Left.png")).parse_sprite("left-0"),
+        "right_arrow": SpriteSheet(img_path("Right.png")).parse_sprite("right-0"),
+        "finished_image": pygame.image.load(img_path("Finish.png")),
+        "measurements_box": pygame.image.load(img_path("Window.png")),
+        "play_btn": pygame.image.load(img_path("Play_BTN.png")),
+        "pause_btn": pygame.image.load(img_path("Pause_BTN.png")),
+        "replay_btn": pygame.image.load(img_path("Replay_BTN.png")),
+        "speedup_btn": pygame.image.load(img_path("SpeedUp_BTN.png")),
+    }
+
+
+def scale_vehicle_sprite(image, length, orientation, cell_size):
+    """Scale a (vertical) vehicle sprite to its length and rotate it if horizontal."""
+    scaled_image = pygame.transform.scale(image, (cell_size, cell_size * length))
+    if orientation == "H":
+        scaled_image = pygame.transform.rotate(scaled_image, -90)
+    return scaled_image
+
+
+def scale_images(originals, cell_size):
+    """Return every image of the GUI scaled for the given cell_size."""
+    border_scale_factor = (cell_size, cell_size / 6)
+    border = pygame.transform.scale(originals["border"], border_scale_factor)
+    logo = originals["logo"]
+    arrow_size = (cell_size // 2, cell_size // 2)
+
+    images = {
+        # The vehicle originals are kept for sprites that are not pre-scaled
+        "car_images": originals["car_images"],
+        "road_images": {
+            "road": pygame.transform.scale(originals["road"], (cell_size, cell_size)),
+            "border": border,
+            "corner": pygame.transform.scale(
+                originals["corner"],
+                (border_scale_factor[1] + 5, border_scale_factor[1] + 5),
+            ),
+            # Rotated borders are reused on every frame
+            "border_right": pygame.transform.rotate(border, -90),
+            "border_bottom": pygame.transform.rotate(border, 180),
+            "border_left": pygame.transform.rotate(border, 90),
+        },
+        "grass_image": pygame.transform.scale(originals["grass"], (cell_size, cell_size)),
+        "logo": pygame.transform.scale(
+            logo, (logo.get_width() // 3, logo.get_height() // 3)
+        ),
+        "bar": pygame.transform.scale(originals["bar"], (cell_size * 3, cell_size)),
+        "left_arrow": pygame.transform.scale(originals["left_arrow"], arrow_size),
+        "right_arrow": pygame.transform.scale(originals["right_arrow"], arrow_size),
+        "finished_image": pygame.transform.scale(
+            originals["finished_image"], (cell_size, cell_size // 2)
+        ),
+        "measurements_box": pygame.transform.scale(
+            originals["measurements_box"], (cell_size * 3, cell_size * 4)
+        ),
+        "play_btn": pygame.transform.scale(originals["play_btn"], (cell_size, cell_size)),
+        "pause_btn": pygame.transform.scale(originals["pause_btn"], (cell_size, cell_size)),
+        "replay_btn": pygame.transform.scale(originals["replay_btn"], (cell_size, cell_size)),
+        "speedup_btn": pygame.transform.scale(
+            originals["speedup_btn"], (cell_size, cell_size)
+        ),
+        # Keyed like GUI.sprite_cache without the cell_size
+        "vehicle_sprites": {},
+    }
+
+    car_images = originals["car_images"]
+    for group, length in SPRITE_LENGTHS.items():
+        group_images = [car_images[group]] if group == "red" else car_images[group]
+        for index, image in enumerate(group_images):
+            for orientation in ("H", "V"):
+                key = ((group, index), length, orientation)
+                images["vehicle_sprites"][key] = scale_vehicle_sprite(
+                    image, length, orientation, cell_size
+                )
+    return images
+
+
+def _source_signature():
+    """Size and modification time of every asset file, used to detect a stale cache."""
+    signature = {}
+    for name in sorted(os.listdir(IMG_DIR)):
+        stat = os.stat(img_path(name))
+        signature[name] = [stat.st_size, stat.st_mtime_ns]
+    return signature
+
+
+def _pack(value, pixels):
+    # Surfaces go to the pixel buffer, containers are packed recursively.
+    # Dicts become [key, value] pairs, as JSON only has string keys.
+    if isinstance(value, pygame.Surface):
+        data = pygame.image.tobytes(value, "RGBA")
+        offset = sum(map(len, pixels))
+        pixels.append(data)
+        return {"surface": [offset, *value.get_size()]}
+    if isinstance(value, dict):
+        return {"dict": [[key, _pack(item, pixels)] for key, item in value.items()]}
+    if isinstance(value, list):
+        return {"list": [_pack(item, pixels) for item in value]}
+    return value
+
+
+def _key(value):
+    # Tuple keys (vehicle sprites) come back from JSON as lists
+    return tuple(map(_key, value)) if isinstance(value, list) else value
+
+
+def _unpack(value, pixels, convert):
+    if not isinstance(value, dict):
+        return value
+    if "surface" in value:
+        offset, width, height = value["surface"]
+        end = offset + width * height * 4
+        if end > len(pixels):
+            raise ValueError("truncated cache file")
+        surface = pygame.image.frombytes(pixels[offset:end], (width, height), "RGBA")
+        return surface.convert_alpha() if convert else surface
+    if "dict" in value:
+        return {_key(key): _unpack(item, pixels, convert) for key, item in value["dict"]}
+    return [_unpack(item, pixels, convert) for item in value["list"]]
+
+
+def bake(cell_sizes, path=CACHE_PATH):
+    """Scale the images for every cell size and write them into one cache file."""
+    originals = load_original_images()
+    pixels = []
+    header = {
+        "version": BAKE_VERSION,
+        "sources": _source_signature(),
+        "cell_sizes": [
+            [cell_size, _pack(scale_images(originals, cell_size), pixels)]
+            for cell_size in cell_sizes
+        ],
+    }
+    header = json.dumps(header).encode()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(CACHE_MAGIC)
+        f.write(CACHE_HEADER.pack(len(header)))
+        f.write(header)
+        for data in pixels:
+            f.write(data)
+    _loaded.clear()
+
+
+# (path, cell_size, convert) -> images decoded from the cache file, so a
+# rescale back to a cell size already seen does not read the file again
+_loaded = {}
+
+
+def _read_cache(path):
+    """The header and pixel buffer of a cache file, None if it is not one of ours."""
+    with open(path, "rb") as f:
+        if f.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+            return None
+        (header_size,) = CACHE_HEADER.unpack(f.read(CACHE_HEADER.size))
+        header = json.loads(f.read(header_size))
+        return header, f.read()
+
+
+def load_baked(cell_size, path=CACHE_PATH):
+    """
+    Return the baked images for a cell size, or None if there is no cache,
+    it is stale or it does not contain that cell size. The images of a cell
+    size are decoded once and kept in memory.
+    """
+    if not CACHE_ENABLED:
+        return None
+    convert = pygame.display.get_surface() is not None
+    key = (path, cell_size, convert)
+    if key in _loaded:
+        return _loaded[key]
+
+    images = None
+    try:
+        cache = _read_cache(path)
+        if cache is not None:
+            header, pixels = cache
+            if (
+                header.get("version") == BAKE_VERSION
+                and header.get("sources") == _source_signature()
+            ):
+                for baked_size, packed in header["cell_sizes"]:
+                    if baked_size == cell_size:
+                        images = _unpack(packed, pixels, convert)
+                        break
+    except (OSError, struct.error, ValueError, KeyError, TypeError):
+        # missing, truncated or foreign files are treated as no cache
+        images = None
+    _loaded[key] = images
+    return images
+
+
+def map_cell_sizes(screen_size):
+    """Cell sizes the GUI uses for the bundled maps."""
+    import maps
+
+    cell_sizes = set()
+    for map_number in range(1, maps.MAX_MAPS + 1):
+        board = maps.load_map(map_number)
+        if board is not None:
+            # same as GUI.set_board
+            cell_sizes.add(min(screen_size) // (max(board.width, board.height) + 4))
+    return sorted(cell_sizes)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    parser = argparse.ArgumentParser(description="Bake the scaled GUI images into a cache file.")
+    parser.add_argument("--cell-sizes", type=int, nargs="+", help="defaults to the sizes used by the maps")
+    parser.add_argument("--output", default=CACHE_PATH)
+    args = parser.parse_args()
+
+    pygame.display.init()
+    # SpriteSheet converts its images, which needs a display surface
+    pygame.display.set_mode((1, 1))
+    cell_sizes = args.cell_sizes or map_cell_sizes((1000, 800))
+    bake(cell_sizes, args.output)
+    print(f"Baked images for cell sizes {cell_sizes} into {args.output}")
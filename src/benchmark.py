@@ -0,0 +1,447 @@
+"""
+Benchmark suite. Run from the repository root, e.g.
+
+    python3 src/benchmark.py startup --record benchmarks.jsonl
+    python3 src/benchmark.py queue --maps 1 4 5
+    python3 src/benchmark.py scaling --sizes 6 7 8 --densities 0.3 0.5
+    python3 src/benchmark.py nodes --maps 5 6
+    python3 src/benchmark.py cluster --maps 4 5 10 --puzzles 20
+    python3 src/benchmark.py heuristic --maps 4 5 6 10
+
+Every benchmark prints a table; with --record the results are appended as
+one JSON line to the given file so they can be tracked over time.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(SRC_DIR)
+
+
+def print_table(headers, rows):
+    widths = [
+        max(len(str(value)) for value in [header] + [row[i] for row in rows])
+        for i, header in enumerate(headers)
+    ]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)).rstrip())
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(str(v).ljust(w) for v, w in zip(row, widths)).rstrip())
+
+
+def record(path, benchmark, results):
+    with open(path, "a") as f:
+        f.write(json.dumps({"benchmark": benchmark, "timestamp": time.time(), "results": results}) + "\n")
+
+
+# --- startup ---
+
+# Each scenario runs in a fresh interpreter, the code is timed from inside it
+STARTUP_SCENARIOS = {
+    "import solver": "import maps, solver",
+    "solve.py startup": "import solve",
+    "load map + solver": "import maps, solver; solver.ALGORITHMS['A*'](maps.load_map(1))",
+    "import gui": "import gui",
+    "gui first frame": (
+        "import os; os.environ['SDL_VIDEODRIVER'] = 'dummy'; "
+        "import gui, maps; g = gui.GUI(maps.load_map(1)); g.draw_scene()"
+    ),
+    "gui first frame (no cache)": (
+        "import os; os.environ['SDL_VIDEODRIVER'] = 'dummy'; "
+        "import assets; assets.CACHE_ENABLED = False; "
+        "import gui, maps; g = gui.GUI(maps.load_map(1)); g.draw_scene()"
+    ),
+}
+
+# Run once before a scenario, untimed: the cached first frame needs a baked
+# image cache, or it silently measures the uncached path
+STARTUP_SETUP = {
+    "gui first frame": [sys.executable, os.path.join(SRC_DIR, "assets.py")],
+}
+
+STARTUP_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start, 'pygame' in sys.modules)
+"""
+
+
+def run_startup_scenario(code):
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_SNIPPET.format(code=code)],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall_time = time.perf_counter() - start
+    if result.returncode != 0:
+        return None
+    # the last line is ours, the GUI prints a few lines before it
+    elapsed, pygame_loaded = result.stdout.strip().splitlines()[-1].split()
+    return float(elapsed), wall_time, pygame_loaded == "True"
+
+
+def bench_startup(args):
+    results = {}
+    rows = []
+    for name, code in STARTUP_SCENARIOS.items():
+        setup = STARTUP_SETUP.get(name)
+        if setup is not None:
+            baked = subprocess.run(setup, cwd=ROOT_DIR, capture_output=True)
+            if baked.returncode != 0:
+                rows.append([name, "failed", "", ""])
+                continue
+        runs = [run_startup_scenario(code) for _ in range(args.repeat)]
+        if any(run is None for run in runs):
+            rows.append([name, "failed", "", ""])
+            continue
+        in_process = statistics.median(run[0] for run in runs) * 1000
+        wall = statistics.median(run[1] for run in runs) * 1000
+        results[name] = {"time_ms": in_process, "process_ms": wall, "imports_pygame": runs[0][2]}
+        rows.append([name, f"{in_process:.1f}", f"{wall:.1f}", runs[0][2]])
+
+    print_table(["scenario", "time (ms)", "process (ms)", "pygame imported"], rows)
+    return results
+
+
+# --- queue ---
+
+QUEUE_SOLVERS = ("UCS", "A*")
+
+
+def time_queue_operations(queue_class, operations, seed=0):
+    """Push/pop a synthetic search-like workload: priorities never drop below the last pop."""
+    rng = random.Random(seed)
+    queue = queue_class()
+    start = time.perf_counter()
+    floor = 0
+    for i in range(operations):
+        queue.push(floor + rng.randrange(12), rng.randrange(operations // 4), i, tie=i)
+        if i % 3 == 2:
+            floor = queue.pop()[0]
+    while queue:
+        queue.pop()
+    return time.perf_counter() - start
+
+
+def bench_queue(args):
+    import maps
+    from solver import ALGORITHMS
+    from solver.priority_queue import QUEUES
+
+    results = {"operations": {}, "solvers": {}}
+    rows = []
+    for name, queue_class in QUEUES.items():
+        elapsed = min(time_queue_operations(queue_class, args.operations) for _ in range(3))
+        results["operations"][name] = {"time_ms": elapsed * 1000}
+        rows.append([name, args.operations, f"{elapsed * 1000:.1f}"])
+    print_table(["queue", "operations", "time (ms)"], rows)
+    print()
+
+    rows = []
+    for map_number in args.maps:
+        for algorithm in QUEUE_SOLVERS:
+            for name in QUEUES:
+                solver = ALGORITHMS[algorithm](maps.load_map(map_number), queue=name)
+                solution = solver.solve()
+                stats = solver.get_stats()
+                cost = solver.step_g_costs[-1] if solution else None
+                results["solvers"][f"map{map_number}/{algorithm}/{name}"] = dict(stats, cost=cost)
+                rows.append([
+                    map_number,
+                    algorithm,
+                    name,
+                    cost,
+                    stats["nodes_expanded"],
+                    f"{stats['search_time'] * 1000:.1f}",
+                    f"{stats['memory_usage']:.1f}",
+                ])
+    print_table(["map", "algorithm", "queue", "cost", "nodes", "time (ms)", "memory (KB)"], rows)
+    return results
+
+
+# --- scaling ---
+
+
+def solve_random_board(algorithm, size, density, seed):
+    import maps
+    from solver import ALGORITHMS
+    from solver.pruning import DeadStatePruner
+
+    # boards that are provably unsolvable are skipped, they take no search at all
+    attempt = 0
+    while True:
+        board = maps.random_board(size, size, density, f"{seed}-{attempt}")
+        if not DeadStatePruner(board).is_dead(board):
+            break
+        attempt += 1
+    solver = ALGORITHMS[algorithm](board)
+    solution = solver.solve()
+    return len(board.vehicles), solution is not None, solver.get_stats()
+
+
+def bench_scaling(args):
+    """Time and memory of every solver as the board size and vehicle density grow."""
+    results = {}
+    rows = []
+    for size in args.sizes:
+        for density in args.densities:
+            for algorithm in args.algorithms:
+                runs = []
+                for seed in range(args.seeds):
+                    # every solve runs in its own process so it can be stopped
+                    with multiprocessing.Pool(1) as pool:
+                        job = pool.apply_async(solve_random_board, (algorithm, size, density, seed))
+                        try:
+                            runs.append(job.get(args.timeout))
+                        except multiprocessing.TimeoutError:
+                            runs.append(None)
+
+                finished = [run for run in runs if run is not None]
+                name = f"{size}x{size}/{density}/{algorithm}"
+                results[name] = {
+                    "boards": len(runs),
+                    "timeouts": len(runs) - len(finished),
+                    "solved": sum(run[1] for run in finished),
+                }
+                row = [f"{size}x{size}", density, algorithm, len(runs) - len(finished)]
+                if finished:
+                    time_ms = statistics.median(run[2]["search_time"] for run in finished) * 1000
+                    memory = statistics.median(run[2]["memory_usage"] for run in finished)
+                    nodes = statistics.median(run[2]["nodes_expanded"] for run in finished)
+                    vehicles = statistics.median(run[0] for run in finished)
+                    results[name].update(
+                        time_ms=time_ms, memory_kb=memory, nodes_expanded=nodes, vehicles=vehicles
+                    )
+                    row += [
+                        results[name]["solved"],
+                        vehicles,
+                        nodes,
+                        f"{time_ms:.1f}",
+                        f"{memory:.1f}",
+                    ]
+                else:
+                    row += ["", "", "", "", ""]
+                rows.append(row)
+
+    headers = ["board", "density", "algorithm", "timeouts", "solved", "vehicles", "nodes"]
+    print_table(headers + ["time (ms)", "memory (KB)"], rows)
+    return results
+
+
+# --- nodes ---
+
+
+def expand_states(board, limit):
+    """Breadth-first expansion that keeps every reached board, like a solver's visited set."""
+    from solver.canonical import Canonicalizer
+
+    state_key = Canonicalizer(board).key
+    boards = {state_key(board): board}
+    queue = deque([board])
+    expansions = 0
+    while queue and len(boards) < limit:
+        current = queue.popleft()
+        expansions += 1
+        for move in current.get_possible_moves():
+            new_board = current.apply_move(move)
+            key = state_key(new_board)
+            if key not in boards:
+                boards[key] = new_board
+                queue.append(new_board)
+    return boards, expansions
+
+
+def bench_nodes(args):
+    """Memory per stored search node and time per node expansion."""
+    import maps
+
+    results = {}
+    rows = []
+    for map_number in args.maps:
+        board = maps.load_map(map_number)
+
+        start = time.perf_counter()
+        boards, expansions = expand_states(board, args.limit)
+        elapsed = time.perf_counter() - start
+        del boards
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        boards, _ = expand_states(board, args.limit)
+        stored = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+
+        bytes_per_node = stored / len(boards)
+        us_per_expansion = elapsed / expansions * 1e6
+        results[f"map{map_number}"] = {
+            "nodes": len(boards),
+            "bytes_per_node": bytes_per_node,
+            "us_per_expansion": us_per_expansion,
+        }
+        rows.append([map_number, len(boards), f"{bytes_per_node:.0f}", f"{us_per_expansion:.1f}"])
+
+    print_table(["map", "nodes", "bytes/node", "us/expansion"], rows)
+    return results
+
+
+# --- cluster ---
+
+
+def random_walk_boards(board, count, steps, seed=0):
+    """Puzzles of the same cluster as board, reached by random moves from it."""
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(count):
+        current = board
+        for _ in range(steps):
+            current = current.apply_move(rng.choice(current.get_possible_moves()))
+        boards.append(current)
+    return boards
+
+
+def bench_cluster(args):
+    """Batch solving by cluster vs one UCS search per puzzle."""
+    import maps
+    from solver import UCSSolver
+    from solver.cluster import ClusterSolver
+
+    corpus = []
+    for map_number in args.maps:
+        corpus += random_walk_boards(maps.load_map(map_number), args.puzzles, args.steps)
+
+    start = time.perf_counter()
+    costs = []
+    for board in corpus:
+        solver = UCSSolver(board)
+        solver.measure_memory = False
+        solution = solver.solve()
+        costs.append(solver.step_g_costs[-1] if solution is not None else None)
+    per_puzzle = time.perf_counter() - start
+
+    batch = ClusterSolver(corpus)
+    results = batch.solve()
+    stats = batch.get_stats()
+    if [result["min_cost"] for result in results] != costs:
+        print("warning: the batch costs differ from UCS")
+
+    batch_time = stats["search_time"]
+    rows = [
+        ["UCS per puzzle", len(corpus), "", f"{per_puzzle:.2f}", f"{per_puzzle / len(corpus) * 1000:.1f}"],
+        ["cluster batch", len(corpus), stats["clusters"], f"{batch_time:.2f}", f"{batch_time / len(corpus) * 1000:.1f}"],
+    ]
+    print_table(["method", "puzzles", "clusters", "time (s)", "ms/puzzle"], rows)
+    return {
+        "puzzles": len(corpus),
+        "clusters": stats["clusters"],
+        "states_explored": stats["states_explored"],
+        "per_puzzle_s": per_puzzle,
+        "batch_s": stats["search_time"],
+    }
+
+
+# --- heuristic ---
+
+
+def bench_heuristic(args):
+    """Nodes and time of A* with each heuristic, and the time of one evaluation."""
+    import maps
+    from solver import AStarSolver
+
+    results = {}
+    rows = []
+    for map_number in args.maps:
+        board = maps.load_map(map_number)
+        sample = random_walk_boards(board, args.samples, 20)
+        for heuristic in args.heuristics:
+            solver = AStarSolver(board, heuristic=heuristic)
+            solver.measure_memory = False
+            solution = solver.solve()
+            cost = solver.step_g_costs[-1] if solution else None
+
+            start = time.perf_counter()
+            for sample_board in sample:
+                solver._heuristic(sample_board)
+            per_call = (time.perf_counter() - start) / len(sample)
+
+            results[f"map{map_number}/{heuristic}"] = {
+                "cost": cost,
+                "nodes_expanded": solver.nodes_expanded,
+                "search_time": solver.search_time,
+                "heuristic_us": per_call * 1e6,
+            }
+            rows.append([
+                map_number,
+                heuristic,
+                cost,
+                solver.nodes_expanded,
+                f"{solver.search_time * 1000:.1f}",
+                f"{per_call * 1e6:.1f}",
+            ])
+    print_table(["map", "heuristic", "cost", "nodes", "time (ms)", "h (us)"], rows)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rush Hour solver benchmarks.")
+    parser.add_argument("--record", metavar="FILE", help="append the results as a JSON line to FILE")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    startup = subparsers.add_parser("startup", help="import and startup time")
+    startup.add_argument("--repeat", type=int, default=5)
+    startup.set_defaults(func=bench_startup)
+
+    queue = subparsers.add_parser("queue", help="bucket vs heap priority queue in UCS and A*")
+    queue.add_argument("--maps", type=int, nargs="+", default=[1, 3, 4, 5])
+    queue.add_argument("--operations", type=int, default=200_000)
+    queue.set_defaults(func=bench_queue)
+
+    scaling = subparsers.add_parser("scaling", help="solvers on random boards of growing size")
+    scaling.add_argument("--sizes", type=int, nargs="+", default=[5, 6, 7])
+    scaling.add_argument("--densities", type=float, nargs="+", default=[0.3, 0.5])
+    scaling.add_argument("--algorithms", nargs="+", default=["BFS", "UCS", "A*", "IDS"])
+    scaling.add_argument("--seeds", type=int, default=3, help="random boards per configuration")
+    scaling.add_argument("--timeout", type=float, default=30.0, help="seconds per solve")
+    scaling.set_defaults(func=bench_scaling)
+
+    nodes = subparsers.add_parser("nodes", help="memory per search node and expansion time")
+    nodes.add_argument("--maps", type=int, nargs="+", default=[4, 5, 6])
+    nodes.add_argument("--limit", type=int, default=20_000, help="nodes kept per map")
+    nodes.set_defaults(func=bench_nodes)
+
+    cluster = subparsers.add_parser("cluster", help="batch solving by cluster vs one search each")
+    cluster.add_argument("--maps", type=int, nargs="+", default=[4, 5, 10])
+    cluster.add_argument("--puzzles", type=int, default=20, help="puzzles per map")
+    cluster.add_argument("--steps", type=int, default=30, help="random moves from the map per puzzle")
+    cluster.set_defaults(func=bench_cluster)
+
+    heuristic = subparsers.add_parser("heuristic", help="A* with each heuristic")
+    heuristic.add_argument("--maps", type=int, nargs="+", default=[4, 5, 6, 10])
+    heuristic.add_argument(
+        "--heuristics", nargs="+", default=["legacy", "blockers", "dependency", "max"]
+    )
+    heuristic.add_argument("--samples", type=int, default=200, help="boards per map timing h")
+    heuristic.set_defaults(func=bench_heuristic)
+
+    args = parser.parse_args()
+    results = args.func(args)
+    if args.record:
+        record(args.record, args.benchmark, results)
+
+
+if __name__ == "__main__":
+    main()
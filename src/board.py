@@ -1,8 +1,11 @@
 from vehicle import Vehicle
 from move import Move
-import copy
 
 class Board:
+    # boards derived by apply_move share the unmoved vehicles and the
+    # per-puzzle tables (_index, _moves) with the board they come from
+    __slots__ = ("width", "height", "vehicles", "_index", "_moves")
+
     def __init__(self, width, height, vehicles):
         if not isinstance(width, int) or width <= 0:
             raise ValueError("Width must be a positive integer.")
@@ -18,6 +21,11 @@ class Board:
 
         self._validate_vehicles()
 
+        # vehicle id -> index in vehicles, the same for every board of the puzzle
+        self._index = {v.id: i for i, v in enumerate(vehicles)}
+        # (vehicle id, amount) -> interned Move instance
+        self._moves = {}
+
     def _validate_vehicles(self):
         grid = [['.' for _ in range(self.width)] for _ in range(self.height)]
         for v in self.vehicles:
@@ -55,41 +63,57 @@ class Board:
                 # Move right
                 for i in range(1, self.width):
                     if vehicle.x + vehicle.length + i - 1 < self.width and grid[vehicle.y][vehicle.x + vehicle.length + i - 1] == '.':
-                        moves.append(Move(vehicle.id, i))
+                        moves.append(self.move(vehicle.id, i))
                     else:
                         break
                 # Move left
                 for i in range(1, self.width):
                     if vehicle.x - i >= 0 and grid[vehicle.y][vehicle.x - i] == '.':
-                        moves.append(Move(vehicle.id, -i))
+                        moves.append(self.move(vehicle.id, -i))
                     else:
                         break
             else:  # 'V'
                 # Move down
                 for i in range(1, self.height):
                     if vehicle.y + vehicle.length + i - 1 < self.height and grid[vehicle.y + vehicle.length + i - 1][vehicle.x] == '.':
-                        moves.append(Move(vehicle.id, i))
+                        moves.append(self.move(vehicle.id, i))
                     else:
                         break
                 # Move up
                 for i in range(1, self.height):
                     if vehicle.y - i >= 0 and grid[vehicle.y - i][vehicle.x] == '.':
-                        moves.append(Move(vehicle.id, -i))
+                        moves.append(self.move(vehicle.id, -i))
                     else:
                         break
         return moves
 
+    def vehicle(self, vehicle_id):
+        """The vehicle with the given id."""
+        return self.vehicles[self._index[vehicle_id]]
+
+    def move(self, vehicle_id, amount):
+        """The Move of a vehicle by `amount` cells, one shared instance per move."""
+        key = (vehicle_id, amount)
+        move = self._moves.get(key)
+        if move is None:
+            move = Move(vehicle_id, amount)
+            self._moves[key] = move
+        return move
+
     def apply_move(self, move: Move):
-        # deep copying the vehicles.
-        new_vehicles = copy.deepcopy(self.vehicles)
-        for vehicle in new_vehicles:
-            if vehicle.id == move.vehicle_id:
-                if vehicle.orientation == 'H':
-                    vehicle.x += move.amount
-                else:
-                    vehicle.y += move.amount
-                break
-        return Board(self.width, self.height, new_vehicles)
+        # only the moved vehicle is copied, the move is trusted to come from
+        # get_possible_moves so the new board is not validated again
+        i = self._index[move.vehicle_id]
+        new_vehicles = list(self.vehicles)
+        new_vehicles[i] = new_vehicles[i].moved(move.amount)
+
+        board = Board.__new__(Board)
+        board.width = self.width
+        board.height = self.height
+        board.vehicles = new_vehicles
+        board._index = self._index
+        board._moves = self._moves
+        return board
 
     def apply_moves(self, moves: list[Move]):
         board = self
@@ -0,0 +1,163 @@
+"""
+Headless export of solution animations.
+
+Renders every step of a solution with the same drawing code as the GUI, but
+into an off-screen surface using SDL's dummy video driver, so it runs on
+servers without a display. For example:
+
+    python3 src/export.py --maps 1 4 8 --algorithm "A*" --gif --processes 4
+"""
+
+import os
+
+# Must be set before pygame initializes its display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+# SDL's own SIGTERM handler would keep the pool from stopping its workers
+os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
+
+import argparse
+import time
+from multiprocessing import Pool
+
+import pygame
+
+from vehicle import Vehicle
+from board import Board
+from gui import GUI
+from timeline import Timeline
+from solver import ALGORITHMS
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is only needed for animated images
+    Image = None
+
+
+# One renderer per worker process, created on first use
+_renderer = None
+
+
+def get_renderer():
+    global _renderer
+    if _renderer is None:
+        placeholder = Board(6, 6, [Vehicle("R", 0, 2, 2, "H")])
+        _renderer = GUI(placeholder)
+    return _renderer
+
+
+def render_step(renderer, board):
+    """Render a board off-screen and return the surface cropped around the road."""
+    renderer.board = board
+    renderer.screen = pygame.Surface(renderer.screen_size)
+    renderer._ensure_images()
+    renderer.draw_background()
+    renderer.draw_road()
+    renderer.draw_red_car_tracker()
+    renderer.draw_vehicles()
+
+    # Keep the road and its borders only
+    margin = int(renderer.border_scale_factor[1]) + 5
+    area = pygame.Rect(
+        renderer.grid_offset[0] - margin,
+        renderer.grid_offset[1] - margin,
+        renderer.grid_width + margin * 2,
+        renderer.grid_height + margin * 2,
+    )
+    return renderer.screen.subsurface(area).copy()
+
+
+def export_solution(map_number, algorithm, output_dir, gif=False, frame_duration=500):
+    """
+    Solve a map and write one PNG per solution step (and optionally an
+    animated GIF) into output_dir. Returns a small summary dictionary.
+    """
+    renderer = get_renderer()
+    renderer.load_map(map_number)
+    renderer.set_board(renderer.current_board)
+    renderer.selected_algorithm = algorithm
+
+    solver = renderer.create_solver()
+    if solver is None:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+    solution = solver.solve()
+
+    summary = {"map": map_number, "algorithm": algorithm, "frames": 0, "output": None}
+    if not solution:
+        return summary
+
+    timeline = Timeline(renderer.current_board, solution)
+    name = f"map{map_number:02d}_{algorithm.replace('*', '-star')}"
+    frames_dir = os.path.join(output_dir, name)
+    os.makedirs(frames_dir, exist_ok=True)
+
+    images = []
+    for step in range(len(timeline)):
+        frame = render_step(renderer, timeline.board_at(step))
+        pygame.image.save(frame, os.path.join(frames_dir, f"step_{step:03d}.png"))
+        if gif:
+            images.append(
+                Image.frombytes(
+                    "RGBA", frame.get_size(), pygame.image.tobytes(frame, "RGBA")
+                )
+            )
+
+    summary["frames"] = len(timeline)
+    summary["output"] = frames_dir
+    if gif:
+        gif_path = os.path.join(output_dir, f"{name}.gif")
+        images[0].save(
+            gif_path,
+            save_all=True,
+            append_images=images[1:],
+            duration=frame_duration,
+            loop=0,
+        )
+        summary["output"] = gif_path
+    return summary
+
+
+def _export_job(job):
+    return export_solution(*job)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export solution animations without a display.")
+    parser.add_argument("--maps", type=int, nargs="+", default=list(range(1, 11)))
+    parser.add_argument("--algorithm", default="A*", choices=list(ALGORITHMS))
+    parser.add_argument("--output", default="exports")
+    parser.add_argument("--gif", action="store_true", help="also write an animated GIF (needs Pillow)")
+    parser.add_argument("--frame-duration", type=int, default=500, help="milliseconds per GIF frame")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    if args.gif and Image is None:
+        parser.error("--gif requires Pillow (pip install pillow)")
+
+    jobs = [
+        (map_number, args.algorithm, args.output, args.gif, args.frame_duration)
+        for map_number in args.maps
+    ]
+
+    start_time = time.time()
+    # Every puzzle is rendered by its own worker process
+    pool = Pool(processes=min(args.processes, len(jobs)))
+    try:
+        for summary in pool.imap_unordered(_export_job, jobs):
+            if summary["frames"]:
+                print(f"Map {summary['map']}: {summary['frames']} frames -> {summary['output']}")
+            else:
+                print(f"Map {summary['map']}: no solution, nothing exported")
+        # workers exit on their own once the jobs are done; terminate() is
+        # only a fallback after an error
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    print(f"Exported {len(jobs)} map(s) in {time.time() - start_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,29 @@
 import pygame
 import time
 import copy
+import math
 import os
+import threading
 from vehicle import Vehicle
 from board import Board
-from spritesheet import SpriteSheet
-from solver import UCSSolver, BFSSolver, DFSSolver, IDSSolver, AStarSolver
+import assets
+from timeline import Timeline
+from solver import ALGORITHMS
+from solver.cluster import DistanceTable, cluster_layout
+import maps
+
+# Posted by the background solver thread whenever it has something to show
+SOLVER_EVENT = pygame.USEREVENT + 1
+# Posted by the background thread that computes the distance table of hint mode
+HINT_EVENT = pygame.USEREVENT + 2
+
+# Algorithms whose solutions are shown with their cost, and with g and h
+COST_ALGORITHMS = ("UCS", "A*", "SMA*", "ARA*")
+HEURISTIC_ALGORITHMS = ("A*", "SMA*", "ARA*")
 
 
 class GUI:
-    def __init__(self, board):
+    def __init__(self, board, event_driven=True):
         pygame.init()
         self.screen_size = (1000, 800)
         self.screen = pygame.display.set_mode(self.screen_size)
@@ -19,34 +33,58 @@ class GUI:
         self.original_board = copy.deepcopy(board)
         self.current_solution = None
         self.animation_moves = []
+        self.timeline = None  # Precomputed states of the current solution
         self.current_move_index = 0
         self.is_playing = False
         self.is_paused = False
         self.is_solving = False
+        self.is_improving = False  # An anytime solver is still improving the solution
         self.animation_finished = False
         self.solution_found = False
         self.last_move_time = 0
         self.move_duration = 1000  # milliseconds (use as animation speed)
         self.solver_stats = None
+        self.solve_request = 0  # Identifies the latest background solve
+        self.solver = None  # Solver running in the background, if any
+        self.solver_thread = None
+
+        # Rendering: in event-driven mode the loop sleeps until something changes
+        self.event_driven = event_driven
+        self.needs_redraw = True
 
         # Speed control for animation
         self.animation_speed = 1  
         self.max_speed = 4
+        self.min_speed = 0.25  # Lower bound for the +/- speed keys
+        self.fine_max_speed = 64  # Upper bound for the +/- speed keys
 
         # Cost tracking for UCS and A*
         self.total_cost = 0  # Total cost of the solution
         self.current_cost = 0  # Current cost during animation
         self.current_h_cost = 0  # Current heuristic cost for A*
         self.current_g_cost = 0  # Current g cost for A*
+        self.step_g_costs = []  # Cumulative g after each move (from the solver)
+        self.step_h_costs = []  # h after each move (from the solver)
+
+        # Hint mode: the player moves the vehicles and the optimal next move is
+        # looked up in a distance table computed once per map in the background
+        self.hint_mode = False
+        self.hint_tables = {}  # cluster signature -> DistanceTable
+        self.hint_building = set()  # (signature, state) of the tables being computed
+        self.hint = None  # (cost, moves, next move) to the goal from self.board
+        self.selected_vehicle = None  # Vehicle id moved by the arrow keys
+        self.drag_start = None  # Mouse position where a vehicle drag started
+        self.player_moves = 0
+        self.player_cost = 0
 
         # Algorithm selectoin
         self.selected_algorithm = "BFS"
-        self.algorithms = ["BFS", "DFS", "UCS", "IDS", "A*"]
+        self.algorithms = list(ALGORITHMS)
         self.algorithm_index = 0
 
         # Map selection
         self.selected_map = 1
-        self.max_maps = 10
+        self.max_maps = maps.MAX_MAPS
 
         # Button rectangles for click detection
         self.play_btn_rect = None
@@ -57,144 +95,74 @@ class GUI:
         self.algo_right_arrow_rect = None
         self.map_left_arrow_rect = None
         self.map_right_arrow_rect = None
+        self.slider_rect = None
+        self.is_scrubbing = False
+
+        # Images are loaded and scaled on first use, see _ensure_images
+        self.original_images = None
+        self.images_scaled = False
 
-        self._load_original_images()
         self.load_map(self.selected_map)
         self.set_board(self.current_board)
 
+    def _ensure_images(self):
+        """Load the images the first time they are needed and rescale them after set_board."""
+        if not self.images_scaled:
+            self._scale_images()
+            self.images_scaled = True
+
     def _load_original_images(self):
-        sprites = SpriteSheet("assets/img/bk_cars1.a.png")
-        self.original_car_images = {
-            "red": sprites.parse_sprite("red_car-0"),
-            "L2": [
-                sprites.parse_sprite("v2_0-0"),
-                sprites.parse_sprite("v2_0-1"),
-                sprites.parse_sprite("v2_1-0"),
-                sprites.parse_sprite("v2_1-1"),
-                sprites.parse_sprite("v2_2-0"),
-                sprites.parse_sprite("v2_2-1"),
-                sprites.parse_sprite("v2_2-2"),
-            ],
-            "L3": [
-                sprites.parse_sprite("v3_0-0"),
-                sprites.parse_sprite("v3_1-0"),
-                sprites.parse_sprite("v3_2-0"),
-            ],
-        }
-        self.original_road_images = {
-            "road": SpriteSheet("assets/img/Road_01_Tile_05.png").parse_sprite(
-                "road-0"
-            ),
-            "border": SpriteSheet("assets/img/Road_Side_02.png").parse_sprite(
-                "border-0"
-            ),
-            "corner": SpriteSheet("assets/img/Road_Round_Corner.png").parse_sprite(
-                "corner-0"
-            ),
-        }
-        self.original_bg_images = {
-            "grass": SpriteSheet("assets/img/Grass_Tile.png").parse_sprite("grass-0"),
-        }
-        self.logo_image = pygame.image.load("assets/img/logo.png")
-        self.bar = pygame.image.load("assets/img/Table.png")
-        self.left_arrow = SpriteSheet("assets/img/Left.png").parse_sprite("left-0")
-        self.right_arrow = SpriteSheet("assets/img/Right.png").parse_sprite("right-0")
-        self.finished_image = pygame.image.load("assets/img/Finish.png")
-        self.measurements_box = pygame.image.load("assets/img/Window.png")
-        self.play_btn = pygame.image.load("assets/img/Play_BTN.png")
-        self.pause_btn = pygame.image.load("assets/img/Pause_BTN.png")
-        self.replay_btn = pygame.image.load("assets/img/Replay_BTN.png")
-        self.speedup_btn = pygame.image.load("assets/img/SpeedUp_BTN.png")
+        self.original_images = assets.load_original_images()
 
     def _scale_images(self):
         """Rescale all images based on the current cell_size."""
-        self.car_images = {
-            "red": self.original_car_images["red"],  # Will be scaled in draw_vehicles
-            "L2": self.original_car_images["L2"],
-            "L3": self.original_car_images["L3"],
-        }
-
+        # Scaled vehicle sprites depend on cell_size, so drop the old ones
+        self.sprite_cache = {}
         self.border_scale_factor = (self.cell_size, self.cell_size / 6)
-        self.road_images = {
-            "road": pygame.transform.scale(
-                self.original_road_images["road"], (self.cell_size, self.cell_size)
-            ),
-            "border": pygame.transform.scale(
-                self.original_road_images["border"], self.border_scale_factor
-            ),
-            "corner": pygame.transform.scale(
-                self.original_road_images["corner"],
-                (self.border_scale_factor[1] + 5, self.border_scale_factor[1] + 5),
-            ),
-        }
-        self.grass_image = pygame.transform.scale(
-            self.original_bg_images["grass"], (self.cell_size, self.cell_size)
-        )
-        self.logo = pygame.transform.scale(
-            self.logo_image,
-            (self.logo_image.get_width() // 3, self.logo_image.get_height() // 3),
-        )
-        self.bar = pygame.transform.scale(
-            self.bar, (self.cell_size * 3, self.cell_size)
-        )
-        self.left_arrow = pygame.transform.scale(
-            self.left_arrow, (self.bar.get_height() // 2, self.bar.get_height() // 2)
-        )
-        self.right_arrow = pygame.transform.scale(
-            self.right_arrow, (self.bar.get_height() // 2, self.bar.get_height() // 2)
-        )
-        self.finished_image = pygame.transform.scale(
-            self.finished_image, (self.cell_size, self.cell_size // 2)
-        )
-        self.measurements_box = pygame.transform.scale(
-            self.measurements_box, (self.cell_size * 3, self.cell_size * 4)
-        )
-        self.play_btn = pygame.transform.scale(
-            self.play_btn, (self.cell_size, self.cell_size)
-        )
-        self.pause_btn = pygame.transform.scale(
-            self.pause_btn, (self.cell_size, self.cell_size)
-        )
-        self.replay_btn = pygame.transform.scale(
-            self.replay_btn, (self.cell_size, self.cell_size)
-        )
-        self.speedup_btn = pygame.transform.scale(
-            self.speedup_btn, (self.cell_size, self.cell_size)
-        )
+
+        # Prefer the pre-baked images, decode and scale the originals otherwise
+        images = assets.load_baked(self.cell_size)
+        if images is None:
+            if self.original_images is None:
+                self._load_original_images()
+            images = assets.scale_images(self.original_images, self.cell_size)
+
+        self.car_images = images["car_images"]
+        self.road_images = images["road_images"]
+        self.grass_image = images["grass_image"]
+        self.logo = images["logo"]
+        self.bar = images["bar"]
+        self.left_arrow = images["left_arrow"]
+        self.right_arrow = images["right_arrow"]
+        self.finished_image = images["finished_image"]
+        self.measurements_box = images["measurements_box"]
+        self.play_btn = images["play_btn"]
+        self.pause_btn = images["pause_btn"]
+        self.replay_btn = images["replay_btn"]
+        self.speedup_btn = images["speedup_btn"]
+        for (sprite, length, orientation), image in images["vehicle_sprites"].items():
+            self.sprite_cache[(sprite, length, orientation, self.cell_size)] = image
 
     def set_board(self, board):
         """Set a new board and adjust properties accordingly."""
         self.board = board
-        self.cell_size = min(self.screen_size) // (board.width + 4)
+        # the larger side has to fit, with room for the panels around the road
+        self.cell_size = min(self.screen_size) // (max(board.width, board.height) + 4)
         self.grid_width = self.board.width * self.cell_size
         self.grid_height = self.board.height * self.cell_size
         self.grid_offset = (
             (self.screen_size[0] - self.grid_width) // 2,
             (self.screen_size[1] - self.grid_height) // 2 + 30,
         )
-        self._scale_images()
+        self.images_scaled = False
 
     def load_map(self, map_number):
         try:
-            map_file = f"src/map/map{map_number:02d}.txt"
-
-            # Read and parse the map file
-            with open(map_file, "r") as f:
-                content = f.read().strip()
-
-            if not content:
-                print(f"Map {map_number} is empty, using default map")
-                self.current_board = self.original_board
-                return
+            board = maps.load_map(map_number)
 
-            # this to store map content
-            local_vars = {}
-            exec(content, {"Vehicle": Vehicle}, local_vars)
-
-            if "vehicles" in local_vars:
-                vehicles = local_vars["vehicles"]
-                self.current_board = Board(6, 6, vehicles)
-                print(f"Loaded map {map_number} with {len(vehicles)} vehicles")
+            if board is not None:
+                self.current_board = board
+                print(f"Loaded map {map_number} with {len(board.vehicles)} vehicles")
             else:
                 print(f"No vehicles found in map {map_number}, using default map")
                 self.current_board = self.original_board
@@ -254,7 +222,7 @@ class GUI:
         if not hasattr(self, "bar_font"):
             pygame.font.init()
             self.bar_font = pygame.font.Font(
-                "assets/fonts/pricedown.ttf", self.cell_size - 25
+                assets.font_path("pricedown.ttf"), self.cell_size - 25
             )
 
         algo_text = self.bar_font.render(
@@ -318,9 +286,11 @@ class GUI:
             pygame.font.init()
             self.font = pygame.font.Font(None, 24)
             self.large_font = pygame.font.Font(
-                "assets/fonts/pricedown.ttf", self.cell_size // 2
+                assets.font_path("pricedown.ttf"), self.cell_size // 2
+            )
+            self.small_font = pygame.font.Font(
+                assets.font_path("ChaletComprime-CologneSixty.otf"), 20
             )
-            self.small_font = pygame.font.Font("assets/fonts/ChaletComprime-CologneSixty.otf", 20)
 
         # Draw title
         title_text = self.large_font.render("Statistics", True, (255, 255, 255))
@@ -336,6 +306,33 @@ class GUI:
         current_y = box_y + 50
         line_spacing = 25
 
+        if self.hint_mode:
+            lines = [f"Your Moves: {self.player_moves}", f"Your Cost: {self.player_cost}"]
+            if self.board.is_solved():
+                status, color = "Solved!", (0, 200, 0)
+            elif self.hint is not None:
+                cost, moves, move = self.hint
+                lines += [
+                    f"Next Move: {move.vehicle_id} {move.amount:+d}",
+                    f"Cost to Goal: {cost}",
+                    f"Moves to Goal: {moves}",
+                ]
+                status, color = "Hint Mode", (255, 215, 0)
+            elif self.hint_table() is not None:
+                status, color = "No Solution", (200, 0, 0)
+            else:
+                status, color = "Computing...", (255, 165, 0)
+
+            for line in lines:
+                text = self.small_font.render(line, True, (255, 255, 255))
+                self.screen.blit(text, (box_x + 30, current_y))
+                current_y += line_spacing
+            status_text = self.large_font.render(status, True, color)
+            text_x = box_x + (self.measurements_box.get_width() - status_text.get_width()) // 2
+            text_y = box_y + self.measurements_box.get_height() - 60
+            self.screen.blit(status_text, (text_x, text_y))
+            return
+
         # Draw solver statistics if available
         if self.solver_stats:
             # Search time
@@ -414,7 +411,7 @@ class GUI:
                 self.screen.blit(current_cost_text, (box_x + 30, current_y))
                 current_y += line_spacing
 
-            elif self.selected_algorithm == "A*":
+            elif self.selected_algorithm in HEURISTIC_ALGORITHMS:
                 # A*: Total cost, g(current), and h(current)
                 total_cost_text = self.small_font.render(
                     f"Total Cost: {self.total_cost}", True, (255, 255, 255)
@@ -539,7 +536,7 @@ class GUI:
         # Label for speed up button (on the right)
         if self.solution_found:
             speedup_x = btn_x + btn_spacing
-            speed_label = self.button_font.render(f"Speed: {self.animation_speed}x", True, (255, 255, 255))
+            speed_label = self.button_font.render(f"Speed: {self.animation_speed:g}x", True, (255, 255, 255))
             self.screen.blit(
                 speed_label,
                 (
@@ -548,6 +545,44 @@ class GUI:
                 ),
             )
 
+    def draw_timeline_slider(self):
+        """Draw the slider used to scrub through the solution."""
+        self.slider_rect = None
+        if not self.timeline:
+            return
+
+        # Place the slider in the left panel, below the map selection bar
+        bar_y_start = (self.screen_size[1] - self.cell_size * 2.5) // 2
+        slider_y = bar_y_start + self.cell_size * 2.2 + 40
+        slider_x = 20
+        slider_width = self.bar.get_width() - 40
+        self.slider_rect = pygame.Rect(slider_x, slider_y, slider_width, 10)
+
+        if self.timeline.last_step > 0:
+            progress = self.current_move_index / self.timeline.last_step
+        else:
+            progress = 1
+
+        pygame.draw.rect(self.screen, (60, 60, 60), self.slider_rect, border_radius=5)
+        filled_rect = self.slider_rect.copy()
+        filled_rect.width = int(slider_width * progress)
+        pygame.draw.rect(self.screen, (102, 255, 178), filled_rect, border_radius=5)
+        pygame.draw.circle(
+            self.screen,
+            (255, 255, 255),
+            (slider_x + filled_rect.width, self.slider_rect.centery),
+            9,
+        )
+
+        if not hasattr(self, "button_font"):
+            self.button_font = pygame.font.Font(None, 20)
+        step_label = self.button_font.render(
+            f"Step: {self.current_move_index}/{self.timeline.last_step}",
+            True,
+            (255, 255, 255),
+        )
+        self.screen.blit(step_label, (slider_x, slider_y + 18))
+
     def draw_background(self):
         for r in range(self.screen_size[1] // self.cell_size + 1):
             for c in range(self.screen_size[0] // self.cell_size + 1):
@@ -577,11 +612,11 @@ class GUI:
                     ),
                 )
 
-        # Prepare rotated border images
+        # Rotated border images are prepared in _scale_images
         border_top = self.road_images["border"]
-        border_right = pygame.transform.rotate(self.road_images["border"], -90)
-        border_bottom = pygame.transform.rotate(self.road_images["border"], 180)
-        border_left = pygame.transform.rotate(self.road_images["border"], 90)
+        border_right = self.road_images["border_right"]
+        border_bottom = self.road_images["border_bottom"]
+        border_left = self.road_images["border_left"]
 
         # Draw borders
         for c in range(self.board.width):
@@ -703,25 +738,37 @@ class GUI:
         # Blit (draw) the tracker surface onto the main screen at the calculated position.
         self.screen.blit(tracker_surface, tracker_rect.topleft)
 
-    def draw_vehicles(self):
-        for vehicle in self.board.vehicles:
-            if vehicle.id == "R":
+    def get_vehicle_sprite(self, vehicle):
+        """Return the scaled (and rotated) sprite of a vehicle, or None if it has no sprite."""
+        if vehicle.id == "R":
+            sprite = ("red", 0)
+        elif vehicle.length == 2:
+            sprite = ("L2", ord(vehicle.id[0]) % len(self.car_images["L2"]))
+        elif vehicle.length == 3:
+            sprite = ("L3", ord(vehicle.id[0]) % len(self.car_images["L3"]))
+        else:
+            return None
+
+        # Sprites are transformed once per (sprite, length, orientation, cell_size)
+        key = (sprite, vehicle.length, vehicle.orientation, self.cell_size)
+        scaled_image = self.sprite_cache.get(key)
+        if scaled_image is None:
+            if sprite[0] == "red":
                 image = self.car_images["red"]
-            elif vehicle.length == 2:
-                image_index = ord(vehicle.id[0]) % len(self.car_images["L2"])
-                image = self.car_images["L2"][image_index]
-            elif vehicle.length == 3:
-                image_index = ord(vehicle.id[0]) % len(self.car_images["L3"])
-                image = self.car_images["L3"][image_index]
             else:
-                continue
+                image = self.car_images[sprite[0]][sprite[1]]
 
-            scaled_image = pygame.transform.scale(
-                image, (self.cell_size, self.cell_size * vehicle.length)
+            scaled_image = assets.scale_vehicle_sprite(
+                image, vehicle.length, vehicle.orientation, self.cell_size
             )
+            self.sprite_cache[key] = scaled_image
+        return scaled_image
 
-            if vehicle.orientation == "H":
-                scaled_image = pygame.transform.rotate(scaled_image, -90)
+    def draw_vehicles(self):
+        for vehicle in self.board.vehicles:
+            scaled_image = self.get_vehicle_sprite(vehicle)
+            if scaled_image is None:
+                continue
 
             self.screen.blit(
                 scaled_image,
@@ -731,45 +778,116 @@ class GUI:
                 ),
             )
 
-    def solve_puzzle(self):
-        """Solve the puzzle using the selected algorithm."""
-        print(f"Solving with {self.selected_algorithm}...")
-
+    def create_solver(self):
+        """Create the solver of the selected algorithm for the current map."""
         # Reset board to original state
         self.board = copy.deepcopy(self.current_board)
 
         # Select appropriate solver
-        if self.selected_algorithm == "BFS":
-            solver = BFSSolver(self.board)
-        elif self.selected_algorithm == "DFS":
-            solver = DFSSolver(self.board)
-        elif self.selected_algorithm == "UCS":
-            solver = UCSSolver(self.board)
-        elif self.selected_algorithm == "IDS":
-            solver = IDSSolver(self.board)
-        elif self.selected_algorithm == "A*":
-            solver = AStarSolver(self.board)
-        else:
+        solver_class = ALGORITHMS.get(self.selected_algorithm)
+        if solver_class is None:
+            return None
+        return solver_class(self.board)
+
+    def start_solving(self):
+        """Solve the puzzle in a background thread so the window stays responsive."""
+        print(f"Solving with {self.selected_algorithm}...")
+
+        # One solve at a time, the memory run of each uses the process-wide tracemalloc
+        self.stop_solving(wait=True)
+        solver = self.create_solver()
+        if solver is None:
             self.is_solving = False
-            return False
+            return
+
+        self.solve_request += 1
+        request = self.solve_request
+
+        def publish(solution, cost, bound):
+            # anytime solvers report every improved solution while they keep searching
+            pygame.event.post(
+                pygame.event.Event(
+                    SOLVER_EVENT, solver=solver, request=request, solution=solution
+                )
+            )
+
+        if hasattr(solver, "on_solution"):
+            solver.on_solution = publish
+
+        def solve():
+            solver.solve()
+            pygame.event.post(
+                pygame.event.Event(SOLVER_EVENT, solver=solver, request=request, solution=None)
+            )
 
-        solution = solver.solve()
+        self.solver = solver
+        self.solver_thread = threading.Thread(target=solve, daemon=True)
+        self.solver_thread.start()
+
+    def stop_solving(self, wait=False):
+        """
+        Cancel the background solve, if any. With wait, also wait until its
+        thread has ended, which is at its next expansion.
+        """
+        if self.solver is not None:
+            self.solver.cancel()
+            self.solver = None
+        if wait and self.solver_thread is not None:
+            self.solver_thread.join()
+            self.solver_thread = None
+
+    def handle_solver_event(self, event):
+        """Handle a result posted by the background solver thread."""
+        # Results of a solve that was abandoned (map or algorithm changed) are dropped
+        if event.request != self.solve_request:
+            return
+        if not (self.is_solving or self.is_improving):
+            return
+
+        improving = event.solution is not None
+        if not improving:
+            self.is_improving = False
+            if event.solver.solution and self.current_solution == event.solver.solution:
+                # the last published solution was already the final one
+                self.solver_stats = event.solver.get_stats()
+                return
+
+        # A better solution replaces the one being shown and plays from the start
+        was_playing = self.is_playing or self.is_solving
+        if self.apply_solver_result(event.solver, event.solution):
+            self.is_improving = improving
+            self.seek(0)
+            if was_playing:
+                self.start_animation()
+
+    def apply_solver_result(self, solver, solution=None):
+        """
+        Store the solution and statistics of a finished solver, or an
+        intermediate solution published by an anytime solver.
+        """
         self.is_solving = False
 
         # Store solver statistics
         self.solver_stats = solver.get_stats()
+        if solution is None:
+            solution = solver.solution
+            self.step_g_costs, self.step_h_costs = solver.get_step_costs()
+        else:
+            self.step_g_costs, self.step_h_costs = solver.compute_step_costs(solution)
 
         if solution:
             print("Solution Found!")
             self.solution_found = True
             self.current_solution = solution
             self.animation_moves = solution
+            # the solver's start board, self.board may be mid-animation here
+            self.timeline = Timeline(solver.board, solution)
             self.current_move_index = 0
             self.animation_finished = False
 
-            # Calculate total cost for UCS and A*
-            if self.selected_algorithm in ["UCS", "A*"]:
-                self.total_cost = self.calculate_ucs_cost(self.current_board, solution)
+            # Total cost for UCS and A* is the last cumulative g value
+            if self.selected_algorithm in COST_ALGORITHMS:
+                self.total_cost = self.step_g_costs[-1]
             else:
                 self.total_cost = 0
 
@@ -787,6 +905,9 @@ class GUI:
     def start_animation(self):
         """Start the solution animation."""
         if self.current_solution:
+            # Playing from the last step starts the animation over
+            if self.animation_finished:
+                self.seek(0)
             self.is_playing = True
             self.is_paused = False
             self.last_move_time = pygame.time.get_ticks()
@@ -800,18 +921,15 @@ class GUI:
         """Restart animation or reset the game."""
         if self.solution_found and self.current_solution:
             # Just restart the animation with the existing solution
-            self.board = copy.deepcopy(self.current_board)
-            self.current_move_index = 0
-            self.animation_finished = False
+            self.seek(0)
             self.is_paused = False
             self.is_playing = True  # Automatically start playing
             self.last_move_time = pygame.time.get_ticks()
-            # Reset costs for animation
-            self.current_cost = 0
-            self.current_g_cost = 0
-            self.current_h_cost = 0
         else:
-            # Complete reset (when there's no solution yet)
+            # Complete reset (when there's no solution yet), a solve in progress is abandoned
+            self.stop_solving()
+            self.is_solving = False
+            self.is_improving = False
             self.board = copy.deepcopy(self.current_board)
             self.current_move_index = 0
             self.animation_finished = False
@@ -820,6 +938,7 @@ class GUI:
             self.solution_found = False
             self.current_solution = None
             self.animation_moves = []
+            self.timeline = None
             self.solver_stats = None
             self.total_cost = 0
             self.current_cost = 0
@@ -830,41 +949,6 @@ class GUI:
         self.animation_speed = 1
         self.move_duration = 1000
 
-    def calculate_ucs_cost(self, original_board, moves_so_far):
-        """Calculate the total cost for UCS algorithm."""
-        total_cost = 0
-        current_board = copy.deepcopy(original_board)
-
-        for move in moves_so_far:
-            # Find the vehicle being moved
-            moved_vehicle = None
-            for vehicle in current_board.vehicles:
-                if vehicle.id == move.vehicle_id:
-                    moved_vehicle = vehicle
-                    break
-
-            if moved_vehicle:
-                # UCS cost is vehicle length * distance moved
-                move_cost = moved_vehicle.length * abs(move.amount)
-                total_cost += move_cost
-
-            # Apply the move for next iteration
-            current_board = current_board.apply_move(move)
-
-        return total_cost
-
-    def calculate_astar_costs(self, board):
-        """Calculate g(n) and h(n) costs for A* algorithm."""
-        # g(n) is the same as UCS cost
-        g_cost = self.current_cost
-        
-        # Use the A* solver's heuristic function directly to get h(n)
-        # This ensures consistency between solver and GUI
-        astar_solver = AStarSolver(board)
-        h_cost = astar_solver._heuristic(board)
-        
-        return g_cost, h_cost
-
     def update_costs(self):
         """Update cost information during animation."""
         if not self.current_solution or self.current_move_index == 0:
@@ -873,59 +957,77 @@ class GUI:
             self.current_h_cost = 0
             return
 
-        # Calculate costs based on algorithm
-        if self.selected_algorithm == "UCS":
-            moves_applied = self.current_solution[:self.current_move_index]
-            self.current_cost = self.calculate_ucs_cost(self.current_board, moves_applied)
+        # The solver already computed the costs of every step, just look them up
+        if self.selected_algorithm in COST_ALGORITHMS:
+            self.current_cost = self.step_g_costs[self.current_move_index]
+            self.current_g_cost = self.current_cost
+            self.current_h_cost = self.step_h_costs[self.current_move_index]
 
-        elif self.selected_algorithm == "A*":
-            moves_applied = self.current_solution[:self.current_move_index]
-            self.current_cost = self.calculate_ucs_cost(self.current_board, moves_applied)
-            self.current_g_cost, self.current_h_cost = self.calculate_astar_costs(self.board)
+    def seek(self, step):
+        """Jump directly to a step of the precomputed solution timeline."""
+        if not self.timeline:
+            return
+        step = max(0, min(step, self.timeline.last_step))
+        self.current_move_index = step
+        self.board = self.timeline.board_at(step)
+        self.animation_finished = step == self.timeline.last_step
+        self.update_costs()
+
+    def step_animation(self, direction):
+        """Pause the animation and move one step backwards or forwards."""
+        if not self.timeline:
+            return
+        if self.is_playing:
+            self.pause_animation()
+        self.seek(self.current_move_index + direction)
 
-    def update_animation(self):
-        """Update the animation state."""
-        if not self.is_playing or self.is_paused or self.animation_finished:
+    def seek_to_slider_position(self, mouse_x):
+        """Seek to the step under the given x coordinate of the slider."""
+        if not self.timeline or not self.slider_rect:
             return
+        ratio = (mouse_x - self.slider_rect.x) / self.slider_rect.width
+        ratio = max(0.0, min(ratio, 1.0))
+        self.seek(round(ratio * self.timeline.last_step))
+
+    def is_animating(self):
+        """Whether the animation is running and needs periodic ticks."""
+        return self.is_playing and not self.is_paused and not self.animation_finished
+
+    def update_animation(self):
+        """Update the animation state. Returns True if something changed."""
+        if not self.is_animating():
+            return False
 
         current_time = pygame.time.get_ticks()
-        if current_time - self.last_move_time >= self.move_duration:
+        elapsed = current_time - self.last_move_time
+        if elapsed >= self.move_duration:
             if self.current_move_index < len(self.animation_moves):
-                # Apply the current move
-                move = self.animation_moves[self.current_move_index]
-                self.board = self.board.apply_move(move)
-                self.current_move_index += 1
-                self.last_move_time = current_time
-
-                # Update costs after applying the move
-                self.update_costs()
+                # At high speeds several steps can pass between two frames
+                steps = int(elapsed // self.move_duration)
+                self.last_move_time += steps * self.move_duration
+                self.seek(self.current_move_index + steps)
+                if self.animation_finished:
+                    self.is_playing = False
             else:
                 # Animation finished
                 self.animation_finished = True
                 self.is_playing = False
+            return True
+        return False
 
     def handle_play_button(self):
         """Handle play button click."""
+        if self.is_solving:
+            # Already solving in the background
+            return
+        if self.hint_mode:
+            # the solver plays the map from the start
+            self.toggle_hint_mode()
         if not self.solution_found:
-            # Set solving state first to show "Solving..." message
+            # Set solving state first to show "Solving..." message,
+            # the animation starts once the solver thread posts its result
             self.is_solving = True
-            # Process any pending events and redraw to show the "Solving..." message
-            pygame.event.pump()
-            self.draw_background()
-            self.draw_logo()
-            self.draw_road()
-            self.draw_red_car_tracker()
-            self.draw_vehicles()
-            self.draw_control_buttons()
-            self.draw_measurements_box()
-            pygame.display.flip()
-
-            # Small delay to ensure the message is visible
-            pygame.time.wait(100)
-
-            # Now try to solve the puzzle
-            if self.solve_puzzle():
-                self.start_animation()
+            self.start_solving()
         elif self.is_paused:
             # Resume animation
             self.is_playing = True
@@ -955,8 +1057,12 @@ class GUI:
 
         # Reset solution state when algorithm changes
         # This is a complete reset since we need to solve with the new algorithm
+        self.stop_solving()
+        self.is_solving = False
+        self.is_improving = False
         self.solution_found = False
         self.current_solution = None
+        self.timeline = None
         self.is_playing = False
         self.is_paused = False
         self.animation_finished = False
@@ -965,7 +1071,9 @@ class GUI:
         self.current_cost = 0
         self.current_g_cost = 0
         self.current_h_cost = 0
-        self.board = copy.deepcopy(self.current_board)
+        if not self.hint_mode:
+            # In hint mode the board is the player's, the algorithm is for later
+            self.board = copy.deepcopy(self.current_board)
 
     def handle_map_selection(self, direction):
         """Handle map selection with arrow keys."""
@@ -979,8 +1087,12 @@ class GUI:
         self.set_board(self.current_board)
 
         # Reset solution state when map changes
+        self.stop_solving()
+        self.is_solving = False
+        self.is_improving = False
         self.solution_found = False
         self.current_solution = None
+        self.timeline = None
         self.is_playing = False
         self.is_paused = False
         self.animation_finished = False
@@ -989,30 +1101,274 @@ class GUI:
         self.current_cost = 0
         self.current_g_cost = 0
         self.current_h_cost = 0
+        if self.hint_mode:
+            self.start_hint_mode()
 
     def handle_speedup_button(self):
         """Handle speed up button click."""
-        self.animation_speed = self.animation_speed % self.max_speed + 1
+        # After the +/- keys the speed can be fractional, the button cycles whole speeds
+        self.set_animation_speed(int(self.animation_speed) % self.max_speed + 1)
+
+    def handle_fine_speed(self, factor):
+        """Double or halve the animation speed within [min_speed, fine_max_speed]."""
+        speed = self.animation_speed * factor
+        self.set_animation_speed(max(self.min_speed, min(speed, self.fine_max_speed)))
 
-        # Adjust move duration based on speed
-        self.move_duration = 1000 // self.animation_speed
+    def set_animation_speed(self, speed):
+        """Set the animation speed and the matching whole-millisecond step interval."""
+        self.animation_speed = speed
+        self.move_duration = max(1, round(1000 / speed))
 
-        print(f"Animation speed set to {self.animation_speed}x")
+        print(f"Animation speed set to {self.animation_speed:g}x")
+
+    def toggle_hint_mode(self):
+        """Switch between playing back solutions and moving the vehicles yourself."""
+        self.hint_mode = not self.hint_mode
+
+        # Any solution being shown is dropped, the player starts from the map
+        self.stop_solving()
+        self.is_solving = False
+        self.is_improving = False
+        self.solution_found = False
+        self.current_solution = None
+        self.timeline = None
+        self.is_playing = False
+        self.is_paused = False
+        self.animation_finished = False
+        self.solver_stats = None
+        self.board = self.current_board
+        if self.hint_mode:
+            self.start_hint_mode()
+
+    def start_hint_mode(self):
+        """Start playing the current map, computing its distance table if needed."""
+        self.board = self.current_board
+        self.player_moves = 0
+        self.player_cost = 0
+        self.selected_vehicle = None
+        self.drag_start = None
+        self.hint = None
+
+        if self.hint_table() is not None:
+            self.update_hint()
+            return
+        signature, _, state = cluster_layout(self.board)
+        if (signature, state) in self.hint_building:
+            # Toggled again while the table is computed, it is already on its way
+            return
+
+        # One exploration of the map's state space answers every later hint
+        self.hint_building.add((signature, state))
+        board = self.board
+
+        def build():
+            table = DistanceTable(board).build([board])
+            pygame.event.post(
+                pygame.event.Event(HINT_EVENT, table=table, building=(signature, state))
+            )
+
+        threading.Thread(target=build, daemon=True).start()
+
+    def handle_hint_event(self, event):
+        """Store a distance table posted by the background thread."""
+        self.hint_building.discard(event.building)
+        self.hint_tables[event.table.signature] = event.table
+        if self.hint_mode:
+            # The table may be for another map, then the hint stays unknown
+            self.update_hint()
+
+    def hint_table(self):
+        """
+        The distance table of the current board, None if it is not computed yet.
+        Maps of the same layout share a table as long as they can reach each other.
+        """
+        signature, _, state = cluster_layout(self.board)
+        table = self.hint_tables.get(signature)
+        return table if table is not None and state in table.reachable else None
+
+    def update_hint(self):
+        """Look up the distance to the goal and the next move of the current board."""
+        table = self.hint_table()
+        self.hint = table.lookup(self.board) if table is not None else None
+
+    def make_player_move(self, move):
+        vehicle = self.board.vehicle(move.vehicle_id)
+        self.board = self.board.apply_move(move)
+        self.player_moves += 1
+        self.player_cost += vehicle.length * abs(move.amount)
+        self.update_hint()
+
+    def apply_hint(self):
+        """Play the optimal next move."""
+        if self.hint is not None and self.hint[2] is not None:
+            self.selected_vehicle = self.hint[2].vehicle_id
+            self.make_player_move(self.hint[2])
+
+    def move_vehicle(self, vehicle_id, amount):
+        """
+        Move a vehicle of the player's board up to `amount` cells, as far as it
+        can go in that direction.
+        """
+        legal = [
+            move.amount
+            for move in self.board.get_possible_moves()
+            if move.vehicle_id == vehicle_id and 0 < move.amount / amount <= 1
+        ]
+        if legal:
+            best = max(legal, key=abs)
+            self.make_player_move(self.board.move(vehicle_id, best))
+
+    def vehicle_at(self, pos):
+        """The vehicle under a screen position, or None."""
+        x = (pos[0] - self.grid_offset[0]) // self.cell_size
+        y = (pos[1] - self.grid_offset[1]) // self.cell_size
+        for vehicle in self.board.vehicles:
+            if vehicle.orientation == "H":
+                if vehicle.y == y and vehicle.x <= x < vehicle.x + vehicle.length:
+                    return vehicle
+            elif vehicle.x == x and vehicle.y <= y < vehicle.y + vehicle.length:
+                return vehicle
+        return None
+
+    def finish_drag(self, pos):
+        """Move the dragged vehicle by the number of cells the mouse moved along its lane."""
+        if self.drag_start is None or self.selected_vehicle is None:
+            return
+        vehicle = self.board.vehicle(self.selected_vehicle)
+        axis = 0 if vehicle.orientation == "H" else 1
+        amount = round((pos[axis] - self.drag_start[axis]) / self.cell_size)
+        self.drag_start = None
+        if amount:
+            self.move_vehicle(vehicle.id, amount)
+
+    def handle_hint_key(self, key):
+        """Keys of hint mode. Returns True if the key was used."""
+        if key in (pygame.K_RETURN, pygame.K_KP_ENTER, pygame.K_n):
+            self.apply_hint()
+            return True
+        if key in (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN):
+            # Only the arrows along the selected vehicle's lane move it, the
+            # others still choose the algorithm
+            if self.selected_vehicle is None:
+                return False
+            vehicle = self.board.vehicle(self.selected_vehicle)
+            if vehicle.orientation == "H" and key in (pygame.K_LEFT, pygame.K_RIGHT):
+                self.move_vehicle(vehicle.id, 1 if key == pygame.K_RIGHT else -1)
+                return True
+            if vehicle.orientation == "V" and key in (pygame.K_UP, pygame.K_DOWN):
+                self.move_vehicle(vehicle.id, 1 if key == pygame.K_DOWN else -1)
+                return True
+            return False
+        if key == pygame.K_TAB:
+            # cycle through the vehicles
+            ids = [vehicle.id for vehicle in self.board.vehicles]
+            index = ids.index(self.selected_vehicle) + 1 if self.selected_vehicle in ids else 0
+            self.selected_vehicle = ids[index % len(ids)]
+            return True
+        return False
+
+    def draw_hint_overlay(self):
+        """Frame the vehicle of the suggested move and the selected vehicle."""
+        highlights = []
+        if self.hint is not None and self.hint[2] is not None:
+            highlights.append((self.hint[2].vehicle_id, (255, 215, 0, 120)))
+        if self.selected_vehicle is not None:
+            highlights.append((self.selected_vehicle, (80, 160, 255, 90)))
+
+        for vehicle_id, color in highlights:
+            vehicle = self.board.vehicle(vehicle_id)
+            width = self.cell_size * (vehicle.length if vehicle.orientation == "H" else 1)
+            height = self.cell_size * (vehicle.length if vehicle.orientation == "V" else 1)
+            overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+            overlay.fill(color)
+            self.screen.blit(
+                overlay,
+                (
+                    self.grid_offset[0] + vehicle.x * self.cell_size,
+                    self.grid_offset[1] + vehicle.y * self.cell_size,
+                ),
+            )
+
+    def wait_for_events(self):
+        """
+        Return the pending events. In event-driven mode this blocks until there
+        is input, a solver event or the next animation tick is due.
+        """
+        if not self.event_driven:
+            return pygame.event.get()
+
+        if self.is_animating():
+            timeout = self.last_move_time + self.move_duration - pygame.time.get_ticks()
+            if timeout <= 0:
+                return pygame.event.get()
+            event = pygame.event.wait(math.ceil(timeout))
+        else:
+            event = pygame.event.wait()
+
+        events = [event] if event.type != pygame.NOEVENT else []
+        return events + pygame.event.get()
+
+    def draw_scene(self):
+        """Draw everything and show the new frame."""
+        self._ensure_images()
+        self.draw_background()
+        self.draw_logo()
+        self.draw_road()
+        self.draw_red_car_tracker()
+        self.draw_vehicles()
+        if self.hint_mode:
+            self.draw_hint_overlay()
+        self.draw_control_buttons()
+        self.draw_timeline_slider()
+        self.draw_measurements_box()
+
+        pygame.display.flip()
 
     def run(self):
         running = True
         clock = pygame.time.Clock()
 
         while running:
-            for event in pygame.event.get():
+            for event in self.wait_for_events():
+                # Plain mouse movement does not change the scene
+                if event.type != pygame.MOUSEMOTION or self.is_scrubbing:
+                    self.needs_redraw = True
+
                 if event.type == pygame.QUIT:
                     running = False
+                elif event.type == SOLVER_EVENT:
+                    self.handle_solver_event(event)
+                elif event.type == HINT_EVENT:
+                    self.handle_hint_event(event)
+                elif event.type == pygame.MOUSEBUTTONUP:
+                    if event.button == 1:
+                        self.is_scrubbing = False
+                        if self.hint_mode:
+                            self.finish_drag(event.pos)
+                elif event.type == pygame.MOUSEMOTION:
+                    if self.is_scrubbing:
+                        self.seek_to_slider_position(event.pos[0])
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     if event.button == 1:  # Left mouse button
                         mouse_pos = pygame.mouse.get_pos()
+                        vehicle = self.vehicle_at(mouse_pos) if self.hint_mode else None
+
+                        # In hint mode vehicles are dragged along their lane
+                        if vehicle is not None:
+                            self.selected_vehicle = vehicle.id
+                            self.drag_start = mouse_pos
+
+                        # Check timeline slider
+                        elif self.slider_rect and self.slider_rect.inflate(0, 20).collidepoint(
+                            mouse_pos
+                        ):
+                            if self.is_playing:
+                                self.pause_animation()
+                            self.is_scrubbing = True
+                            self.seek_to_slider_position(mouse_pos[0])
 
                         # Check control button clicks
-                        if (
+                        elif (
                             hasattr(self, "play_btn_rect")
                             and self.play_btn_rect
                             and self.play_btn_rect.collidepoint(mouse_pos)
@@ -1066,8 +1422,13 @@ class GUI:
                             self.handle_map_selection("right")
 
                 elif event.type == pygame.KEYDOWN:
+                    shift = event.mod & pygame.KMOD_SHIFT
                     # Keyboard shortcuts
-                    if event.key == pygame.K_SPACE:
+                    if self.hint_mode and not shift and self.handle_hint_key(event.key):
+                        pass
+                    elif event.key == pygame.K_h:
+                        self.toggle_hint_mode()
+                    elif event.key == pygame.K_SPACE:
                         if self.is_playing:
                             self.handle_pause_button()
                         else:
@@ -1077,7 +1438,13 @@ class GUI:
                         self.handle_restart_button()
                     elif event.key == pygame.K_ESCAPE:
                         # ESC key - always does a full reset
-                        self.board = copy.deepcopy(self.current_board)
+                        self.hint_mode = False
+                        self.hint = None
+                        self.selected_vehicle = None
+                        self.stop_solving()
+                        self.is_solving = False
+                        self.is_improving = False
+                        self.board = self.current_board
                         self.current_move_index = 0
                         self.animation_finished = False
                         self.is_paused = False
@@ -1085,6 +1452,7 @@ class GUI:
                         self.solution_found = False
                         self.current_solution = None
                         self.animation_moves = []
+                        self.timeline = None
                         self.solver_stats = None
                         self.total_cost = 0
                         self.current_cost = 0
@@ -1095,6 +1463,23 @@ class GUI:
                     elif event.key == pygame.K_s:
                         if self.solution_found:
                             self.handle_speedup_button()
+                    elif event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                        if self.solution_found:
+                            self.handle_fine_speed(2)
+                    elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                        if self.solution_found:
+                            self.handle_fine_speed(0.5)
+                    elif event.key == pygame.K_COMMA:
+                        # ',' key - one step backwards
+                        self.step_animation(-1)
+                    elif event.key == pygame.K_PERIOD:
+                        # '.' key - one step forwards
+                        self.step_animation(1)
+                    elif event.key == pygame.K_HOME:
+                        self.step_animation(-self.current_move_index)
+                    elif event.key == pygame.K_END:
+                        if self.timeline:
+                            self.step_animation(self.timeline.last_step - self.current_move_index)
                     elif event.key == pygame.K_LEFT:
                         keys = pygame.key.get_pressed()
                         if keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT]:
@@ -1117,19 +1502,14 @@ class GUI:
                         self.handle_algorithm_selection("right")
 
             # Update animation
-            self.update_animation()
-
-            # Draw everything
-            self.draw_background()
-            self.draw_logo()
-            self.draw_road()
-            self.draw_red_car_tracker()
-            self.draw_vehicles()
-            self.draw_control_buttons()
-            self.draw_measurements_box()
-
-            pygame.display.flip()
-            clock.tick(60)  # 60 FPS
+            if self.update_animation():
+                self.needs_redraw = True
+
+            # Draw everything, only when something changed in event-driven mode
+            if self.needs_redraw or not self.event_driven:
+                self.draw_scene()
+                self.needs_redraw = False
+            clock.tick(60)  # 60 FPS at most
 
         pygame.quit()
 
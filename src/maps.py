@@ -0,0 +1,105 @@
+import os
+import random
+
+from vehicle import Vehicle
+from board import Board
+
+# Map files live next to this module, so loading does not depend on the cwd
+MAP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "map")
+MAX_MAPS = 10
+# Size of maps that do not set width/height
+DEFAULT_SIZE = 6
+
+
+def map_path(map_number: int) -> str:
+    return os.path.join(MAP_DIR, f"map{map_number:02d}.txt")
+
+
+def load_map(map_number: int):
+    """
+    Parse a numbered map file into a Board.
+    Returns None if the map is empty or does not define any vehicles.
+    """
+    return load_map_file(map_path(map_number))
+
+
+def load_map_file(path: str):
+    """Parse any map file, see parse_map."""
+    # Read and parse the map file
+    with open(path, "r") as f:
+        return parse_map(f.read())
+
+
+def parse_map(content: str):
+    """
+    Parse the content of a map file into a Board. A map defines a `vehicles`
+    list and may set `width` and `height` (6 by default).
+    Returns None if the map is empty or does not define any vehicles.
+    """
+    content = content.strip()
+    if not content:
+        return None
+
+    # this to store map content
+    local_vars = {}
+    exec(content, {"Vehicle": Vehicle}, local_vars)
+
+    if "vehicles" not in local_vars:
+        return None
+    width = local_vars.get("width", DEFAULT_SIZE)
+    height = local_vars.get("height", DEFAULT_SIZE)
+    return Board(width, height, local_vars["vehicles"])
+
+
+def format_map(board: Board) -> str:
+    """Write a board in the map file format."""
+    lines = [f"width = {board.width}", f"height = {board.height}", "vehicles = ["]
+    for v in board.vehicles:
+        lines.append(f"    Vehicle('{v.id}', {v.x}, {v.y}, {v.length}, '{v.orientation}'),")
+    lines.append("]")
+    return "\n".join(lines) + "\n"
+
+
+def random_board(width: int, height: int, density: float, seed=None) -> Board:
+    """
+    Generate a random board: the red car on the left of the exit row and
+    vehicles of length 2 and 3 placed at random until about `density` of the
+    cells are occupied. The board is not guaranteed to be solvable.
+    """
+    rng = random.Random(seed)
+    exit_row = (height - 1) // 2
+    vehicles = [Vehicle("R", 0, exit_row, 2, "H")]
+    occupied = {(0, exit_row), (1, exit_row)}
+    target = int(width * height * density)
+
+    attempts = 0
+    while len(occupied) < target and attempts < width * height * 20:
+        attempts += 1
+        length = rng.choice((2, 2, 3))
+        orientation = rng.choice("HV")
+        if orientation == "H":
+            x, y = rng.randrange(width - length + 1), rng.randrange(height)
+            # a horizontal vehicle in the exit row could never let the red car out
+            if y == exit_row:
+                continue
+            cells = {(x + i, y) for i in range(length)}
+        else:
+            x, y = rng.randrange(width), rng.randrange(height - length + 1)
+            cells = {(x, y + i) for i in range(length)}
+        if cells & occupied:
+            continue
+        occupied |= cells
+        vehicles.append(Vehicle(_vehicle_id(len(vehicles)), x, y, length, orientation))
+    return Board(width, height, vehicles)
+
+
+def _vehicle_id(index: int) -> str:
+    # A, B, ... Z (without R), then AA, AB, ...
+    letters = "ABCDEFGHIJKLMNOPQSTUVWXYZ"
+    name = ""
+    index -= 1
+    while True:
+        name = letters[index % len(letters)] + name
+        index = index // len(letters) - 1
+        if index < 0:
+            return name
@@ -1,4 +1,7 @@
 class Move:
+    # moves are immutable and interned per puzzle by Board, so they stay small
+    __slots__ = ("vehicle_id", "amount")
+
     def __init__(self, vehicle_id, amount):
         if not isinstance(vehicle_id, str):
             raise TypeError("Vehicle ID must be a string.")
@@ -8,5 +11,13 @@ class Move:
             raise ValueError("Amount must be a non-zero integer.")
         self.amount = amount
 
+    def __eq__(self, other):
+        if not isinstance(other, Move):
+            return NotImplemented
+        return self.vehicle_id == other.vehicle_id and self.amount == other.amount
+
+    def __hash__(self):
+        return hash((self.vehicle_id, self.amount))
+
     def __repr__(self):
         return f"Move(vehicle_id='{self.vehicle_id}', amount={self.amount})"
@@ -0,0 +1,179 @@
+"""
+Profile one solver run. Run it from the repository root, e.g.
+
+    python3 src/profile_solver.py --map 6 --algorithm BFS
+    python3 src/profile_solver.py --map 6 --algorithm "A*" --mode sample
+
+The default mode runs the solver under cProfile, writes the stats to
+profiles/<algorithm>-map<N>.pstats (open it with `python3 -m pstats` or
+snakeviz) and prints the functions with the highest cumulative time.
+
+cProfile only records caller/callee pairs, not whole stacks, so flame graphs
+come from the sampling mode: a background thread records the call stack of
+the solver every --interval seconds and writes them in the collapsed format
+(`frame;frame;frame count`, one stack per line) to
+profiles/<algorithm>-map<N>.collapsed, ready for flamegraph.pl, speedscope or
+inferno. Sampling adds little overhead, so it also shows where time goes in
+runs that cProfile slows down too much.
+
+Only the search run that measures time is profiled. The second run that
+measures memory under tracemalloc is skipped unless --with-memory-run is set.
+"""
+
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+import maps
+from solver import ALGORITHMS
+
+
+class StackSampler:
+    """
+    Records the call stack of one thread at a fixed interval, from a
+    background thread. Stacks are counted by their frames (outermost first),
+    frames above `root` (a code object, e.g. the function that started the
+    run) are left out.
+    """
+
+    def __init__(self, interval: float = 0.001, root=None):
+        self.interval = interval
+        self.root = root
+        self.stacks = Counter()
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = None
+        self._switch_interval = None
+
+    def start(self):
+        # the sampler only runs when the solver thread releases the GIL,
+        # which it does every switch interval (5 ms by default)
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval / 2))
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None and frame.f_code is not self.root:
+                stack.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def write_collapsed(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+
+    def top(self, limit: int):
+        """(frame, samples on the stack, samples in the frame itself), most samples first."""
+        total = Counter()
+        own = Counter()
+        for stack, count in self.stacks.items():
+            for frame in set(stack):
+                total[frame] += count
+            own[stack[-1]] += count
+        return [(frame, count, own[frame]) for frame, count in total.most_common(limit)]
+
+
+def frame_label(code) -> str:
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def run(solver):
+    """The profiled part, the solver's own solve()."""
+    return solver.solve()
+
+
+def profile_cprofile(solver, path: str, top: int, restrict):
+    profiler = cProfile.Profile()
+    profiler.enable()
+    solution = run(solver)
+    profiler.disable()
+    profiler.dump_stats(path)
+
+    stats = pstats.Stats(profiler)
+    stats.strip_dirs().sort_stats("cumulative")
+    stats.print_stats(*([restrict] if restrict else []), top)
+    return solution
+
+
+def profile_sampling(solver, path: str, top: int, interval: float):
+    sampler = StackSampler(interval, root=run.__code__)
+    sampler.start()
+    try:
+        solution = run(solver)
+    finally:
+        sampler.stop()
+    sampler.write_collapsed(path)
+
+    samples = sum(sampler.stacks.values())
+    print(f"{samples} samples, every {interval * 1000:g} ms")
+    print(f"{'total':>7} {'self':>7}  function")
+    for frame, count, own in sampler.top(top):
+        print(f"{count / samples:7.1%} {own / samples:7.1%}  {frame}")
+    return solution
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile a solver run on a map.")
+    parser.add_argument("--map", type=int, default=1, help=f"map number (1-{maps.MAX_MAPS})")
+    parser.add_argument("--map-file", help="profile this map file instead of a numbered map")
+    parser.add_argument("--algorithm", default="A*", choices=list(ALGORITHMS))
+    parser.add_argument("--mode", choices=["cprofile", "sample"], default="cprofile")
+    parser.add_argument(
+        "--interval", type=float, default=0.001, help="seconds between samples (sample mode)"
+    )
+    parser.add_argument("--top", type=int, default=25, help="number of functions listed")
+    parser.add_argument("--filter", help="only list functions matching this regex (cprofile mode)")
+    parser.add_argument("--output", default="profiles", help="directory of the written files")
+    parser.add_argument(
+        "--with-memory-run", action="store_true", help="also profile the tracemalloc run"
+    )
+    args = parser.parse_args()
+
+    if args.map_file:
+        board = maps.load_map_file(args.map_file)
+        name = os.path.splitext(os.path.basename(args.map_file))[0]
+    else:
+        board = maps.load_map(args.map)
+        name = f"map{args.map}"
+    if board is None:
+        parser.error(f"map {args.map_file or args.map} does not define any vehicles")
+
+    solver = ALGORITHMS[args.algorithm](board)
+    solver.measure_memory = args.with_memory_run
+
+    os.makedirs(args.output, exist_ok=True)
+    algorithm = args.algorithm.lower().replace("*", "star")
+    extension = "pstats" if args.mode == "cprofile" else "collapsed"
+    path = os.path.join(args.output, f"{algorithm}-{name}.{extension}")
+
+    start = time.perf_counter()
+    if args.mode == "cprofile":
+        solution = profile_cprofile(solver, path, args.top, args.filter)
+    else:
+        solution = profile_sampling(solver, path, args.top, args.interval)
+    elapsed = time.perf_counter() - start
+
+    result = "no solution" if solution is None else f"{len(solution)} moves"
+    print(f"{args.algorithm} on {name}: {result}, {solver.nodes_expanded} nodes, {elapsed:.2f} s")
+    print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+"""
+Local HTTP/JSON solver service. Run it from the repository root, e.g.
+
+    python3 src/service.py --port 8765 --workers 4
+
+and post puzzles to it:
+
+    curl -s localhost:8765/solve -d '{"map": 5, "algorithm": "A*"}'
+
+Endpoints:
+
+    GET  /health      {"status": "ok", "workers": ..., "in_flight": ...}
+    GET  /algorithms  the accepted algorithm names
+    POST /solve       solve one puzzle, see below
+
+A /solve request is a JSON object with either "map" (a numbered map) or
+"board" ({"width": 6, "height": 6, "vehicles": [[id, x, y, length,
+orientation], ...]}, the red car first), and optionally "algorithm" (A* by
+default), "timeout" in seconds, "optimize", "max_nodes" (SMA* only) and
+"measure_memory" (also run the tracemalloc search, which doubles the
+latency). Map files are Python code, so they are never accepted over HTTP.
+
+The answer has "status" ("solved", "unsolvable", "timeout" or, for SMA*,
+"memory_limit" when max_nodes is too small for the puzzle), "solution"
+(a list of {"vehicle_id", "amount"}), "cost", the solver's "stats" and
+"coalesced", which tells whether the result was shared with an identical
+request.
+
+Solvers run in a process pool, so the event loop keeps serving requests
+while they search. Concurrent requests for the same canonical board (the
+same grid, whatever the vehicle labels are) with the same algorithm and
+options are coalesced: only the first one is solved, and the others get its
+solution translated to their own labels, as long as the first search has
+at least as much time left as the new request's budget. Every request has a
+time budget:
+the solver gets it as its timeout where it has one, the worker process
+interrupts the search when it is exceeded (SIGALRM, where available), and
+the request stops waiting for it in any case.
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import signal
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import maps
+from board import Board
+from solver import ALGORITHMS
+from solver.cluster import cluster_layout
+from vehicle import Vehicle
+
+DEFAULT_TIMEOUT = 30.0
+# extra time a request waits for its worker after the budget, for the answer to arrive
+TIMEOUT_GRACE = 1.0
+MAX_BODY_SIZE = 1 << 20
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class RequestError(Exception):
+    """A request the service cannot handle, answered with the given HTTP status."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+# --- worker side ---
+
+
+def _alarm(signum, frame):
+    raise BudgetExceeded()
+
+
+def init_worker():
+    if hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, _alarm)
+
+
+def solve_job(board: Board, algorithm: str, options: dict, timeout: float) -> dict:
+    """Run one solver in a worker process, stopped after timeout seconds."""
+    solver_class = ALGORITHMS[algorithm]
+    if options.get("max_nodes") is not None:
+        solver = solver_class(board, max_nodes=options["max_nodes"])
+    else:
+        solver = solver_class(board)
+    # the memory run doubles the latency, it is only done on request
+    solver.measure_memory = options.get("measure_memory", False)
+
+    solve_args = {}
+    if "timeout" in inspect.signature(solver.solve).parameters:
+        solve_args["timeout"] = timeout
+
+    has_alarm = hasattr(signal, "SIGALRM")
+    if has_alarm:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    start = time.perf_counter()
+    try:
+        solution = solver.solve(**solve_args)
+        if solution and options.get("optimize"):
+            solution = solver.optimize_solution()
+    except BudgetExceeded:
+        # the search may have been interrupted during its memory run
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return {"status": "timeout", "solution": None, "cost": None, "stats": None}
+    finally:
+        if has_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    if solution is None:
+        # solvers with a timeout return None both when they run out of time and
+        # when the puzzle has no solution
+        timed_out = bool(solve_args) and time.perf_counter() - start >= timeout
+        if getattr(solver, "stuck", False):
+            status = "memory_limit"
+        else:
+            status = "timeout" if timed_out else "unsolvable"
+    else:
+        status = "solved"
+    return {
+        "status": status,
+        "solution": None if solution is None else [
+            [move.vehicle_id, move.amount] for move in solution
+        ],
+        "cost": solver.step_g_costs[-1] if solution is not None else None,
+        "stats": solver.get_stats(),
+    }
+
+
+# --- service side ---
+
+
+def parse_board(request: dict) -> Board:
+    if "map" in request:
+        number = request["map"]
+        valid = isinstance(number, int) and not isinstance(number, bool)
+        if not valid or not 1 <= number <= maps.MAX_MAPS:
+            raise RequestError(f"map must be a number from 1 to {maps.MAX_MAPS}")
+        board = maps.load_map(number)
+        if board is None:
+            raise RequestError(f"map {number} does not define any vehicles")
+        return board
+
+    spec = request.get("board")
+    if not isinstance(spec, dict):
+        raise RequestError('the request needs a "map" number or a "board"')
+    try:
+        vehicles = [Vehicle(*fields) for fields in spec["vehicles"]]
+        width = spec.get("width", maps.DEFAULT_SIZE)
+        height = spec.get("height", maps.DEFAULT_SIZE)
+        return Board(width, height, vehicles)
+    except (KeyError, TypeError, ValueError) as error:
+        raise RequestError(f"invalid board: {error}")
+
+
+def board_key(board: Board):
+    """
+    Identifies a board up to vehicle labels: its cluster signature (size,
+    length, orientation and lane of every vehicle) and the position of every
+    vehicle. Boards with the same key have vehicles at exactly the same
+    cells.
+    """
+    signature, _, state = cluster_layout(board)
+    return signature, state
+
+
+def translate_solution(solution, source: Board, target: Board):
+    """
+    Rename the vehicles of a solution of `source` to those of `target`, a
+    board with the same board_key: both boards have a vehicle at the same
+    cells for every vehicle, only the labels differ.
+    """
+    if solution is None:
+        return None
+    by_position = {(v.x, v.y, v.length, v.orientation): v.id for v in target.vehicles}
+    rename = {
+        v.id: by_position[(v.x, v.y, v.length, v.orientation)] for v in source.vehicles
+    }
+    return [[rename[vehicle_id], amount] for vehicle_id, amount in solution]
+
+
+class SolverService:
+    def __init__(self, workers: int = 2, max_timeout: float = 300.0):
+        self.workers = workers
+        self.max_timeout = max_timeout
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+        # coalescing key -> (board of the first request, future of its result,
+        # time its budget runs out)
+        self.in_flight = {}
+        self.coalesced = 0
+
+    async def solve(self, request: dict) -> dict:
+        board = parse_board(request)
+        algorithm = request.get("algorithm", "A*")
+        if algorithm not in ALGORITHMS:
+            raise RequestError(f"unknown algorithm {algorithm!r}")
+        timeout = request.get("timeout", DEFAULT_TIMEOUT)
+        # bool is an int subclass, but true is no number of seconds
+        if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+            raise RequestError("timeout must be a positive number of seconds")
+        timeout = min(timeout, self.max_timeout)
+        options = {
+            "optimize": bool(request.get("optimize", False)),
+            "max_nodes": request.get("max_nodes"),
+            "measure_memory": bool(request.get("measure_memory", False)),
+        }
+        if options["max_nodes"] is not None:
+            if algorithm != "SMA*":
+                raise RequestError("max_nodes only applies to SMA*")
+            max_nodes = options["max_nodes"]
+            if isinstance(max_nodes, bool) or not isinstance(max_nodes, int) or max_nodes < 1:
+                raise RequestError("max_nodes must be a positive number")
+
+        key = (board_key(board), algorithm, tuple(sorted(options.items())))
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        entry = self.in_flight.get(key)
+        # a search that gives up before this request's budget ends cannot answer it
+        coalesced = entry is not None and entry[2] >= deadline
+        if coalesced:
+            self.coalesced += 1
+            source, future, _ = entry
+        else:
+            source = board
+            future = loop.run_in_executor(
+                self.pool, solve_job, board, algorithm, options, timeout
+            )
+            # later identical requests join the search that runs the longest
+            entry = (board, future, deadline)
+            self.in_flight[key] = entry
+            future.add_done_callback(lambda _: self._finished(key, entry))
+
+        try:
+            # shielded, so a request that gives up does not cancel a shared search
+            result = await asyncio.wait_for(asyncio.shield(future), timeout + TIMEOUT_GRACE)
+        except asyncio.TimeoutError:
+            result = {"status": "timeout", "solution": None, "cost": None, "stats": None}
+
+        solution = translate_solution(result["solution"], source, board)
+        return {
+            "status": result["status"],
+            "algorithm": algorithm,
+            "solution": None if solution is None else [
+                {"vehicle_id": vehicle_id, "amount": amount} for vehicle_id, amount in solution
+            ],
+            "cost": result["cost"],
+            "stats": result["stats"],
+            "coalesced": coalesced,
+        }
+
+    def _finished(self, key, entry):
+        if self.in_flight.get(key) is entry:
+            del self.in_flight[key]
+
+    async def route(self, method: str, path: str, body: bytes):
+        if path == "/health":
+            return {
+                "status": "ok",
+                "workers": self.workers,
+                "in_flight": len(self.in_flight),
+                "coalesced": self.coalesced,
+            }
+        if path == "/algorithms":
+            return {"algorithms": list(ALGORITHMS)}
+        if path == "/solve":
+            if method != "POST":
+                raise RequestError("use POST for /solve", 405)
+            try:
+                request = json.loads(body or b"{}")
+            except ValueError as error:
+                raise RequestError(f"invalid JSON: {error}")
+            if not isinstance(request, dict):
+                raise RequestError("the request must be a JSON object")
+            return await self.solve(request)
+        raise RequestError(f"no such endpoint {path}", 404)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            status, response = 200, None
+            try:
+                method, path, body = await read_request(reader)
+                response = await self.route(method, path, body)
+            except RequestError as error:
+                status, response = error.status, {"error": str(error)}
+            except Exception as error:
+                status, response = 500, {"error": f"{type(error).__name__}: {error}"}
+            write_response(writer, status, response)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+async def read_request(reader: asyncio.StreamReader):
+    """Minimal HTTP/1.1 request parsing: request line, headers and a Content-Length body."""
+    request_line = (await reader.readline()).decode("latin-1").split()
+    if len(request_line) != 3:
+        raise RequestError("malformed request line")
+    method, target, _ = request_line
+
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise RequestError("Content-Length must be a number") from None
+    if length < 0:
+        raise RequestError("Content-Length must not be negative")
+    if length > MAX_BODY_SIZE:
+        raise RequestError("request body too large", 413)
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target.split("?", 1)[0], body
+
+
+def write_response(writer: asyncio.StreamWriter, status: int, response: dict):
+    body = json.dumps(response).encode()
+    head = (
+        f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+async def serve(host: str, port: int, workers: int, max_timeout: float):
+    service = SolverService(workers, max_timeout)
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Solver service on http://{host}:{port} with {workers} workers")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON Rush Hour solver service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=2, help="solver processes")
+    parser.add_argument(
+        "--max-timeout", type=float, default=300.0, help="upper limit of a request's timeout"
+    )
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.max_timeout))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Command line solver, e.g.
+
+    python3 src/solve.py --map 4 --algorithm "A*"
+
+Only the solver package and the map loader are imported, pygame is not needed.
+"""
+
+import argparse
+import json
+
+import maps
+from solver import ALGORITHMS, AStarSolver
+from solver.heuristics import HEURISTICS
+from solver.trace import TraceRecorder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve a Rush Hour map without the GUI.")
+    parser.add_argument("--map", type=int, default=1, help=f"map number (1-{maps.MAX_MAPS})")
+    parser.add_argument("--map-file", help="solve this map file instead of a numbered map")
+    parser.add_argument("--algorithm", default="A*", choices=list(ALGORITHMS))
+    parser.add_argument("--max-nodes", type=int, help="node limit of SMA* (default 100000)")
+    parser.add_argument(
+        "--heuristic",
+        choices=list(HEURISTICS),
+        help="heuristic of A*, ARA* and SMA* (default legacy, max for ARA* and SMA*)",
+    )
+    parser.add_argument(
+        "--optimize", action="store_true", help="shorten the solution with the post-processing pass"
+    )
+    parser.add_argument(
+        "--instrument", action="store_true", help="time every phase of the search"
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="write the expansion order to FILE (JSON lines if it ends in .jsonl, else binary)",
+    )
+    parser.add_argument(
+        "--trace-capacity", type=int, default=1_000_000, help="expansions kept by --trace"
+    )
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+
+    if args.map_file:
+        board = maps.load_map_file(args.map_file)
+    else:
+        board = maps.load_map(args.map)
+    if board is None:
+        parser.error(f"map {args.map_file or args.map} does not define any vehicles")
+
+    if args.max_nodes is not None and args.algorithm != "SMA*":
+        parser.error("--max-nodes only applies to SMA*")
+    if args.heuristic is not None and not issubclass(ALGORITHMS[args.algorithm], AStarSolver):
+        parser.error(f"{args.algorithm} has no heuristic to choose")
+    options = {}
+    if args.max_nodes is not None:
+        options["max_nodes"] = args.max_nodes
+    if args.heuristic is not None:
+        options["heuristic"] = args.heuristic
+    solver = ALGORITHMS[args.algorithm](board, **options)
+
+    if hasattr(solver, "on_solution") and not args.json:
+        # anytime solvers report every improved solution as soon as it is found
+        solver.on_solution = lambda solution, cost, bound: print(
+            f"Found {len(solution)} moves, cost {cost} "
+            + ("(no bound, the heuristic is not admissible)" if bound is None
+               else f"(at most {bound:.2f}x the optimum)")
+        )
+    solver.instrument = args.instrument
+    if args.trace:
+        solver.trace = TraceRecorder(args.trace_capacity)
+    solution = solver.solve()
+    if args.trace:
+        if args.trace.endswith(".jsonl"):
+            solver.trace.write_jsonl(args.trace)
+        else:
+            solver.trace.write_binary(args.trace)
+    if args.optimize:
+        solution = solver.optimize_solution()
+    stats = solver.get_stats()
+
+    if args.json:
+        print(json.dumps({
+            "map": args.map_file or args.map,
+            "algorithm": args.algorithm,
+            "solution": None if solution is None else [
+                {"vehicle_id": move.vehicle_id, "amount": move.amount} for move in solution
+            ],
+            "stats": stats,
+        }))
+        return
+
+    if solution is None:
+        print("No solution found.")
+    else:
+        print(f"Solution ({len(solution)} moves, cost {solver.step_g_costs[-1]}):")
+        for move in solution:
+            print(f"  {move.vehicle_id} {move.amount:+d}")
+    for name, value in stats.items():
+        if name == "instrumentation":
+            print("phases:")
+            for phase, timing in value["phases"].items():
+                print(
+                    f"  {phase}: {timing['calls']} calls, {timing['time_ms']:.1f} ms "
+                    f"({timing['share']:.0%})"
+                )
+            for counter, count in value["counters"].items():
+                print(f"{counter}: {count}")
+        elif name == "memory_breakdown":
+            print(f"memory_breakdown (peak, {value['samples']} samples):")
+            for structure, peak in value["structures"].items():
+                print(
+                    f"  {structure}: {peak['peak_entries']} entries, {peak['peak_kb']:.1f} KB"
+                )
+            print(f"  total: {value['peak_total_kb']:.1f} KB")
+        elif name == "optimization":
+            print(
+                f"optimized: {value['original_moves']} -> {value['optimized_moves']} moves, "
+                f"cost {value['original_cost']} -> {value['optimized_cost']}"
+            )
+        else:
+            print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,4 +2,18 @@ from .algorithms.ucs import UCSSolver
 from .algorithms.bfs import BFSSolver
 from .algorithms.dfs import DFSSolver
 from .algorithms.ids import IDSSolver
-from .algorithms.astar import AStarSolver
\ No newline at end of file
+from .algorithms.astar import AStarSolver
+from .algorithms.smastar import SMAStarSolver
+from .algorithms.arastar import AnytimeAStarSolver
+from .cluster import ClusterSolver, solve_batch
+
+# Solvers by the name shown in the GUI and accepted by the command line tools
+ALGORITHMS = {
+    "BFS": BFSSolver,
+    "DFS": DFSSolver,
+    "UCS": UCSSolver,
+    "IDS": IDSSolver,
+    "A*": AStarSolver,
+    "SMA*": SMAStarSolver,
+    "ARA*": AnytimeAStarSolver,
+}
@@ -0,0 +1,256 @@
+import sys
+import time
+import tracemalloc
+
+from .astar import AStarSolver
+from ..canonical import Canonicalizer
+from ..memory import board_size, estimate, parent_entry_size, value_entry_size
+from ..priority_queue import HeapQueue
+from ..heuristics import ADMISSIBLE_HEURISTICS
+from board import Board
+
+
+class AnytimeAStarSolver(AStarSolver):
+    """
+    Anytime Repairing A* (ARA*).
+
+    The first search orders the frontier by g + w * h with a large weight w,
+    which finds a solution quickly. The weight is then decreased step by step
+    down to 1. Each search continues from the frontier of the previous one:
+    states whose cost improved after they were expanded are kept in an
+    INCONS list and are the only ones expanded again, so earlier work is
+    reused instead of starting over.
+
+    Every improved solution is appended to `solutions` as (moves, cost,
+    bound) and passed to `on_solution(moves, cost, bound)` if it is set. The
+    bound is how far the cost can be above the optimum (cost <= bound *
+    optimal cost). It only holds if the heuristic never overestimates, so
+    it is None with a heuristic that is not in ADMISSIBLE_HEURISTICS. The
+    default heuristic, "max", is admissible.
+    """
+
+    def __init__(
+        self,
+        board: Board,
+        weights=(5.0, 3.0, 2.0, 1.5, 1.0),
+        on_solution=None,
+        heuristic: str = "max",
+    ):
+        super().__init__(board, heuristic=heuristic)
+        self.bound_proven = heuristic in ADMISSIBLE_HEURISTICS
+        self.weights = weights
+        self.on_solution = on_solution
+        self.solutions = []
+
+    def _search(self, timeout: float, profile_memory: bool, publish: bool):
+        """Internal search function containing the core ARA* logic."""
+        nodes_expanded_this_run = 0
+
+        if profile_memory:
+            tracemalloc.start()
+            tracemalloc.clear_traces()
+
+        start_time = time.perf_counter()
+
+        # hot-path functions, timed per phase if instrumentation is enabled
+        instrumentation = self._instrumentation(profile_memory)
+        get_moves = instrumentation.wrap("move_generation", Board.get_possible_moves)
+        apply_move = instrumentation.wrap("apply_move", Board.apply_move)
+        heuristic = instrumentation.wrap("heuristic", self._finite_heuristic)
+        # states are identified by their label-independent key
+        state_key = instrumentation.wrap("state_hashing", Canonicalizer(self.board).key)
+        vehicle_lengths = self._get_vehicle_map(self.board)
+
+        initial_board_key = state_key(self.board)
+        came_from = {initial_board_key: (None, None)}
+        g_cost_so_far = {initial_board_key: 0}
+        h_costs = {initial_board_key: heuristic(self.board)}
+
+        # frontier states, their queue is rebuilt whenever the weight changes
+        open_boards = {initial_board_key: self.board}
+        # states that improved after being expanded in the current search
+        incons = {}
+        # a dead start board is reported as unsolvable without searching
+        if self._start_is_dead():
+            open_boards.clear()
+
+        # best solution so far (the goal with the lowest g seen)
+        goal_key = initial_board_key if self.board.is_solved() else None
+        goal_cost = 0 if goal_key is not None else float("inf")
+        published_cost = float("inf")
+        solutions = []
+        timed_out = False
+        duplicate_hits = 0
+        reopenings = 0
+
+        # peak size of each structure, sampled every memory.interval expansions
+        memory = self._memory_accounting(profile_memory)
+        # the boards of open states are counted in the frontier
+        memory.track("open", lambda: estimate(open_boards, sys.getsizeof))
+        memory.track("incons", lambda: estimate(
+            incons, lambda item: sys.getsizeof(item[0]) + board_size(item[1]), incons.items()
+        ))
+        memory.track(
+            "visited", lambda: estimate(g_cost_so_far, value_entry_size, g_cost_so_far.items())
+        )
+        memory.track("heuristic", lambda: estimate(h_costs, value_entry_size, h_costs.items()))
+        memory.track("parents", lambda: estimate(came_from, parent_entry_size, came_from.items()))
+
+        # expansion order over all weights, if self.trace is set
+        trace = self._trace_recorder(profile_memory)
+        # state key -> depth, only kept while tracing
+        depths = {initial_board_key: 0}
+
+        for weight in self.weights:
+            frontier = HeapQueue()
+            push = instrumentation.wrap("queue_push", frontier.push)
+            pop = instrumentation.wrap("queue_pop", frontier.pop)
+            memory.track("frontier", lambda frontier=frontier: frontier.estimate_size(board_size))
+            for key, board in open_boards.items():
+                g_cost = g_cost_so_far[key]
+                push(g_cost + weight * h_costs[key], key, board, tie=g_cost)
+            closed = set()
+
+            # improve the solution until no frontier state can beat it
+            while frontier:
+                if self.cancelled:
+                    break
+                if nodes_expanded_this_run % 1000 == 0:
+                    if time.perf_counter() - start_time > timeout:
+                        timed_out = True
+                        break
+
+                priority, current_board_key, current_board = frontier.peek()
+                if priority >= goal_cost:
+                    break
+                pop()
+                del open_boards[current_board_key]
+                closed.add(current_board_key)
+                nodes_expanded_this_run += 1
+                if nodes_expanded_this_run % memory.interval == 0:
+                    memory.sample()
+
+                g_cost = g_cost_so_far[current_board_key]
+                if trace is not None:
+                    depth = depths[current_board_key]
+                    trace(
+                        current_board_key,
+                        came_from[current_board_key][0],
+                        g_cost,
+                        h_costs[current_board_key],
+                        depth,
+                    )
+                for move in get_moves(current_board):
+                    new_g_cost = g_cost + vehicle_lengths[move.vehicle_id] * abs(move.amount)
+                    new_board = apply_move(current_board, move)
+                    new_board_key = state_key(new_board)
+                    if new_g_cost >= g_cost_so_far.get(new_board_key, float("inf")):
+                        duplicate_hits += 1
+                        continue
+
+                    g_cost_so_far[new_board_key] = new_g_cost
+                    came_from[new_board_key] = (current_board_key, move)
+                    if trace is not None:
+                        depths[new_board_key] = depth + 1
+                    if new_board.is_solved():
+                        if new_g_cost < goal_cost:
+                            goal_key, goal_cost = new_board_key, new_g_cost
+                        continue
+
+                    if new_board_key in closed:
+                        # expanded already, it is searched again by the next weight
+                        reopenings += 1
+                        incons[new_board_key] = new_board
+                        continue
+                    if new_board_key not in h_costs:
+                        h_costs[new_board_key] = heuristic(new_board)
+                    open_boards[new_board_key] = new_board
+                    push(
+                        new_g_cost + weight * h_costs[new_board_key],
+                        new_board_key,
+                        new_board,
+                        tie=new_g_cost,
+                    )
+
+            open_boards.update(incons)
+            incons.clear()
+
+            if goal_key is not None:
+                # lowest f of any state that could still lead to a better solution
+                lower_bound = min(
+                    (g_cost_so_far[key] + h_costs[key] for key in open_boards),
+                    default=goal_cost,
+                )
+                bound = min(weight, goal_cost / lower_bound) if lower_bound > 0 else weight
+                bound = max(bound, 1.0)
+                # without an admissible heuristic the bound proves nothing
+                reported_bound = bound if self.bound_proven else None
+
+                if goal_cost < published_cost:
+                    published_cost = goal_cost
+                    path = self._path_construct(came_from, goal_key)
+                    solutions.append((path, goal_cost, reported_bound))
+                    if publish:
+                        self.search_time = time.perf_counter() - start_time
+                        self.nodes_expanded = nodes_expanded_this_run
+                        self.solutions = list(solutions)
+                        if self.on_solution is not None:
+                            self.on_solution(path, goal_cost, reported_bound)
+                elif solutions and self.bound_proven:
+                    # same solution, but proven to be closer to the optimum
+                    path, cost, previous_bound = solutions[-1]
+                    solutions[-1] = (path, cost, min(previous_bound, bound))
+
+                if bound <= 1.0:
+                    break
+
+            if timed_out:
+                print("Timeout reached before the optimal solution was proven.")
+                break
+            if self.cancelled:
+                break
+
+        search_time = time.perf_counter() - start_time
+        instrumentation.add("duplicate_hits", duplicate_hits)
+        instrumentation.add("reopenings", reopenings)
+        memory.sample()
+
+        peak_memory_kb = 0.0
+        if profile_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peak_memory_kb = peak / 1024
+
+        if publish:
+            self.solutions = solutions
+        solution_path = solutions[-1][0] if solutions else None
+        return solution_path, search_time, peak_memory_kb, nodes_expanded_this_run
+
+    def solve(self, timeout: float = 60.0):
+        """
+        Solves the puzzle with a decreasing heuristic weight. Returns the best
+        solution found within timeout seconds, the optimal one if there was
+        enough time.
+        """
+        # this run measures search time and publishes the solutions
+        solution, search_time, _, nodes_expanded = self._search(
+            timeout, profile_memory=False, publish=True
+        )
+
+        self.solution = solution
+        self.search_time = search_time
+        self.nodes_expanded = nodes_expanded
+        self.memory_usage = 0.0
+
+        if self.measure_memory and not self.cancelled:
+            _, _, peak_memory, _ = self._search(timeout, profile_memory=True, publish=False)
+            self.memory_usage = peak_memory
+
+        self._compute_step_costs()
+        return self.solution
+
+    def get_stats(self):
+        stats = super().get_stats()
+        stats["solutions_found"] = len(self.solutions)
+        stats["suboptimality_bound"] = self.solutions[-1][2] if self.solutions else None
+        return stats
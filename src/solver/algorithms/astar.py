@@ -1,13 +1,28 @@
 from collections import deque
 import time
-import heapq
 import tracemalloc
 
 from ..base import Solver
+from ..canonical import Canonicalizer
+from ..heuristics import HEURISTICS, BitboardHeuristics
+from ..memory import board_size, estimate, parent_entry_size, value_entry_size
+from ..priority_queue import QUEUES
 from board import Board
 
 
 class AStarSolver(Solver):
+    def __init__(self, board: Board, queue: str = "bucket", heuristic: str = "legacy"):
+        """
+        queue selects the frontier implementation, "bucket" or "heap", and
+        heuristic one of HEURISTICS (see solver/heuristics.py).
+        """
+        super().__init__(board)
+        self.queue_class = QUEUES[queue]
+        self.heuristic = heuristic
+        if HEURISTICS[heuristic] is not None:
+            # bound to this puzzle's tables, shadows the legacy _heuristic below
+            self._heuristic = HEURISTICS[heuristic].__get__(BitboardHeuristics(board))
+
     def _search(self, profile_memory: bool):
         """Internal search function containing the core A* logic."""
         nodes_expanded_this_run = 0
@@ -16,58 +31,97 @@ class AStarSolver(Solver):
             tracemalloc.start()
             tracemalloc.clear_traces()
 
-        start_time = time.time()
+        start_time = time.perf_counter()
 
-        initial_board = self.board
-        initial_board_repr = repr(initial_board)
-
-        counter = 0
-        h_cost = self._heuristic(initial_board)
-        frontier = [
-            (h_cost, 0, counter, initial_board)
-        ]  # (f_cost, g_cost, counter, board)
+        # hot-path functions, timed per phase if instrumentation is enabled
+        instrumentation = self._instrumentation(profile_memory)
+        get_moves = instrumentation.wrap("move_generation", Board.get_possible_moves)
+        apply_move = instrumentation.wrap("apply_move", Board.apply_move)
+        heuristic = instrumentation.wrap("heuristic", self._heuristic)
+        # states are identified by their label-independent key
+        state_key = instrumentation.wrap("state_hashing", Canonicalizer(self.board).key)
 
-        came_from = {initial_board_repr: (None, None)}
-        g_cost_so_far = {initial_board_repr: 0}
+        initial_board = self.board
+        initial_board_key = state_key(initial_board)
+
+        # one entry per state: priority = f_cost, key = state key, item = board
+        # ties on f_cost are popped LIFO (bucket) or by lowest g_cost (heap)
+        frontier = self.queue_class()
+        push = instrumentation.wrap("queue_push", frontier.push)
+        pop = instrumentation.wrap("queue_pop", frontier.pop)
+        # a dead start board is reported as unsolvable without searching
+        initial_h_cost = heuristic(initial_board)
+        if not self._start_is_dead():
+            push(initial_h_cost, initial_board_key, initial_board)
+
+        came_from = {initial_board_key: (None, None)}
+        g_cost_so_far = {initial_board_key: 0}
+
+        # expansion order, if self.trace is set
+        trace = self._trace_recorder(profile_memory)
+        # state key -> (h, depth), only kept while tracing
+        trace_info = {initial_board_key: (initial_h_cost, 0)}
+
+        # peak size of each structure, sampled every memory.interval expansions
+        memory = self._memory_accounting(profile_memory)
+        memory.track("frontier", lambda: frontier.estimate_size(board_size))
+        memory.track(
+            "visited", lambda: estimate(g_cost_so_far, value_entry_size, g_cost_so_far.items())
+        )
+        memory.track("parents", lambda: estimate(came_from, parent_entry_size, came_from.items()))
 
         solution_path = None
+        duplicate_hits = 0
+        reopenings = 0
 
         while frontier:
-            _, g_cost, _, current_board = heapq.heappop(frontier)
-            current_board_repr = repr(current_board)
-
-            if g_cost > g_cost_so_far[current_board_repr]:
-                continue
-
+            if self.cancelled:
+                break
+            # the queue updates entries in place, so nothing popped is stale
+            _, current_board_key, current_board = pop()
+            g_cost = g_cost_so_far[current_board_key]
             nodes_expanded_this_run += 1
+            if trace is not None:
+                h_cost, depth = trace_info[current_board_key]
+                trace(current_board_key, came_from[current_board_key][0], g_cost, h_cost, depth)
+            if nodes_expanded_this_run % memory.interval == 0:
+                memory.sample()
 
             if current_board.is_solved():
-                solution_path = self._path_construct(came_from, current_board_repr)
+                solution_path = self._path_construct(came_from, current_board_key)
                 break
 
             current_vehicle_map = self._get_vehicle_map(current_board)
 
-            for move in current_board.get_possible_moves():
+            for move in get_moves(current_board):
                 move_cost = current_vehicle_map[move.vehicle_id] * abs(move.amount)
                 new_g_cost = g_cost + move_cost
 
-                new_board = current_board.apply_move(move)
-                new_board_repr = repr(new_board)
+                new_board = apply_move(current_board, move)
+                new_board_key = state_key(new_board)
+
+                old_g_cost = g_cost_so_far.get(new_board_key)
+                if old_g_cost is not None:
+                    if new_g_cost >= old_g_cost:
+                        duplicate_hits += 1
+                        continue
+                    # reached again more cheaply, it goes back on the frontier
+                    reopenings += 1
 
-                if (
-                    new_board_repr not in g_cost_so_far
-                    or new_g_cost < g_cost_so_far[new_board_repr]
-                ):
-                    g_cost_so_far[new_board_repr] = new_g_cost
-                    came_from[new_board_repr] = (current_board_repr, move)
+                g_cost_so_far[new_board_key] = new_g_cost
+                came_from[new_board_key] = (current_board_key, move)
 
-                    h_cost = self._heuristic(new_board)
-                    f_cost = new_g_cost + h_cost
+                h_cost = heuristic(new_board)
+                f_cost = new_g_cost + h_cost
 
-                    counter += 1
-                    heapq.heappush(frontier, (f_cost, new_g_cost, counter, new_board))
+                push(f_cost, new_board_key, new_board, tie=new_g_cost)
+                if trace is not None:
+                    trace_info[new_board_key] = (h_cost, depth + 1)
 
-        search_time = time.time() - start_time
+        search_time = time.perf_counter() - start_time
+        instrumentation.add("duplicate_hits", duplicate_hits)
+        instrumentation.add("reopenings", reopenings)
+        memory.sample()
 
         peak_memory_kb = 0.0
         if profile_memory:
@@ -87,14 +141,22 @@ class AStarSolver(Solver):
         self.memory_usage = 0.0
 
         # --- Run 2: The "profiled" run ---
-        _, _, peak_memory, _ = self._search(profile_memory=True)
-        self.memory_usage = peak_memory
+        if self.measure_memory and not self.cancelled:
+            _, _, peak_memory, _ = self._search(profile_memory=True)
+            self.memory_usage = peak_memory
 
+        self._compute_step_costs()
         return self.solution
 
     def _get_vehicle_map(self, board: Board) -> dict[str, int]:
         return {vehicle.id: vehicle.length for vehicle in board.vehicles}
 
+    def _finite_heuristic(self, board: Board) -> int:
+        # the heuristic returns inf for boards it cannot bound, searches that
+        # give inf another meaning (or multiply h) use h = 0 for those instead
+        h_cost = self._heuristic(board)
+        return 0 if h_cost == float("inf") else h_cost
+
     """""
     def _heuristic(self, board: Board, vehicle_map: dict[str, int]) -> int:
         """ """
@@ -225,11 +287,11 @@ class AStarSolver(Solver):
 
         return total_clearing_cost
 
-    def _path_construct(self, came_from: dict, current_board_repr: str):
+    def _path_construct(self, came_from: dict, current_board_key: str):
         path = []
-        while current_board_repr is not None:
-            parent_repr, move = came_from.get(current_board_repr)
+        while current_board_key is not None:
+            parent_key, move = came_from.get(current_board_key)
             if move:
                 path.append(move)
-            current_board_repr = parent_repr
+            current_board_key = parent_key
         return path[::-1]
@@ -1,8 +1,12 @@
+import sys
 import time
 import tracemalloc
 from collections import deque
 
 from ..base import Solver
+from ..canonical import Canonicalizer
+from ..memory import board_entry_size, estimate, estimate_paths
+from board import Board
 
 
 class BFSSolver(Solver):
@@ -18,33 +22,72 @@ class BFSSolver(Solver):
             tracemalloc.start()
             tracemalloc.clear_traces()
 
-        start_time = time.time()
+        start_time = time.perf_counter()
+
+        # hot-path functions, timed per phase if instrumentation is enabled
+        instrumentation = self._instrumentation(profile_memory)
+        get_moves = instrumentation.wrap("move_generation", Board.get_possible_moves)
+        apply_move = instrumentation.wrap("apply_move", Board.apply_move)
+        # states are identified by their label-independent key
+        state_key = instrumentation.wrap("state_hashing", Canonicalizer(self.board).key)
 
         queue = deque([(self.board, [])])
-        visited = {repr(self.board)}
+        push = instrumentation.wrap("queue_push", queue.append)
+        pop = instrumentation.wrap("queue_pop", queue.popleft)
+        visited = {state_key(self.board)}
+        # a dead start board is reported as unsolvable without searching
+        if self._start_is_dead():
+            queue.clear()
+
+        # peak size of each structure, sampled every memory.interval expansions
+        memory = self._memory_accounting(profile_memory)
+        memory.track("frontier", lambda: estimate(queue, board_entry_size))
+        memory.track("visited", lambda: estimate(visited, sys.getsizeof))
+        memory.track("paths", lambda: estimate_paths(queue))
+
+        # expansion order, if self.trace is set
+        trace = self._trace_recorder(profile_memory)
+        # (key, parent key, g) of every queue entry, only kept while tracing
+        trace_queue = deque([(state_key(self.board), None, 0)])
+        vehicle_lengths = {v.id: v.length for v in self.board.vehicles}
 
         solution_path = None
+        duplicate_hits = 0
 
         while queue:
-            current_board, path = queue.popleft()
+            if self.cancelled:
+                break
+            current_board, path = pop()
             nodes_expanded_this_run += 1
+            if trace is not None:
+                current_key, parent_key, g_cost = trace_queue.popleft()
+                trace(current_key, parent_key, g_cost, 0, len(path))
+            if nodes_expanded_this_run % memory.interval == 0:
+                memory.sample()
 
             if solution_path is not None:
                 break
 
-            for move in current_board.get_possible_moves():
-                new_board = current_board.apply_move(move)
-                board_repr = repr(new_board)
+            for move in get_moves(current_board):
+                new_board = apply_move(current_board, move)
+                board_key = state_key(new_board)
 
-                if board_repr not in visited:
+                if board_key in visited:
+                    duplicate_hits += 1
+                else:
                     new_path = path + [move]
                     if new_board.is_solved():
                         solution_path = new_path
                         break
-                    visited.add(board_repr)
-                    queue.append((new_board, new_path))
+                    visited.add(board_key)
+                    push((new_board, new_path))
+                    if trace is not None:
+                        move_cost = vehicle_lengths[move.vehicle_id] * abs(move.amount)
+                        trace_queue.append((board_key, current_key, g_cost + move_cost))
 
-        search_time = time.time() - start_time
+        search_time = time.perf_counter() - start_time
+        instrumentation.add("duplicate_hits", duplicate_hits)
+        memory.sample()
 
         peak_memory_kb = 0.0
         if profile_memory:
@@ -65,8 +108,10 @@ class BFSSolver(Solver):
         self.nodes_expanded = nodes_expanded
         self.memory_usage = 0.0  # Default memory usage
 
-        # this run measure memory usage
-        _, _, peak_memory, _ = self._search(profile_memory=True)
-        self.memory_usage = peak_memory
+        if self.measure_memory and not self.cancelled:
+            # this run measure memory usage
+            _, _, peak_memory, _ = self._search(profile_memory=True)
+            self.memory_usage = peak_memory
 
+        self._compute_step_costs()
         return self.solution
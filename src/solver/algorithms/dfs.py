@@ -1,7 +1,11 @@
+import sys
 import time
 import tracemalloc
 
 from ..base import Solver
+from ..canonical import Canonicalizer
+from ..memory import board_entry_size, estimate, estimate_paths
+from board import Board
 
 
 class DFSSolver(Solver):
@@ -13,17 +17,49 @@ class DFSSolver(Solver):
             tracemalloc.start()
             tracemalloc.clear_traces()
 
-        start_time = time.time()
+        start_time = time.perf_counter()
+
+        # hot-path functions, timed per phase if instrumentation is enabled
+        instrumentation = self._instrumentation(profile_memory)
+        get_moves = instrumentation.wrap("move_generation", Board.get_possible_moves)
+        apply_move = instrumentation.wrap("apply_move", Board.apply_move)
+        # states are identified by their label-independent key
+        state_key = instrumentation.wrap("state_hashing", Canonicalizer(self.board).key)
 
         visited = set()
         stack = [(self.board, [], 0)]
-        visited.add(repr(self.board))
+        push = instrumentation.wrap("queue_push", stack.append)
+        pop = instrumentation.wrap("queue_pop", stack.pop)
+        visited.add(state_key(self.board))
+        # a dead start board is reported as unsolvable without searching
+        if self._start_is_dead():
+            stack.clear()
+
+        # peak size of each structure, sampled every memory.interval expansions
+        memory = self._memory_accounting(profile_memory)
+        memory.track("frontier", lambda: estimate(stack, board_entry_size))
+        memory.track("visited", lambda: estimate(visited, sys.getsizeof))
+        memory.track("paths", lambda: estimate_paths(stack))
+
+        # expansion order, if self.trace is set
+        trace = self._trace_recorder(profile_memory)
+        # (key, parent key, g) of every stack entry, only kept while tracing
+        trace_stack = [(state_key(self.board), None, 0)]
+        vehicle_lengths = {v.id: v.length for v in self.board.vehicles}
 
         solution_path = None
+        duplicate_hits = 0
 
         while stack:
-            board, path, depth = stack.pop()
+            if self.cancelled:
+                break
+            board, path, depth = pop()
             nodes_expanded_this_run += 1
+            if trace is not None:
+                current_key, parent_key, g_cost = trace_stack.pop()
+                trace(current_key, parent_key, g_cost, 0, depth)
+            if nodes_expanded_this_run % memory.interval == 0:
+                memory.sample()
 
             if board.is_solved():
                 solution_path = path
@@ -32,14 +68,21 @@ class DFSSolver(Solver):
             if depth >= depth_limit:
                 continue
 
-            for move in reversed(board.get_possible_moves()):
-                new_board = board.apply_move(move)
-                new_board_repr = repr(new_board)
-                if new_board_repr not in visited:
-                    visited.add(new_board_repr)
-                    stack.append((new_board, path + [move], depth + 1))
-
-        search_time = time.time() - start_time
+            for move in reversed(get_moves(board)):
+                new_board = apply_move(board, move)
+                new_board_key = state_key(new_board)
+                if new_board_key in visited:
+                    duplicate_hits += 1
+                else:
+                    visited.add(new_board_key)
+                    push((new_board, path + [move], depth + 1))
+                    if trace is not None:
+                        move_cost = vehicle_lengths[move.vehicle_id] * abs(move.amount)
+                        trace_stack.append((new_board_key, current_key, g_cost + move_cost))
+
+        search_time = time.perf_counter() - start_time
+        instrumentation.add("duplicate_hits", duplicate_hits)
+        memory.sample()
 
         peak_memory_kb = 0.0
         if profile_memory:
@@ -60,8 +103,10 @@ class DFSSolver(Solver):
         self.nodes_expanded = nodes_expanded
         self.memory_usage = 0.0
 
-        # this run measure memory usage
-        _, _, peak_memory, _ = self._search(depth_limit, profile_memory=True)
-        self.memory_usage = peak_memory
+        if self.measure_memory and not self.cancelled:
+            # this run measure memory usage
+            _, _, peak_memory, _ = self._search(depth_limit, profile_memory=True)
+            self.memory_usage = peak_memory
 
+        self._compute_step_costs()
         return self.solution
@@ -2,12 +2,30 @@ import time
 import tracemalloc
 
 from ..base import Solver
+from ..canonical import Canonicalizer
+from ..memory import board_entry_size, estimate, estimate_paths, value_entry_size
+from board import Board
 
 
 class IDSSolver(Solver):
-    def _search(self, max_depth: int, timeout: float, profile_memory: bool):
+    def _search(
+        self, max_depth: int, timeout: float, max_table_size: int, profile_memory: bool
+    ):
         """
         Internal search function containing the core IDS logic.
+
+        A transposition table is kept across iterations. It stores, for every
+        state, the shallowest depth it was reached at and the depth limit of
+        the iteration that reached it. A state is skipped when it was already
+        reached at a shallower depth (that occurrence gets more remaining
+        depth), or at the same depth during the current iteration.
+
+        Every state above the depth limit was already expanded by the previous
+        iteration, and its successors are in the table, so an iteration does
+        not walk down from the start again: it resumes from the states the
+        previous one cut off at the depth limit. Those are kept as long as
+        they fit into max_table_size entries, otherwise the iteration starts
+        from the start board as usual.
         """
         nodes_expanded_this_run = 0
         solution_path = None
@@ -17,50 +35,148 @@ class IDSSolver(Solver):
             tracemalloc.start()
             tracemalloc.clear_traces()
 
-        start_time = time.time()
+        start_time = time.perf_counter()
+
+        # hot-path functions, timed per phase if instrumentation is enabled
+        instrumentation = self._instrumentation(profile_memory)
+        get_moves = instrumentation.wrap("move_generation", Board.get_possible_moves)
+        apply_move = instrumentation.wrap("apply_move", Board.apply_move)
+        # states are identified by their label-independent key
+        state_key = instrumentation.wrap("state_hashing", Canonicalizer(self.board).key)
+        duplicate_hits = 0
+        reopenings = 0
+
+        # a dead start board is reported as unsolvable without searching
+        if self._start_is_dead():
+            max_depth = -1
+
+        # state key -> (shallowest depth, depth limit of the iteration)
+        table = {}
+        initial_board_key = state_key(self.board)
+
+        # peak size of each structure, sampled every memory.interval expansions
+        memory = self._memory_accounting(profile_memory)
+        memory.track("visited", lambda: estimate(table, value_entry_size, table.items()))
+
+        # expansion order, if self.trace is set
+        trace = self._trace_recorder(profile_memory)
+        vehicle_lengths = {v.id: v.length for v in self.board.vehicles}
+
+        # stack entries (and trace entries) cut off by the previous iteration,
+        # None if it has to start from the start board
+        resume = None
 
         # outer loop calling DLS
         for depth_limit in range(max_depth + 1):
 
             # if timeout is reached
-            if time.time() - start_time > timeout:
+            if time.perf_counter() - start_time > timeout:
                 timed_out = True
                 print("Timeout reached before finding a solution.")
                 break
 
-            visited_at_depth = {repr(self.board)}
-            stack = [(self.board, [], 0)]
+            if resume:
+                # the cut off states, in the order the previous iteration found them
+                stack = [entry for entry, _ in reversed(resume)]
+                trace_stack = [trace_entry for _, trace_entry in reversed(resume)]
+                base_depth = depth_limit - 1
+            else:
+                table[initial_board_key] = (0, depth_limit)
+                stack = [(self.board, [], 0, initial_board_key)]
+                # (key, parent key, g) of every stack entry, only kept while tracing
+                trace_stack = [(initial_board_key, None, 0)]
+                base_depth = 0
+            resume = []
+            # keys of the states on the path to the node being expanded, by depth
+            # below base_depth
+            path_keys = []
+            push = instrumentation.wrap("queue_push", stack.append)
+            pop = instrumentation.wrap("queue_pop", stack.pop)
+            # every iteration has its own stack
+            memory.track("frontier", lambda stack=stack: estimate(stack, board_entry_size))
+            memory.track("paths", lambda stack=stack: estimate_paths(stack))
+            memory.track("resume", lambda resume=resume: estimate(
+                resume, lambda item: board_entry_size(item[0])
+            ))
+            # whether the depth limit cut off any node in this iteration
+            cut_off = False
 
             # performing DLS
             while stack:
 
+                if self.cancelled:
+                    # stopped like a timeout, without a solution
+                    timed_out = True
+                    break
                 if nodes_expanded_this_run % 1000 == 0:
-                    if time.time() - start_time > timeout:
+                    if time.perf_counter() - start_time > timeout:
                         timed_out = True
                         break 
 
-                board, path, depth = stack.pop()
+                entry = pop()
+                board, path, depth, board_key = entry
+                del path_keys[depth - base_depth:]
+                path_keys.append(board_key)
                 nodes_expanded_this_run += 1
+                trace_entry = None
+                if trace is not None:
+                    trace_entry = trace_stack.pop()
+                    current_key, parent_key, g_cost = trace_entry
+                    trace(current_key, parent_key, g_cost, 0, depth)
+                if nodes_expanded_this_run % memory.interval == 0:
+                    memory.sample()
 
                 if board.is_solved():
                     solution_path = path
                     break  
 
                 if depth >= depth_limit:
+                    cut_off = True
+                    if resume is not None:
+                        if len(resume) < max_table_size:
+                            resume.append((entry, trace_entry))
+                        else:
+                            # too many to keep, the next iteration starts over
+                            resume = None
                     continue
 
-                for move in reversed(board.get_possible_moves()):
-                    new_board = board.apply_move(move)
-                    new_board_repr = repr(new_board)
-                    if new_board_repr not in visited_at_depth:
-                        visited_at_depth.add(new_board_repr)
-                        stack.append((new_board, path + [move], depth + 1))
+                new_depth = depth + 1
+                for move in reversed(get_moves(board)):
+                    new_board = apply_move(board, move)
+                    new_board_key = state_key(new_board)
+
+                    entry = table.get(new_board_key)
+                    if entry is not None:
+                        if entry[0] < new_depth or (
+                            entry[0] == new_depth and entry[1] == depth_limit
+                        ):
+                            duplicate_hits += 1
+                            continue
+                        # searched again, shallower or in a deeper iteration
+                        reopenings += 1
+
+                    if entry is None and len(table) >= max_table_size:
+                        protected = set(path_keys)
+                        protected.update(item[3] for item in stack)
+                        self._evict(table, max_table_size * 7 // 8, depth_limit, protected)
+                    table[new_board_key] = (new_depth, depth_limit)
+                    push((new_board, path + [move], new_depth, new_board_key))
+                    if trace is not None:
+                        move_cost = vehicle_lengths[move.vehicle_id] * abs(move.amount)
+                        trace_stack.append((new_board_key, current_key, g_cost + move_cost))
 
             # if a solution was found or timeout occurred, break the outer loop
             if solution_path is not None or timed_out:
                 break
 
-        search_time = time.time() - start_time
+            # nothing was cut off, a deeper limit cannot reach any new state
+            if not cut_off:
+                break
+
+        search_time = time.perf_counter() - start_time
+        instrumentation.add("duplicate_hits", duplicate_hits)
+        instrumentation.add("reopenings", reopenings)
+        memory.sample()
 
         peak_memory_kb = 0.0
         if profile_memory:
@@ -73,14 +189,24 @@ class IDSSolver(Solver):
 
         return solution_path, search_time, peak_memory_kb, nodes_expanded_this_run
 
-    def solve(self, max_depth: int = 500, timeout: float = 60.0):
+    def solve(
+        self, max_depth: int = 500, timeout: float = 60.0, max_table_size: int = 1_000_000
+    ):
         """
         Solves the puzzle using IDS with a specified maximum depth and timeout.
+
+        The transposition table holds at most max_table_size states. A
+        smaller table gives the same solution, but evicted states are searched
+        again from every path that reaches them, so the work grows quickly
+        once the table is well below the number of states the search
+        reaches. In practice keep it at least at that number: about 1000 for
+        map05 (5488 expansions; 546k with 500) and 7000 for map08 (16k
+        expansions; 89k with 5000, none solved in time with 2000).
         """
         # this run measure search time
         # default timeout to 60
         solution, search_time, _, nodes_expanded = self._search(
-            max_depth, timeout, profile_memory=False
+            max_depth, timeout, max_table_size, profile_memory=False
         )
 
         self.solution = solution
@@ -88,10 +214,32 @@ class IDSSolver(Solver):
         self.nodes_expanded = nodes_expanded
         self.memory_usage = 0.0
 
-        # this run measure memory usage
-        # this second run might also time out. The memory usage will be
-        # the peak usage up to that point.
-        _, _, peak_memory, _ = self._search(max_depth, timeout, profile_memory=True)
-        self.memory_usage = peak_memory
+        if self.measure_memory and not self.cancelled:
+            # this run measure memory usage
+            # this second run might also time out. The memory usage will be
+            # the peak usage up to that point.
+            _, _, peak_memory, _ = self._search(
+                max_depth, timeout, max_table_size, profile_memory=True
+            )
+            self.memory_usage = peak_memory
 
+        self._compute_step_costs()
         return self.solution
+
+    def _evict(self, table: dict, keep: int, depth_limit: int, protected: set):
+        """
+        Shrink the transposition table to `keep` entries. The deepest entries
+        go first: they are the most numerous and save the least work, while
+        a shallow entry prunes a whole subtree. At the same depth, entries of
+        earlier iterations go before those of the current one. The
+        `protected` states (the path being searched and the stack) are never
+        evicted, so the iteration does not search its own pending states
+        again. Only an eighth of the table is freed at a time, as every
+        evicted state of the current iteration may be searched again.
+        """
+        candidates = sorted(
+            (key for key in table if key not in protected),
+            key=lambda key: (-table[key][0], table[key][1] == depth_limit),
+        )
+        for key in candidates[:len(table) - keep]:
+            del table[key]
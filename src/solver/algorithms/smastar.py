@@ -0,0 +1,349 @@
+import heapq
+import sys
+import time
+import tracemalloc
+
+from .astar import AStarSolver
+from ..canonical import Canonicalizer
+from ..memory import board_size, entries_size, estimate, sample_entries
+from board import Board
+
+
+class _Node:
+    """A node of the search tree kept in memory by SMA*."""
+
+    __slots__ = (
+        "board", "key", "parent", "move", "g", "f", "depth", "children", "forgotten", "dropped"
+    )
+
+    def __init__(self, board, key, parent, move, g, f, depth):
+        self.board = board
+        self.key = key
+        self.parent = parent
+        self.move = move
+        self.g = g
+        self.f = f
+        self.depth = depth
+        self.children = []
+        # state key -> backed up f of the successors that were dropped
+        self.forgotten = {}
+        self.dropped = False
+
+
+class SMAStarSolver(AStarSolver):
+    """
+    Memory-bounded A* (simplified SMA*, with full node expansion).
+
+    At most max_nodes nodes are kept in memory. When the limit is exceeded
+    the worst leaf (highest f, shallowest) is dropped and its f value is
+    remembered by its parent, which goes back to the frontier and regenerates
+    that successor if it becomes the most promising node again. The f value
+    of every node is backed up to the minimum over its successors, so a
+    regenerated subtree is not searched again from scratch.
+
+    Dropped states are also remembered in a small table (g and the parent,
+    no board), so a state that can be reached through several paths is only
+    regenerated by the parent that dropped it.
+
+    With enough memory this behaves like A* and returns the same solution
+    cost. With too little memory the solution found may be suboptimal, or
+    none is found at all. The default heuristic is "max": with the legacy
+    one, which is neither admissible nor consistent, the f values barely
+    grow and a tight limit makes SMA* regenerate the same nodes over and
+    over (map 6 needs about 10000 nodes with legacy, 2000 with max).
+
+    When an f layer does not fit into memory, SMA* drops and regenerates
+    its nodes without the f bound ever rising. The search stops early with
+    `stuck` set once more than stuck_factor * max_nodes nodes were dropped
+    at the same f bound; a run that solves never drops more than about
+    max_nodes there. With "max", the smallest limits that solve the bundled
+    maps are about 1500 nodes for map 6, 3000 for map 9 and 10000 for map 7;
+    maps 4, 5, 8 and 10 solve with 1000.
+    """
+
+    # entries of the dropped-state table per node of max_nodes
+    covered_factor = 4
+    # nodes dropped at the same f bound, per node of max_nodes, before giving up
+    stuck_factor = 10
+
+    def __init__(self, board: Board, max_nodes: int = 100_000, heuristic: str = "max"):
+        super().__init__(board, heuristic=heuristic)
+        self.max_nodes = max_nodes
+        self.nodes_forgotten = 0
+        # whether the last search gave up because max_nodes is too small
+        self.stuck = False
+
+    def _search(self, timeout: float, profile_memory: bool):
+        """Internal search function containing the core SMA* logic."""
+        nodes_expanded_this_run = 0
+        nodes_forgotten = 0
+
+        if profile_memory:
+            tracemalloc.start()
+            tracemalloc.clear_traces()
+
+        start_time = time.perf_counter()
+
+        # hot-path functions, timed per phase if instrumentation is enabled
+        instrumentation = self._instrumentation(profile_memory)
+        get_moves = instrumentation.wrap("move_generation", Board.get_possible_moves)
+        apply_move = instrumentation.wrap("apply_move", Board.apply_move)
+        heuristic = instrumentation.wrap("heuristic", self._finite_heuristic)
+        push = instrumentation.wrap("queue_push", heapq.heappush)
+        pop = instrumentation.wrap("queue_pop", heapq.heappop)
+        # states are identified by their label-independent key
+        state_key = instrumentation.wrap("state_hashing", Canonicalizer(self.board).key)
+        vehicle_lengths = self._get_vehicle_map(self.board)
+        # a solution cannot be longer than the number of nodes in memory
+        max_depth = self.max_nodes - 1
+
+        root_h = heuristic(self.board)
+        root = _Node(self.board, state_key(self.board), None, None, 0, root_h, 0)
+        node_count = 1
+        # state key -> node with the lowest g among the nodes in memory
+        in_memory = {root.key: root}
+        # dropped state key -> (g, (key, g) of the parent that remembers it).
+        # The parent regenerates the state once its backed up f is the best on
+        # the frontier, so reaching it through another path at no lower g is a
+        # duplicate too. Without this a dropped state is searched again from
+        # every path that leads to it, and SMA* keeps regenerating the same
+        # states at the same f. At most covered_factor * max_nodes entries are
+        # kept, the deepest states are forgotten first.
+        covered = {}
+        # (-g, counter, key, entry), lazy like the heaps below
+        covered_order = []
+        max_covered = self.covered_factor * self.max_nodes
+
+        # Both heaps are lazy, an entry is only valid if it is still current
+        # frontier: (priority, -depth, counter, node), lowest priority first
+        # leaves: (-f, depth, counter, node), worst leaf first
+        counter = 0
+        frontier = [(root.f, 0, counter, root)]
+        leaves = []
+        # node -> priority of its valid frontier entry
+        open_priority = {root: root.f}
+
+        if self._start_is_dead():
+            frontier.clear()
+
+        # peak size of each structure, sampled every memory.interval expansions
+        memory = self._memory_accounting(profile_memory)
+        memory.track("frontier", lambda: estimate(frontier, sys.getsizeof))
+        memory.track("leaves", lambda: estimate(leaves, sys.getsizeof))
+        memory.track("visited", lambda: estimate(in_memory, sys.getsizeof))
+        memory.track("covered", lambda: estimate(covered, sys.getsizeof))
+        # the search tree, every node links to its parent
+        memory.track("parents", lambda: (
+            node_count,
+            entries_size(node_count, sample_entries(in_memory.values()), self._node_size),
+        ))
+
+        # expansion order, if self.trace is set
+        trace = self._trace_recorder(profile_memory)
+
+        solution_path = None
+        duplicate_hits = 0
+        reopenings = 0
+        # highest f popped so far and nodes_forgotten when it was reached
+        f_bound = -1
+        forgotten_at_bound = 0
+        stuck = False
+
+        while frontier:
+            if self.cancelled:
+                break
+            if nodes_expanded_this_run % 1000 == 0:
+                if time.perf_counter() - start_time > timeout:
+                    print("Timeout reached before finding a solution.")
+                    break
+
+            priority, _, _, node = pop(frontier)
+            if open_priority.get(node) != priority:
+                continue
+            if priority == float("inf"):
+                # every remaining node needs more memory than allowed
+                break
+            del open_priority[node]
+            if priority > f_bound:
+                f_bound = priority
+                forgotten_at_bound = nodes_forgotten
+            elif nodes_forgotten - forgotten_at_bound > self.stuck_factor * self.max_nodes:
+                # the f layer does not fit, its nodes are only dropped and regenerated
+                print("SMA* is stuck at the same f bound, max_nodes is too small.")
+                stuck = True
+                break
+
+            nodes_expanded_this_run += 1
+            if nodes_expanded_this_run % memory.interval == 0:
+                memory.sample()
+            if trace is not None:
+                # h is taken from the backed up f, so it includes what was learned below
+                parent_key = node.parent.key if node.parent is not None else None
+                trace(node.key, parent_key, node.g, node.f - node.g, node.depth)
+
+            if node.board.is_solved():
+                solution_path = self._node_path(node)
+                break
+
+            # states on the path from the root, they would only create cycles
+            ancestors = set()
+            ancestor = node.parent
+            while ancestor is not None:
+                ancestors.add(ancestor.key)
+                ancestor = ancestor.parent
+
+            # a node with dropped successors only regenerates those
+            regenerate = node.forgotten
+            node.forgotten = {}
+
+            for move in get_moves(node.board):
+                new_board = apply_move(node.board, move)
+                new_key = state_key(new_board)
+                if regenerate and new_key not in regenerate:
+                    continue
+                if new_key in ancestors:
+                    continue
+
+                new_g = node.g + vehicle_lengths[move.vehicle_id] * abs(move.amount)
+                other = in_memory.get(new_key)
+                if other is not None and other.g <= new_g:
+                    duplicate_hits += 1
+                    continue
+                dropped = covered.get(new_key)
+                if dropped is not None:
+                    if dropped[0] < new_g or (
+                        dropped[0] == new_g and dropped[1] != (node.key, node.g)
+                    ):
+                        duplicate_hits += 1
+                        continue
+                    del covered[new_key]
+
+                depth = node.depth + 1
+                if depth >= max_depth and not new_board.is_solved():
+                    new_f = float("inf")
+                else:
+                    # pathmax keeps f non-decreasing along a path
+                    new_f = max(node.f, new_g + heuristic(new_board))
+                if new_key in regenerate:
+                    new_f = max(new_f, regenerate[new_key])
+                    reopenings += 1
+
+                child = _Node(new_board, new_key, node, move, new_g, new_f, depth)
+                node.children.append(child)
+                in_memory[new_key] = child
+                node_count += 1
+
+                counter += 1
+                push(frontier, (new_f, -depth, counter, child))
+                open_priority[child] = new_f
+                heapq.heappush(leaves, (-new_f, depth, counter, child))
+
+            if not node.children:
+                # nothing new could be generated, this node is a dead end
+                node.f = float("inf")
+                counter += 1
+                heapq.heappush(leaves, (-node.f, node.depth, counter, node))
+            self._backup(node)
+
+            # drop the worst leaves until the tree fits into memory again
+            while node_count > self.max_nodes and leaves:
+                neg_f, _, _, leaf = heapq.heappop(leaves)
+                if leaf.dropped or leaf.children or leaf.f != -neg_f or leaf.parent is None:
+                    continue
+
+                parent = leaf.parent
+                parent.children.remove(leaf)
+                leaf.dropped = True
+                parent.forgotten[leaf.key] = min(
+                    leaf.f, parent.forgotten.get(leaf.key, float("inf"))
+                )
+                if in_memory.get(leaf.key) is leaf:
+                    del in_memory[leaf.key]
+                    while len(covered) >= max_covered:
+                        _, _, key, entry = heapq.heappop(covered_order)
+                        if covered.get(key) is entry:
+                            del covered[key]
+                    entry = (leaf.g, (parent.key, parent.g))
+                    covered[leaf.key] = entry
+                    counter += 1
+                    heapq.heappush(covered_order, (-leaf.g, counter, leaf.key, entry))
+                open_priority.pop(leaf, None)
+                node_count -= 1
+                nodes_forgotten += 1
+
+                # the parent has to regenerate what it lost, so it is open again
+                parent_priority = min(parent.forgotten.values())
+                counter += 1
+                push(frontier, (parent_priority, -parent.depth, counter, parent))
+                open_priority[parent] = parent_priority
+                if not parent.children:
+                    heapq.heappush(leaves, (-parent.f, parent.depth, counter, parent))
+
+        search_time = time.perf_counter() - start_time
+        instrumentation.add("duplicate_hits", duplicate_hits)
+        instrumentation.add("reopenings", reopenings)
+        memory.sample()
+
+        peak_memory_kb = 0.0
+        if profile_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peak_memory_kb = peak / 1024
+
+        self.nodes_forgotten = nodes_forgotten
+        self.stuck = stuck
+        return solution_path, search_time, peak_memory_kb, nodes_expanded_this_run
+
+    def solve(self, timeout: float = 60.0):
+        """
+        Solves the puzzle keeping at most max_nodes nodes in memory. With a
+        small limit SMA* may regenerate the same nodes many times, so the
+        search also stops after timeout seconds, or as soon as it is stuck.
+        """
+        solution, search_time, _, nodes_expanded = self._search(
+            timeout, profile_memory=False
+        )
+
+        self.solution = solution
+        self.search_time = search_time
+        self.nodes_expanded = nodes_expanded
+        self.memory_usage = 0.0
+
+        if self.measure_memory and not self.cancelled:
+            _, _, peak_memory, _ = self._search(timeout, profile_memory=True)
+            self.memory_usage = peak_memory
+
+        self._compute_step_costs()
+        return self.solution
+
+    def _backup(self, node: _Node):
+        """Raise f of the node and its ancestors to the best f below them."""
+        while node is not None:
+            values = [child.f for child in node.children] + list(node.forgotten.values())
+            if values:
+                best = min(values)
+                if best <= node.f:
+                    break
+                node.f = best
+            node = node.parent
+
+    def _node_size(self, node: _Node) -> int:
+        return (
+            sys.getsizeof(node)
+            + board_size(node.board)
+            + sys.getsizeof(node.children)
+            + sys.getsizeof(node.forgotten)
+        )
+
+    def _node_path(self, node: _Node):
+        path = []
+        while node.parent is not None:
+            path.append(node.move)
+            node = node.parent
+        return path[::-1]
+
+    def get_stats(self):
+        stats = super().get_stats()
+        stats["nodes_forgotten"] = self.nodes_forgotten
+        stats["stuck"] = self.stuck
+        return stats
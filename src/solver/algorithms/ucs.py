@@ -1,11 +1,23 @@
 import time
-import heapq
 import tracemalloc
 
 from ..base import Solver
+from ..canonical import Canonicalizer
+from ..memory import board_size, estimate, parent_entry_size, value_entry_size
+from ..priority_queue import QUEUES
+from board import Board
 
 
 class UCSSolver(Solver):
+    def __init__(self, board: Board, queue: str = "heap"):
+        """
+        queue selects the frontier implementation, "heap" or "bucket". The
+        priority is g itself, so the bucket queue has no g to break ties with
+        and its LIFO order expands more nodes than the heap's FIFO order.
+        """
+        super().__init__(board)
+        self.queue_class = QUEUES[queue]
+
     def _search(self, profile_memory: bool):
         """Internal search function containing the core UCS logic."""
         nodes_expanded_this_run = 0
@@ -14,35 +26,63 @@ class UCSSolver(Solver):
             tracemalloc.start()
             tracemalloc.clear_traces()
 
-        start_time = time.time()
+        start_time = time.perf_counter()
+
+        # hot-path functions, timed per phase if instrumentation is enabled
+        instrumentation = self._instrumentation(profile_memory)
+        get_moves = instrumentation.wrap("move_generation", Board.get_possible_moves)
+        apply_move = instrumentation.wrap("apply_move", Board.apply_move)
+        # states are identified by their label-independent key
+        state_key = instrumentation.wrap("state_hashing", Canonicalizer(self.board).key)
 
         # vehicle mapping for quick access
         vehicle_map = {v.id: v for v in self.board.vehicles}
-        initial_board_repr = repr(self.board)
-        counter = 0
-        frontier = [(0, counter, self.board)]  # (cost, counter, board)
-
-        came_from = {initial_board_repr: (None, None)}
-        total_cost = {initial_board_repr: 0}
+        initial_board_key = state_key(self.board)
+        # one entry per state: priority = cost, key = state key, item = board
+        frontier = self.queue_class()
+        push = instrumentation.wrap("queue_push", frontier.push)
+        pop = instrumentation.wrap("queue_pop", frontier.pop)
+        # a dead start board is reported as unsolvable without searching
+        if not self._start_is_dead():
+            push(0, initial_board_key, self.board)
+
+        came_from = {initial_board_key: (None, None)}
+        total_cost = {initial_board_key: 0}
+
+        # expansion order, if self.trace is set
+        trace = self._trace_recorder(profile_memory)
+        # state key -> depth, only kept while tracing
+        depths = {initial_board_key: 0}
+
+        # peak size of each structure, sampled every memory.interval expansions
+        memory = self._memory_accounting(profile_memory)
+        memory.track("frontier", lambda: frontier.estimate_size(board_size))
+        memory.track("visited", lambda: estimate(total_cost, value_entry_size, total_cost.items()))
+        memory.track("parents", lambda: estimate(came_from, parent_entry_size, came_from.items()))
 
         solution_path = None
+        duplicate_hits = 0
+        reopenings = 0
 
         while frontier:
-            cost, _, current_board = heapq.heappop(frontier)
-            current_board_repr = repr(current_board)
-
-            if cost > total_cost[current_board_repr]:
-                continue
-
+            if self.cancelled:
+                break
+            # the queue updates entries in place, so nothing popped is stale
+            cost, current_board_key, current_board = pop()
             nodes_expanded_this_run += 1
+            if trace is not None:
+                depth = depths[current_board_key]
+                trace(current_board_key, came_from[current_board_key][0], cost, 0, depth)
+            if nodes_expanded_this_run % memory.interval == 0:
+                memory.sample()
 
             if current_board.is_solved():
-                solution_path = self._path_construct(came_from, current_board_repr)
+                solution_path = self._path_construct(came_from, current_board_key)
                 break
 
-            for move in current_board.get_possible_moves():
-                new_board = current_board.apply_move(move)
-                board_repr = repr(new_board)
+            for move in get_moves(current_board):
+                new_board = apply_move(current_board, move)
+                board_key = state_key(new_board)
 
                 moved_vehicle = vehicle_map.get(move.vehicle_id)
                 if moved_vehicle is None:
@@ -50,13 +90,24 @@ class UCSSolver(Solver):
 
                 new_cost = cost + (moved_vehicle.length * abs(move.amount))
 
-                if board_repr not in total_cost or new_cost < total_cost[board_repr]:
-                    total_cost[board_repr] = new_cost
-                    came_from[board_repr] = (current_board_repr, move)
-                    counter += 1
-                    heapq.heappush(frontier, (new_cost, counter, new_board))
-
-        search_time = time.time() - start_time
+                old_cost = total_cost.get(board_key)
+                if old_cost is not None:
+                    if new_cost >= old_cost:
+                        duplicate_hits += 1
+                        continue
+                    # reached again more cheaply, it goes back on the frontier
+                    reopenings += 1
+
+                total_cost[board_key] = new_cost
+                came_from[board_key] = (current_board_key, move)
+                push(new_cost, board_key, new_board)
+                if trace is not None:
+                    depths[board_key] = depth + 1
+
+        search_time = time.perf_counter() - start_time
+        instrumentation.add("duplicate_hits", duplicate_hits)
+        instrumentation.add("reopenings", reopenings)
+        memory.sample()
 
         peak_memory_kb = 0.0
         if profile_memory:
@@ -75,17 +126,19 @@ class UCSSolver(Solver):
         self.nodes_expanded = nodes_expanded
         self.memory_usage = 0.0
 
-        # this run measure memory usage
-        _, _, peak_memory, _ = self._search(profile_memory=True)
-        self.memory_usage = peak_memory
+        if self.measure_memory and not self.cancelled:
+            # this run measure memory usage
+            _, _, peak_memory, _ = self._search(profile_memory=True)
+            self.memory_usage = peak_memory
 
+        self._compute_step_costs()
         return self.solution
 
-    def _path_construct(self, came_from: dict, current_board_repr: str):
+    def _path_construct(self, came_from: dict, current_board_key: str):
         path = []
-        while current_board_repr is not None:
-            parent_repr, move = came_from.get(current_board_repr)
+        while current_board_key is not None:
+            parent_key, move = came_from.get(current_board_key)
             if move:
                 path.append(move)
-            current_board_repr = parent_repr
+            current_board_key = parent_key
         return path[::-1]
@@ -1,5 +1,9 @@
 from abc import ABC, abstractmethod
 from board import Board
+from .instrumentation import Instrumentation
+from .memory import MemoryAccounting
+from .postprocess import optimize_solution
+from .pruning import DeadStatePruner
 
 
 class Solver(ABC):
@@ -13,16 +17,139 @@ class Solver(ABC):
         self.nodes_expanded = 0
         self.search_time = 0
         self.memory_usage = 0
+        # cumulative g and h after each step of the solution (index 0 is the start)
+        self.step_g_costs = []
+        self.step_h_costs = []
+        # length and cost before and after optimize_solution, if it was used
+        self.optimization = None
+        # set to True before solve() to time every phase of the search
+        self.instrument = False
+        self.instrumentation = None
+        # set to False to skip the second search run that measures memory
+        self.measure_memory = True
+        # peak size of each search structure, sampled during the memory run
+        self.account_memory = True
+        self.memory_accounting = None
+        # a TraceRecorder set before solve() records every expansion
+        self.trace = None
+        # set by cancel(), possibly from another thread, to stop the search
+        self.cancelled = False
+        # whether the start board is provably unsolvable, see _start_is_dead
+        self._dead_start = None
 
     @abstractmethod
     def solve(self):
         # algorithms will be implemented later in subclasses
         pass
 
+    def _start_is_dead(self) -> bool:
+        """
+        Whether the start board can provably never be solved (DeadStatePruner),
+        computed once per solver. Only the start board is checked: every move
+        can be undone, so every board reachable from a solvable start is
+        solvable too and a per-successor check could never prune anything.
+        """
+        if self._dead_start is None:
+            self._dead_start = DeadStatePruner(self.board).is_dead(self.board)
+        return self._dead_start
+
+    def cancel(self):
+        """
+        Stop a running solve() at its next expansion, e.g. from another
+        thread. solve() then returns without a solution and skips the memory
+        run.
+        """
+        self.cancelled = True
+
     def get_stats(self):
         # return the stats of the solver as a dictionary
-        return {
+        stats = {
             "search_time": self.search_time,
             "memory_usage": self.memory_usage,
             "nodes_expanded": self.nodes_expanded,
         }
+        if self.optimization is not None:
+            stats["optimization"] = self.optimization
+        if self.instrumentation is not None:
+            stats["instrumentation"] = self.instrumentation.report(self.search_time)
+        if self.memory_accounting is not None:
+            stats["memory_breakdown"] = self.memory_accounting.report()
+        return stats
+
+    def _instrumentation(self, profile_memory: bool) -> Instrumentation:
+        """
+        Instrumentation of one search run. Only the run that measures time is
+        instrumented, and only if self.instrument is set.
+        """
+        instrumentation = Instrumentation(self.instrument and not profile_memory)
+        if instrumentation.enabled:
+            self.instrumentation = instrumentation
+        return instrumentation
+
+    def _memory_accounting(self, profile_memory: bool) -> MemoryAccounting:
+        """
+        Per-structure memory accounting of one search run. It is done in the
+        run that measures memory, and only if self.account_memory is set.
+        """
+        accounting = MemoryAccounting(self.account_memory and profile_memory)
+        if accounting.enabled:
+            self.memory_accounting = accounting
+        return accounting
+
+    def _trace_recorder(self, profile_memory: bool):
+        """
+        The record function of self.trace for one search run, or None. Only
+        the run that measures time is recorded.
+        """
+        if self.trace is None or profile_memory:
+            return None
+        self.trace.reset()
+        return self.trace.record
+
+    def optimize_solution(self, shortcut_depth: int = 2):
+        """
+        Shorten the solution found by solve() (see postprocess.py) and return
+        it. Useful for solvers that return long paths, like DFS.
+        """
+        if not self.solution:
+            return self.solution
+        self.solution, self.optimization = optimize_solution(
+            self.board, self.solution, shortcut_depth
+        )
+        self._compute_step_costs()
+        return self.solution
+
+    def get_step_costs(self):
+        # return the per-step cumulative g and h values of the solution
+        return self.step_g_costs, self.step_h_costs
+
+    def _heuristic(self, board: Board) -> int:
+        # uninformed solvers have no heuristic, h(n) = 0
+        return 0
+
+    def _compute_step_costs(self):
+        """Records the step costs of the solution, see compute_step_costs."""
+        self.step_g_costs, self.step_h_costs = self.compute_step_costs(self.solution)
+
+    def compute_step_costs(self, solution):
+        """
+        Replays a solution once and returns the cumulative cost g and the
+        heuristic h of every intermediate board.
+        """
+        step_g_costs = []
+        step_h_costs = []
+        if not solution:
+            return step_g_costs, step_h_costs
+
+        vehicle_lengths = {v.id: v.length for v in self.board.vehicles}
+        board = self.board
+        g_cost = 0
+        step_g_costs.append(g_cost)
+        step_h_costs.append(self._heuristic(board))
+
+        for move in solution:
+            g_cost += vehicle_lengths[move.vehicle_id] * abs(move.amount)
+            board = board.apply_move(move)
+            step_g_costs.append(g_cost)
+            step_h_costs.append(self._heuristic(board))
+        return step_g_costs, step_h_costs
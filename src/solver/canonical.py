@@ -0,0 +1,82 @@
+from board import Board
+
+
+class Canonicalizer:
+    """
+    Maps boards to a key that does not depend on the vehicle labels.
+
+    Vehicles with the same length and orientation are interchangeable (apart
+    from the red car), so two boards that only differ by which of those
+    vehicles sits where are the same state. The key is the grid of the board
+    with every vehicle replaced by the label of its (length, orientation)
+    class. Vehicles of one class in the same row/column always tile their
+    cells in a unique way, so the key still identifies the state.
+
+    The solvers use `key`, which packs the position of every vehicle along
+    its lane into one integer. Python integers grow as needed, so this works
+    for any board size. Vehicles are packed in the order of their class,
+    lane and position, which vehicles never change, so the key does not
+    depend on the labels either. It only identifies states of the same
+    puzzle though (same lanes), `grid_key` compares boards of any puzzle.
+    """
+
+    def __init__(self, board: Board):
+        self.width = board.width
+        self.height = board.height
+
+        class_labels = {}
+        self.labels = {}
+        for i, vehicle in enumerate(board.vehicles):
+            if i == 0:
+                # the red car is the one that has to reach the exit
+                self.labels[vehicle.id] = "R"
+                continue
+            vehicle_class = (vehicle.length, vehicle.orientation)
+            if vehicle_class not in class_labels:
+                class_labels[vehicle_class] = chr(ord("a") + len(class_labels))
+            self.labels[vehicle.id] = class_labels[vehicle_class]
+
+        # (index in board.vehicles, horizontal, bit offset) in packing order
+        vehicles = board.vehicles
+        order = sorted(
+            range(len(vehicles)),
+            key=lambda i: (
+                self.labels[vehicles[i].id],
+                vehicles[i].orientation,
+                vehicles[i].y if vehicles[i].orientation == "H" else vehicles[i].x,
+                vehicles[i].x if vehicles[i].orientation == "H" else vehicles[i].y,
+            ),
+        )
+        self._fields = []
+        shift = 0
+        for i in order:
+            vehicle = vehicles[i]
+            horizontal = vehicle.orientation == "H"
+            lane_size = self.width if horizontal else self.height
+            self._fields.append((i, horizontal, shift))
+            shift += max(1, (lane_size - vehicle.length).bit_length())
+        self.bits = shift
+
+    def key(self, board: Board) -> int:
+        vehicles = board.vehicles
+        packed = 0
+        for i, horizontal, shift in self._fields:
+            vehicle = vehicles[i]
+            packed |= (vehicle.x if horizontal else vehicle.y) << shift
+        return packed
+
+    def grid_key(self, board: Board) -> str:
+        width = self.width
+        cells = ["."] * (width * self.height)
+        for vehicle in board.vehicles:
+            label = self.labels[vehicle.id]
+            start = vehicle.y * width + vehicle.x
+            step = 1 if vehicle.orientation == "H" else width
+            for i in range(vehicle.length):
+                cells[start + i * step] = label
+        return "".join(cells)
+
+
+def canonical_key(board: Board) -> str:
+    """Label-independent key of a single board, comparable across puzzles."""
+    return Canonicalizer(board).grid_key(board)
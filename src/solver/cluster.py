@@ -0,0 +1,257 @@
+import time
+from collections import deque
+
+from board import Board
+from move import Move
+from .priority_queue import BucketQueue
+
+
+def _lane(vehicle) -> int:
+    return vehicle.y if vehicle.orientation == "H" else vehicle.x
+
+
+def _position(vehicle) -> int:
+    return vehicle.x if vehicle.orientation == "H" else vehicle.y
+
+
+def cluster_layout(board: Board):
+    """
+    (signature, vehicle ids, state) of a board.
+
+    Vehicles are put into slots: the red car first, then the others sorted
+    by length, orientation, lane and position. Boards with the same
+    signature (size, and the length, orientation and lane of every slot)
+    share one state space, whatever the labels of their vehicles are. A
+    state is the position of every slot along its lane. Vehicles cannot pass
+    each other in a lane, so the order of the slots, and which vehicle of a
+    board sits in which slot, never changes.
+    """
+    red, others = board.vehicles[0], board.vehicles[1:]
+    vehicles = [red] + sorted(
+        others, key=lambda v: (v.length, v.orientation, _lane(v), _position(v))
+    )
+    signature = (
+        board.width,
+        board.height,
+        tuple((v.length, v.orientation, _lane(v)) for v in vehicles),
+    )
+    return signature, [v.id for v in vehicles], tuple(_position(v) for v in vehicles)
+
+
+class _Cluster:
+    """State space of one signature, with occupancy kept as bitmasks."""
+
+    def __init__(self, signature):
+        width, height, slots = signature
+        self.lengths = [length for length, _, _ in slots]
+        self.lane_sizes = []
+        # masks[i][p]: cells covered by slot i at position p
+        self.masks = []
+        for length, orientation, lane in slots:
+            horizontal = orientation == "H"
+            lane_size = width if horizontal else height
+            self.lane_sizes.append(lane_size)
+            masks = []
+            for position in range(lane_size - length + 1):
+                mask = 0
+                for offset in range(position, position + length):
+                    cell = lane * width + offset if horizontal else offset * width + lane
+                    mask |= 1 << cell
+                masks.append(mask)
+            self.masks.append(masks)
+        # the red car leaves through the right edge of its row
+        self.goal_position = width - self.lengths[0]
+
+    def is_goal(self, state) -> bool:
+        return state[0] == self.goal_position
+
+    def successors(self, state):
+        """Yield (slot, amount, cost, new state) for every legal move."""
+        masks = self.masks
+        occupied = 0
+        for i, position in enumerate(state):
+            occupied |= masks[i][position]
+
+        for i, position in enumerate(state):
+            slot_masks = masks[i]
+            free = occupied ^ slot_masks[position]
+            length = self.lengths[i]
+            for direction in (1, -1):
+                new_position = position + direction
+                while 0 <= new_position < len(slot_masks) and not slot_masks[new_position] & free:
+                    amount = new_position - position
+                    yield (
+                        i,
+                        amount,
+                        length * abs(amount),
+                        state[:i] + (new_position,) + state[i + 1:],
+                    )
+                    new_position += direction
+
+
+class DistanceTable:
+    """
+    Cheapest cost, fewest moves and next move to the goal of every state of
+    one cluster, so a hint for any board of the cluster is a lookup.
+
+    `build(boards)` explores every state reachable from the boards once,
+    then a multi-source Dijkstra from all goal states gives the cheapest
+    cost of every state and a multi-source BFS the fewest moves. Moves are
+    reversible at the same cost, so searching from the goals answers every
+    state at once.
+    """
+
+    def __init__(self, board: Board):
+        self.signature = cluster_layout(board)[0]
+        self.cluster = _Cluster(self.signature)
+        self.costs = {}
+        # state -> (next state, slot, amount) of a cheapest path, None for goals
+        self.next_hops = {}
+        self.moves = {}
+        # every state reachable from the boards, including those that cannot be solved
+        self.reachable = set()
+        self.states = 0
+
+    def build(self, boards: list):
+        """Fill the table for the states reachable from the boards (all of this cluster)."""
+        states, goals = self._explore([cluster_layout(board)[2] for board in boards])
+        self.reachable = states
+        self.states = len(states)
+        self._cheapest_to_goal(goals)
+        self._fewest_moves_to_goal(goals)
+        return self
+
+    def lookup(self, board: Board):
+        """
+        (cost, moves, next move) from the board to the goal, with the next
+        move in the board's labels (None if it is solved already). Returns
+        None if the board cannot be solved or is not in the table.
+        """
+        signature, ids, state = cluster_layout(board)
+        if signature != self.signature or state not in self.costs:
+            return None
+        hop = self.next_hops[state]
+        move = None if hop is None else Move(ids[hop[1]], hop[2])
+        return self.costs[state], self.moves[state], move
+
+    def solution(self, ids, state):
+        """A cheapest solution from a state, as Moves of the vehicles `ids` (slot order)."""
+        if state not in self.next_hops:
+            return None
+        path = []
+        hop = self.next_hops[state]
+        while hop is not None:
+            state, slot, amount = hop
+            path.append(Move(ids[slot], amount))
+            hop = self.next_hops[state]
+        return path
+
+    def _explore(self, starts):
+        """Every state reachable from the starts, and the goal states among them."""
+        cluster = self.cluster
+        states = set(starts)
+        goals = [state for state in states if cluster.is_goal(state)]
+        queue = deque(states)
+        while queue:
+            state = queue.popleft()
+            for _, _, _, new_state in cluster.successors(state):
+                if new_state not in states:
+                    states.add(new_state)
+                    queue.append(new_state)
+                    if cluster.is_goal(new_state):
+                        goals.append(new_state)
+        return states, goals
+
+    def _cheapest_to_goal(self, goals):
+        costs = self.costs
+        next_hops = self.next_hops
+        frontier = BucketQueue()
+        for goal in goals:
+            costs[goal] = 0
+            next_hops[goal] = None
+            frontier.push(0, goal, None)
+
+        while frontier:
+            cost, state, _ = frontier.pop()
+            for slot, amount, move_cost, previous in self.cluster.successors(state):
+                new_cost = cost + move_cost
+                if new_cost < costs.get(previous, float("inf")):
+                    costs[previous] = new_cost
+                    # moving back from `previous` undoes this move
+                    next_hops[previous] = (state, slot, -amount)
+                    frontier.push(new_cost, previous, None)
+
+    def _fewest_moves_to_goal(self, goals):
+        moves = self.moves
+        for goal in goals:
+            moves[goal] = 0
+        queue = deque(goals)
+        while queue:
+            state = queue.popleft()
+            for _, _, _, previous in self.cluster.successors(state):
+                if previous not in moves:
+                    moves[previous] = moves[state] + 1
+                    queue.append(previous)
+
+
+class ClusterSolver:
+    """
+    Solves many puzzles at once by sharing one state graph per cluster.
+
+    Boards are grouped by their cluster signature (see cluster_layout) and
+    one DistanceTable is built per group, from all of its boards. A puzzle
+    is then solved by following the next-hop pointers from its state.
+
+    `solve()` returns one result per board, in order, as a dict with
+    "solution" (a cheapest solution as Moves with the board's own labels, or
+    None), "min_cost" and "min_moves" (fewest moves of any solution, which
+    may be a different path).
+    """
+
+    def __init__(self, boards: list):
+        self.boards = boards
+        self.results = []
+        self.clusters = 0
+        self.states_explored = 0
+        self.search_time = 0
+
+    def solve(self):
+        start_time = time.perf_counter()
+
+        # signature -> indices of the boards in that cluster
+        groups = {}
+        layouts = [cluster_layout(board) for board in self.boards]
+        for index, (signature, _, _) in enumerate(layouts):
+            groups.setdefault(signature, []).append(index)
+
+        results = [None] * len(self.boards)
+        for indices in groups.values():
+            table = DistanceTable(self.boards[indices[0]])
+            table.build([self.boards[i] for i in indices])
+            self.states_explored += table.states
+
+            for i in indices:
+                _, ids, state = layouts[i]
+                results[i] = {
+                    "solution": table.solution(ids, state),
+                    "min_cost": table.costs.get(state),
+                    "min_moves": table.moves.get(state),
+                }
+
+        self.clusters = len(groups)
+        self.results = results
+        self.search_time = time.perf_counter() - start_time
+        return results
+
+    def get_stats(self):
+        return {
+            "puzzles": len(self.boards),
+            "clusters": self.clusters,
+            "states_explored": self.states_explored,
+            "search_time": self.search_time,
+        }
+
+
+def solve_batch(boards: list):
+    """Solve a list of boards with one ClusterSolver, see ClusterSolver.solve."""
+    return ClusterSolver(boards).solve()
@@ -0,0 +1,223 @@
+from board import Board
+
+INF = float("inf")
+
+
+class BitboardHeuristics:
+    """
+    Admissible heuristics for the length-weighted cost model, on a packed
+    occupancy bitmask.
+
+    A move of a vehicle of length L by k cells costs L * k, so the cost of a
+    solution is the sum over the vehicles of L times the distance each one
+    travels. Every heuristic here is a sum of L * d over vehicles, where d is
+    a distance the vehicle must travel in every solution, so none of them
+    overestimates.
+
+    - blockers: the red car's distance to the exit, plus one cell for every
+      vehicle on its path.
+    - dependency: distances derived from the blocker dependency graph, in
+      both orientations. The red car must sweep its path, so every vehicle
+      on it must leave the red car's row, by the shortest shift to either
+      side. A vehicle that can only leave to one side must sweep the cells on
+      the way, which the vehicles there must leave in turn, and so on. A
+      vehicle can never pass one in its own lane, and a cell nothing can
+      leave makes the board unsolvable (inf).
+    - max: the maximum of the above and of the dependency bound extended by
+      one vehicle that can leave to either side: it goes one way or the
+      other, and whichever it takes, the vehicles on that side must make
+      room for it.
+
+    The per-puzzle tables (cell masks of every vehicle position, vehicles
+    per cell) are computed once; a call only reads the vehicle positions and
+    ORs their masks into the occupancy bitmask, no grid is built.
+    """
+
+    def __init__(self, board: Board):
+        width = board.width
+        self.width = width
+        self.horizontal = [v.orientation == "H" for v in board.vehicles]
+        self.lengths = [v.length for v in board.vehicles]
+        self.lanes = [v.y if v.orientation == "H" else v.x for v in board.vehicles]
+        self.lane_sizes = [width if h else board.height for h in self.horizontal]
+
+        # cells[i][c]: cell index of coordinate c along vehicle i's lane
+        # masks[i][p]: cells covered by vehicle i at position p
+        # cell_vehicles[cell]: vehicles whose lane goes through the cell
+        self.cells = []
+        self.masks = []
+        self.cell_vehicles = [[] for _ in range(width * board.height)]
+        for i, horizontal in enumerate(self.horizontal):
+            lane = self.lanes[i]
+            cells = [
+                lane * width + c if horizontal else c * width + lane
+                for c in range(self.lane_sizes[i])
+            ]
+            self.cells.append(cells)
+            for cell in cells:
+                self.cell_vehicles[cell].append(i)
+            masks = []
+            for p in range(self.lane_sizes[i] - self.lengths[i] + 1):
+                mask = 0
+                for c in range(p, p + self.lengths[i]):
+                    mask |= 1 << cells[c]
+                masks.append(mask)
+            self.masks.append(masks)
+
+        # the red car leaves through the right edge of its row
+        self.goal = width - self.lengths[0]
+
+    def occupancy(self, board: Board):
+        """(position of every vehicle along its lane, bitmask of the occupied cells)."""
+        positions = [v.x if h else v.y for v, h in zip(board.vehicles, self.horizontal)]
+        occupied = 0
+        for masks, p in zip(self.masks, positions):
+            occupied |= masks[p]
+        return positions, occupied
+
+    def _owner(self, cell: int, positions) -> int:
+        for j in self.cell_vehicles[cell]:
+            if self.masks[j][positions[j]] >> cell & 1:
+                return j
+        return -1
+
+    def _coordinate(self, j: int, cell: int) -> int:
+        return cell % self.width if self.horizontal[j] else cell // self.width
+
+    def _vacate(self, j: int, cell: int, positions, pusher: int, direction: int):
+        """
+        Shortest shifts (down, up) that take vehicle j off the cell, None
+        where it cannot go. `pusher` is moving into the cell in `direction`;
+        if it shares j's lane, j can only give way in that direction.
+        """
+        length = self.lengths[j]
+        coordinate = self._coordinate(j, cell)
+        down = positions[j] - (coordinate - length) if coordinate >= length else None
+        up = coordinate + 1 - positions[j] if coordinate + 1 <= self.lane_sizes[j] - length else None
+        if self.horizontal[j] == self.horizontal[pusher] and self.lanes[j] == self.lanes[pusher]:
+            if direction > 0:
+                down = None
+            else:
+                up = None
+        return down, up
+
+    def _sweep(self, i: int, direction: int, start: int, end: int, positions):
+        """Cells vehicle i enters moving from start to end cells away from its position."""
+        cells = self.cells[i]
+        for step in range(start + 1, end + 1):
+            p = positions[i] + direction * step
+            yield cells[p + self.lengths[i] - 1] if direction > 0 else cells[p]
+
+    def _forced_distances(self, positions, occupied):
+        """
+        Distance every vehicle must travel, and the vehicles that must leave a
+        cell and can go either way as (vehicle, shift down, shift up, cell).
+        None if some cell can never be left.
+        """
+        n = len(positions)
+        distances = [0] * n
+        # farthest the vehicle must go down (0) and up (1) from its position
+        reach = [[0, 0] for _ in range(n)]
+        either_way = []
+        work = [(0, 1, self.goal - positions[0])]
+        while work:
+            i, direction, distance = work.pop()
+            side = direction > 0
+            done = reach[i][side]
+            if distance <= done:
+                continue
+            reach[i][side] = distance
+            for cell in self._sweep(i, direction, done, distance, positions):
+                if not occupied >> cell & 1:
+                    continue
+                j = self._owner(cell, positions)
+                down, up = self._vacate(j, cell, positions, i, direction)
+                if down is None and up is None:
+                    return None
+                if down is None:
+                    work.append((j, 1, up))
+                elif up is None:
+                    work.append((j, -1, down))
+                else:
+                    distances[j] = max(distances[j], min(down, up))
+                    either_way.append((j, down, up, cell))
+
+        for i, (down, up) in enumerate(reach):
+            # going both ways, the shorter side is travelled twice
+            distances[i] = max(distances[i], down + up + min(down, up))
+        return distances, either_way
+
+    def blockers(self, board: Board):
+        positions, occupied = self.occupancy(board)
+        red = positions[0]
+        if red == self.goal:
+            return 0
+        total = self.lengths[0] * (self.goal - red)
+        counted = set()
+        for cell in self._sweep(0, 1, 0, self.goal - red, positions):
+            if occupied >> cell & 1:
+                j = self._owner(cell, positions)
+                if self.lanes[j] == self.lanes[0] and self.horizontal[j]:
+                    # a vehicle ahead in the red car's row can never get out of its way
+                    return INF
+                if j not in counted:
+                    counted.add(j)
+                    total += self.lengths[j]
+        return total
+
+    def dependency(self, board: Board):
+        positions, occupied = self.occupancy(board)
+        if positions[0] == self.goal:
+            return 0
+        forced = self._forced_distances(positions, occupied)
+        if forced is None:
+            return INF
+        return sum(length * d for length, d in zip(self.lengths, forced[0]))
+
+    def _option_cost(self, j, direction, shift, positions, occupied, distances):
+        """Cost above `distances` of vehicle j shifting `shift` cells in `direction`."""
+        extra = self.lengths[j] * max(0, shift - distances[j])
+        needed = {}
+        for cell in self._sweep(j, direction, 0, shift, positions):
+            if not occupied >> cell & 1:
+                continue
+            k = self._owner(cell, positions)
+            down, up = self._vacate(k, cell, positions, j, direction)
+            if down is None and up is None:
+                return INF
+            shortest = min(s for s in (down, up) if s is not None)
+            needed[k] = max(needed.get(k, 0), shortest)
+        for k, shift_k in needed.items():
+            if k != j:
+                extra += self.lengths[k] * max(0, shift_k - distances[k])
+        return extra
+
+    def maximum(self, board: Board):
+        positions, occupied = self.occupancy(board)
+        if positions[0] == self.goal:
+            return 0
+        forced = self._forced_distances(positions, occupied)
+        if forced is None:
+            return INF
+        distances, either_way = forced
+        bound = sum(length * d for length, d in zip(self.lengths, distances))
+
+        best_extra = 0
+        for j, down, up, _ in either_way:
+            extra = min(
+                self._option_cost(j, -1, down, positions, occupied, distances),
+                self._option_cost(j, 1, up, positions, occupied, distances),
+            )
+            best_extra = max(best_extra, extra)
+        return max(self.blockers(board), bound + best_extra)
+
+
+# heuristic names accepted by AStarSolver, "legacy" is AStarSolver._heuristic
+HEURISTICS = {
+    "legacy": None,
+    "blockers": BitboardHeuristics.blockers,
+    "dependency": BitboardHeuristics.dependency,
+    "max": BitboardHeuristics.maximum,
+}
+# heuristics that never overestimate; legacy returns inf on solvable boards
+ADMISSIBLE_HEURISTICS = frozenset({"blockers", "dependency", "max"})
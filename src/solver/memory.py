@@ -0,0 +1,130 @@
+import sys
+from itertools import islice
+
+# entries measured per structure and sample, the rest are assumed to be alike
+SAMPLED_ENTRIES = 8
+
+
+class MemoryAccounting:
+    """
+    Peak entry count and estimated size of every data structure of a search.
+
+    A search registers its structures with `track` (frontier, visited set,
+    parent table, stored paths, ...) and calls `sample` every few expansions
+    and once at the end. Each sample measures every structure and keeps the
+    peaks, and the peak of their total.
+
+    Sizes are estimates: the container itself is measured with
+    sys.getsizeof, its entries by measuring a few of them and scaling to all.
+    Objects shared by many entries (unmoved vehicles, interned moves, the
+    per-puzzle tables of Board) are not counted, see board_size.
+    """
+
+    def __init__(self, enabled: bool = False, interval: int = 1000):
+        self.enabled = enabled
+        self.interval = interval
+        self.samples = 0
+        self._measures = {}
+        self._peaks = {}
+        self._peak_total = 0
+
+    def track(self, name: str, measure):
+        """
+        Register a structure, `measure()` returns its (entries, bytes).
+        Tracking a name again replaces the structure (e.g. a rebuilt queue),
+        its peak is kept.
+        """
+        if self.enabled:
+            self._measures[name] = measure
+
+    def sample(self):
+        if not self.enabled:
+            return
+        self.samples += 1
+        total = 0
+        for name, measure in self._measures.items():
+            entries, size = measure()
+            total += size
+            peak_entries, peak_bytes = self._peaks.get(name, (0, 0))
+            self._peaks[name] = (max(peak_entries, entries), max(peak_bytes, size))
+        self._peak_total = max(self._peak_total, total)
+
+    def report(self) -> dict:
+        """Peak entries and KB of every structure, and the peak of their sum."""
+        structures = {
+            name: {"peak_entries": entries, "peak_kb": size / 1024}
+            for name, (entries, size) in self._peaks.items()
+        }
+        return {
+            "structures": structures,
+            "peak_total_kb": self._peak_total / 1024,
+            "samples": self.samples,
+        }
+
+
+def sample_entries(container):
+    """A few entries of a container, from both ends of a sequence."""
+    if hasattr(container, "__reversed__") and len(container) > SAMPLED_ENTRIES:
+        half = SAMPLED_ENTRIES // 2
+        return list(islice(container, half)) + list(islice(reversed(container), half))
+    return list(islice(container, SAMPLED_ENTRIES))
+
+
+def entries_size(count: int, sample, entry_size) -> int:
+    """Estimated size of `count` entries like the ones in `sample`."""
+    if not count or not sample:
+        return 0
+    return count * sum(map(entry_size, sample)) // len(sample)
+
+
+def estimate(container, entry_size, items=None):
+    """
+    (entries, bytes) of a container: its own size plus its entries, measured
+    with entry_size on a sample. `items` replaces the iterated entries, e.g.
+    dict.items() to measure keys and values together.
+    """
+    count = len(container)
+    sample = sample_entries(container if items is None else items)
+    return count, sys.getsizeof(container) + entries_size(count, sample, entry_size)
+
+
+def board_size(board) -> int:
+    """
+    Size of a board derived by apply_move: the board, its vehicle list and
+    the vehicle that was moved. The other vehicles are shared with the board
+    it came from.
+    """
+    return sys.getsizeof(board) + sys.getsizeof(board.vehicles) + sys.getsizeof(board.vehicles[0])
+
+
+def parent_entry_size(item) -> int:
+    """
+    Size of a `state key -> (parent key, move)` entry. The parent key is the
+    key of another entry and moves are interned, so neither is counted.
+    """
+    key, value = item
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+def value_entry_size(item) -> int:
+    """Size of a `state key -> number or tuple of numbers` entry."""
+    key, value = item
+    size = sys.getsizeof(key) + sys.getsizeof(value)
+    if isinstance(value, tuple):
+        size += sum(map(sys.getsizeof, value))
+    return size
+
+
+def board_entry_size(entry) -> int:
+    """Size of a `(board, path, ...)` frontier entry without its path."""
+    return sys.getsizeof(entry) + board_size(entry[0])
+
+
+def estimate_paths(container, index: int = 1):
+    """
+    (paths, bytes) of the paths stored in the entries of a frontier, at
+    entry[index]. Paths are lists of interned moves, so only the lists count.
+    """
+    count = len(container)
+    sample = [entry[index] for entry in sample_entries(container)]
+    return count, entries_size(count, sample, sys.getsizeof)
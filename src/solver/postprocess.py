@@ -0,0 +1,174 @@
+from collections import deque
+
+from board import Board
+from move import Move
+
+
+class SolutionOptimizer:
+    """
+    Post-processing pass that shortens a valid solution of a puzzle.
+
+    The solution is replayed on compact states (the position of every vehicle
+    along its lane, in the order of board.vehicles) and three rewrites are
+    repeated until none of them applies anymore:
+
+    - cycles through a repeated state are cut out,
+    - consecutive moves of the same vehicle are merged into one move,
+    - a part of the path is replaced by a shorter one found by a BFS of at
+      most shortcut_depth moves from one of its states.
+
+    A rewrite never makes the solution longer or more expensive, so the
+    result of an optimal solver is left as it is.
+    """
+
+    def __init__(self, board: Board, shortcut_depth: int = 2):
+        self.board = board
+        self.shortcut_depth = shortcut_depth
+        self.ids = [v.id for v in board.vehicles]
+        self.lengths = [v.length for v in board.vehicles]
+        self.horizontal = [v.orientation == "H" for v in board.vehicles]
+        self.lanes = [v.y if v.orientation == "H" else v.x for v in board.vehicles]
+        self.index = {v.id: i for i, v in enumerate(board.vehicles)}
+        self.start = tuple(v.x if v.orientation == "H" else v.y for v in board.vehicles)
+
+    def optimize(self, moves: list) -> list:
+        """Return an equivalent solution with no more moves and no higher cost."""
+        # moves are handled as (vehicle index, amount) pairs
+        steps = [(self.index[move.vehicle_id], move.amount) for move in moves]
+        while True:
+            shorter = self._shortcut(self._merge(self._cut_cycles(steps)))
+            if shorter == steps:
+                break
+            steps = shorter
+        return [Move(self.ids[i], amount) for i, amount in steps]
+
+    def cost(self, steps) -> int:
+        return sum(self.lengths[i] * abs(amount) for i, amount in steps)
+
+    def _states(self, steps):
+        state = self.start
+        states = [state]
+        for i, amount in steps:
+            state = state[:i] + (state[i] + amount,) + state[i + 1:]
+            states.append(state)
+        return states
+
+    def _cut_cycles(self, steps):
+        # the path only keeps the first visit of every state
+        result = []
+        first_visit = {self.start: 0}
+        state = self.start
+        for i, amount in steps:
+            state = state[:i] + (state[i] + amount,) + state[i + 1:]
+            if state in first_visit:
+                # back to an earlier state, everything in between is a cycle
+                index = first_visit[state]
+                for removed in self._states(result)[index + 1:]:
+                    del first_visit[removed]
+                del result[index:]
+                first_visit[state] = index
+            else:
+                result.append((i, amount))
+                first_visit[state] = len(result)
+        return result
+
+    def _merge(self, steps):
+        # a vehicle moved twice in a row only sweeps cells it already swept
+        result = []
+        for i, amount in steps:
+            if result and result[-1][0] == i:
+                amount += result.pop()[1]
+                if amount == 0:
+                    continue
+            result.append((i, amount))
+        return result
+
+    def _shortcut(self, steps):
+        states = self._states(steps)
+        last_index = {state: index for index, state in enumerate(states)}
+        result = []
+        index = 0
+        while index < len(steps):
+            replacement = self._find_shortcut(states, steps, last_index, index)
+            if replacement is None:
+                result.append(steps[index])
+                index += 1
+            else:
+                target, path = replacement
+                result.extend(path)
+                index = target
+        return result
+
+    def _find_shortcut(self, states, steps, last_index, index):
+        """
+        BFS from states[index] and return (target, path) for the furthest
+        later state of the solution that is reached by a strictly better path.
+        """
+        parents = {states[index]: None}
+        frontier = [states[index]]
+        candidates = []
+        for depth in range(1, self.shortcut_depth + 1):
+            next_frontier = []
+            for state in frontier:
+                for step, new_state in self._successors(state):
+                    if new_state in parents:
+                        continue
+                    parents[new_state] = (state, step)
+                    next_frontier.append(new_state)
+                    target = last_index.get(new_state, -1)
+                    if target - index > depth:
+                        candidates.append((target, new_state))
+            frontier = next_frontier
+
+        # furthest target first, a shortcut must not cost more than the original
+        for target, state in sorted(candidates, reverse=True):
+            path = deque()
+            while parents[state] is not None:
+                state, step = parents[state]
+                path.appendleft(step)
+            if self.cost(path) <= self.cost(steps[index:target]):
+                return target, list(path)
+        return None
+
+    def _cell(self, i, offset):
+        if self.horizontal[i]:
+            return (offset, self.lanes[i])
+        return (self.lanes[i], offset)
+
+    def _successors(self, state):
+        occupied = set()
+        for i, position in enumerate(state):
+            for offset in range(position, position + self.lengths[i]):
+                occupied.add(self._cell(i, offset))
+
+        for i, position in enumerate(state):
+            lane_size = self.board.width if self.horizontal[i] else self.board.height
+            for direction in (1, -1):
+                # the cell entered by the front (or back) of the vehicle
+                edge = position + self.lengths[i] - 1 if direction > 0 else position
+                amount = direction
+                while True:
+                    offset = edge + amount
+                    if offset < 0 or offset >= lane_size:
+                        break
+                    if self._cell(i, offset) in occupied:
+                        break
+                    yield (i, amount), state[:i] + (position + amount,) + state[i + 1:]
+                    amount += direction
+
+
+def optimize_solution(board: Board, moves: list, shortcut_depth: int = 2):
+    """
+    Shorten a solution of the board and return (moves, report), where the
+    report compares the length and cost before and after.
+    """
+    optimizer = SolutionOptimizer(board, shortcut_depth)
+    optimized = optimizer.optimize(moves)
+    index = optimizer.index
+    report = {
+        "original_moves": len(moves),
+        "original_cost": optimizer.cost((index[m.vehicle_id], m.amount) for m in moves),
+        "optimized_moves": len(optimized),
+        "optimized_cost": optimizer.cost((index[m.vehicle_id], m.amount) for m in optimized),
+    }
+    return optimized, report
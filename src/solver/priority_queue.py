@@ -0,0 +1,179 @@
+import heapq
+import sys
+
+from .memory import entries_size, sample_entries
+
+
+class BucketQueue:
+    """
+    Priority queue for small non-negative integer priorities.
+
+    Keys are kept in one bucket per priority and the lowest non-empty bucket
+    is found by moving a cursor, so push and pop are O(1) amortized. Inside a
+    bucket the keys are grouped by `tie` (the g cost) and the highest tie is
+    popped first, which favours the deepest node of an f layer; keys with the
+    same priority and tie are popped LIFO. Every key has at most one entry:
+    pushing a key again moves it to its new bucket instead of leaving a stale
+    duplicate behind.
+
+    Infinite priorities (states the heuristic could not bound) are only popped
+    once every finite bucket is empty. They are kept in a nested queue ordered
+    by `tie`, cheapest first like the heap does.
+    """
+
+    def __init__(self):
+        # priority -> {tie: {key: None}}, the inner dicts are ordered sets
+        self._buckets = []
+        self._entries = {}  # key -> (priority, tie, item)
+        self._cursor = 0
+        self._unbounded = None  # created on the first infinite priority
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __bool__(self):
+        return bool(self._entries)
+
+    def push(self, priority, key, item, tie=0):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._remove(key, entry)
+
+        self._entries[key] = (priority, tie, item)
+        if priority == float("inf"):
+            if self._unbounded is None:
+                self._unbounded = BucketQueue()
+            # cheapest first: the nested queue pops its lowest priority
+            self._unbounded.push(tie, key, item)
+            return
+
+        while len(self._buckets) <= priority:
+            self._buckets.append({})
+        if priority < self._cursor:
+            self._cursor = priority
+
+        bucket = self._buckets[priority]
+        keys = bucket.get(tie)
+        if keys is None:
+            keys = bucket[tie] = {}
+        keys[key] = None
+
+    def pop(self):
+        """Remove and return (priority, key, item) with the lowest priority."""
+        key = self._min_key()
+        priority, tie, item = self._entries.pop(key)
+        if priority == float("inf"):
+            self._unbounded.pop()
+        else:
+            bucket = self._buckets[priority]
+            keys = bucket[tie]
+            keys.popitem()
+            if not keys:
+                del bucket[tie]
+        return priority, key, item
+
+    def peek(self):
+        """Return (priority, key, item) with the lowest priority without removing it."""
+        key = self._min_key()
+        priority, _, item = self._entries[key]
+        return priority, key, item
+
+    def estimate_size(self, item_size):
+        """(entries, estimated bytes) of the queue, items measured with item_size."""
+        entries = self._entries
+        size = sys.getsizeof(self) + sys.getsizeof(self._buckets) + sys.getsizeof(entries)
+        for bucket in self._buckets:
+            size += sys.getsizeof(bucket) + sum(map(sys.getsizeof, bucket.values()))
+        size += entries_size(
+            len(entries),
+            sample_entries(entries.items()),
+            lambda item: sys.getsizeof(item[0]) + sys.getsizeof(item[1]) + item_size(item[1][2]),
+        )
+        if self._unbounded is not None:
+            # the nested queue holds the same items again, only count its structure
+            size += self._unbounded.estimate_size(lambda item: 0)[1]
+        return len(entries), size
+
+    def _min_key(self):
+        buckets = self._buckets
+        while self._cursor < len(buckets) and not buckets[self._cursor]:
+            self._cursor += 1
+        if self._cursor < len(buckets):
+            # a bucket holds a few distinct g values at most
+            keys = buckets[self._cursor][max(buckets[self._cursor])]
+            return next(reversed(keys))
+        return self._unbounded.peek()[1]
+
+    def _remove(self, key, entry):
+        priority, tie, _ = entry
+        del self._entries[key]
+        if priority == float("inf"):
+            self._unbounded._remove(key, self._unbounded._entries[key])
+            return
+        bucket = self._buckets[priority]
+        keys = bucket[tie]
+        del keys[key]
+        if not keys:
+            del bucket[tie]
+
+
+class HeapQueue:
+    """
+    Binary heap with the same interface as BucketQueue, kept for comparison.
+
+    Entries are ordered by (priority, tie) and then FIFO. Pushing a key again
+    leaves the old entry in the heap, it is skipped when popped.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._entries = {}  # key -> counter of its live heap entry
+        self._counter = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __bool__(self):
+        return bool(self._entries)
+
+    def push(self, priority, key, item, tie=0):
+        self._counter += 1
+        self._entries[key] = self._counter
+        heapq.heappush(self._heap, (priority, tie, self._counter, key, item))
+
+    def pop(self):
+        """Remove and return (priority, key, item) with the lowest priority."""
+        self._drop_stale()
+        priority, _, _, key, item = heapq.heappop(self._heap)
+        del self._entries[key]
+        return priority, key, item
+
+    def peek(self):
+        """Return (priority, key, item) with the lowest priority without removing it."""
+        self._drop_stale()
+        priority, _, _, key, item = self._heap[0]
+        return priority, key, item
+
+    def estimate_size(self, item_size):
+        """
+        (entries, estimated bytes) of the queue, items measured with item_size.
+        Stale heap entries are counted in the bytes, not in the entries.
+        """
+        heap = self._heap
+        size = sys.getsizeof(self) + sys.getsizeof(heap) + sys.getsizeof(self._entries)
+        size += entries_size(
+            len(heap),
+            sample_entries(heap),
+            lambda entry: sys.getsizeof(entry) + sys.getsizeof(entry[3]) + item_size(entry[4]),
+        )
+        # every live key also has its counter in _entries
+        size += len(self._entries) * 2 * sys.getsizeof(self._counter)
+        return len(self._entries), size
+
+    def _drop_stale(self):
+        heap = self._heap
+        while self._entries.get(heap[0][3]) != heap[0][2]:
+            heapq.heappop(heap)
+
+
+QUEUES = {"bucket": BucketQueue, "heap": HeapQueue}
@@ -0,0 +1,139 @@
+from collections import defaultdict
+
+from board import Board
+
+
+class DeadStatePruner:
+    """
+    Static dead-state detection, precomputed once per puzzle.
+
+    Vehicles never leave their lane (row for 'H', column for 'V') and can
+    never pass another vehicle of the same lane, so every vehicle is confined
+    to an interval of its lane. A cell covered at every position of that
+    interval is occupied forever, which in turn narrows the intervals of the
+    vehicles crossing it. This is iterated to a fixed point.
+
+    A position of a vehicle is dead if, from there, the vehicle can never
+    reach a position compatible with the goal (the red car at the exit, every
+    other vehicle off the red car's final cells). A board with any vehicle on
+    a dead position can never be solved, e.g. a blocker permanently locked in
+    the exit row.
+
+    The solvers only check their start board (Solver._start_is_dead): moves
+    are reversible, so the boards reachable from a live start are all live.
+    """
+
+    def __init__(self, board: Board):
+        self.width = board.width
+        self.height = board.height
+        vehicles = board.vehicles
+
+        self.lengths = [v.length for v in vehicles]
+        self.orientations = [v.orientation for v in vehicles]
+        # fixed coordinate of the lane and position along it
+        self.lanes = [v.y if v.orientation == "H" else v.x for v in vehicles]
+        positions = [self._position(v) for v in vehicles]
+
+        # Step 1: vehicles of a lane keep their order, which bounds each of them
+        lane_members = defaultdict(list)
+        for i, vehicle in enumerate(vehicles):
+            lane_members[(vehicle.orientation, self.lanes[i])].append(i)
+
+        self.bounds = [None] * len(vehicles)
+        for (orientation, _), members in lane_members.items():
+            lane_size = self.width if orientation == "H" else self.height
+            members.sort(key=lambda i: positions[i])
+            before = 0
+            after = sum(self.lengths[i] for i in members)
+            for i in members:
+                after -= self.lengths[i]
+                self.bounds[i] = (before, lane_size - self.lengths[i] - after)
+                before += self.lengths[i]
+
+        # Step 2: fixed point of permanently occupied cells and reachable intervals
+        self.permanent = {}  # cell -> index of the vehicle that always covers it
+        runs = list(self.bounds)
+        changed = True
+        while changed:
+            changed = False
+            for i in range(len(vehicles)):
+                run = self._run(i, positions[i], runs[i])
+                if run != runs[i]:
+                    runs[i] = run
+                    changed = True
+                low, high = run
+                for offset in range(high, low + self.lengths[i]):
+                    cell = self._cell(i, offset)
+                    if cell not in self.permanent:
+                        self.permanent[cell] = i
+                        changed = True
+
+        # Step 3: cells the red car occupies once the puzzle is solved
+        red_length = self.lengths[0]
+        self.goal_cells = {
+            (x, self.lanes[0]) for x in range(self.width - red_length, self.width)
+        }
+
+        # Step 4: dead positions of every vehicle
+        self.dead_positions = {}
+        for i in range(len(vehicles)):
+            dead = set()
+            low, high = self.bounds[i]
+            for position in range(low, high + 1):
+                if not self._is_free(i, position):
+                    continue  # never reachable at all
+                run_low, run_high = self._run(i, position, self.bounds[i])
+                if not any(
+                    self._goal_compatible(i, p) for p in range(run_low, run_high + 1)
+                ):
+                    dead.add(position)
+            if dead:
+                self.dead_positions[i] = dead
+
+        # only vehicles that have dead positions need to be checked per state
+        self._checked = [
+            (i, self.orientations[i] == "H", dead)
+            for i, dead in self.dead_positions.items()
+        ]
+
+    def _position(self, vehicle):
+        return vehicle.x if vehicle.orientation == "H" else vehicle.y
+
+    def _cell(self, i, offset):
+        if self.orientations[i] == "H":
+            return (offset, self.lanes[i])
+        return (self.lanes[i], offset)
+
+    def _is_free(self, i, position):
+        # whether vehicle i at `position` overlaps no permanent cell of another vehicle
+        for offset in range(position, position + self.lengths[i]):
+            owner = self.permanent.get(self._cell(i, offset))
+            if owner is not None and owner != i:
+                return False
+        return True
+
+    def _run(self, i, position, bounds):
+        # maximal interval of free positions around `position` within `bounds`
+        low = high = position
+        while low - 1 >= bounds[0] and self._is_free(i, low - 1):
+            low -= 1
+        while high + 1 <= bounds[1] and self._is_free(i, high + 1):
+            high += 1
+        return (low, high)
+
+    def _goal_compatible(self, i, position):
+        if i == 0:
+            return position == self.width - self.lengths[0]
+        return not any(
+            self._cell(i, offset) in self.goal_cells
+            for offset in range(position, position + self.lengths[i])
+        )
+
+    def is_dead(self, board: Board) -> bool:
+        """Whether the board can provably never lead to a solution."""
+        vehicles = board.vehicles
+        for i, horizontal, dead in self._checked:
+            vehicle = vehicles[i]
+            if (vehicle.x if horizontal else vehicle.y) in dead:
+                return True
+        return False
@@ -0,0 +1,126 @@
+import json
+import struct
+import sys
+from array import array
+
+INF = float("inf")
+BINARY_MAGIC = b"RHTRACE1"
+# magic, records made, records kept, bytes per state key
+BINARY_HEADER = struct.Struct("<8sQQH")
+
+
+class TraceRecorder:
+    """
+    Records the expansion order of a search into a preallocated ring buffer.
+
+    Every expansion stores (state key, parent key, g, h, depth). Numbers go
+    into typed arrays and keys into preallocated lists, so a record is a few
+    item assignments and nothing is allocated during the search. Once the
+    buffer is full the oldest records are overwritten; `total` still counts
+    every expansion, so `index` in the export is the expansion number.
+
+    Set `solver.trace = TraceRecorder()` before `solver.solve()`, then call
+    `write_jsonl` or `write_binary`. Only the search run that measures time
+    is recorded. An h of -1 means the search has no (finite) heuristic value
+    for that state, it is exported as null.
+    """
+
+    def __init__(self, capacity: int = 1_000_000):
+        self.capacity = capacity
+        self.keys = [None] * capacity
+        self.parents = [None] * capacity
+        self.g = array("q", bytes(8 * capacity))
+        self.h = array("q", bytes(8 * capacity))
+        self.depth = array("q", bytes(8 * capacity))
+        self.total = 0
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def reset(self):
+        self.total = 0
+
+    def record(self, key, parent, g, h, depth):
+        i = self.total % self.capacity
+        self.keys[i] = key
+        self.parents[i] = parent
+        self.g[i] = g
+        self.h[i] = h if h != INF else -1
+        self.depth[i] = depth
+        self.total += 1
+
+    def records(self):
+        """Yield (index, key, parent, g, h, depth), oldest first."""
+        first = self.total - len(self)
+        for index in range(first, self.total):
+            i = index % self.capacity
+            yield index, self.keys[i], self.parents[i], self.g[i], self.h[i], self.depth[i]
+
+    def write_jsonl(self, path: str):
+        with open(path, "w") as f:
+            for index, key, parent, g, h, depth in self.records():
+                f.write(json.dumps({
+                    "index": index,
+                    "key": key,
+                    "parent": parent,
+                    "g": g,
+                    "h": None if h < 0 else h,
+                    "depth": depth,
+                }) + "\n")
+
+    def write_binary(self, path: str):
+        """
+        Column-wise binary file, see read_binary: the header, then the keys
+        and parent keys as unsigned little-endian integers of key_bytes
+        bytes, one byte per record telling whether it has a parent, and the
+        g, h and depth columns as little-endian int64.
+        """
+        rows = list(self.records())
+        keys = [row[1] for row in rows]
+        parents = [row[2] for row in rows]
+        widest = max((key.bit_length() for key in keys + parents if key is not None), default=0)
+        key_bytes = max(1, (widest + 7) // 8)
+
+        with open(path, "wb") as f:
+            f.write(BINARY_HEADER.pack(BINARY_MAGIC, self.total, len(rows), key_bytes))
+            for column in (keys, parents):
+                f.write(b"".join((key or 0).to_bytes(key_bytes, "little") for key in column))
+            f.write(bytes(parent is not None for parent in parents))
+            for position in (3, 4, 5):
+                values = array("q", (row[position] for row in rows))
+                if sys.byteorder == "big":
+                    values.byteswap()
+                f.write(values.tobytes())
+
+
+def read_binary(path: str):
+    """Read a file written by write_binary, as a list of records like TraceRecorder.records."""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, total, count, key_bytes = BINARY_HEADER.unpack_from(data)
+    if magic != BINARY_MAGIC:
+        raise ValueError(f"{path} is not a search trace")
+
+    offset = BINARY_HEADER.size
+    columns = []
+    for _ in range(2):
+        columns.append([
+            int.from_bytes(data[offset + i * key_bytes:offset + (i + 1) * key_bytes], "little")
+            for i in range(count)
+        ])
+        offset += count * key_bytes
+    has_parent = data[offset:offset + count]
+    offset += count
+    for _ in range(3):
+        values = array("q", data[offset:offset + 8 * count])
+        if sys.byteorder == "big":
+            values.byteswap()
+        columns.append(values)
+        offset += 8 * count
+
+    keys, parents, g, h, depth = columns
+    first = total - count
+    return [
+        (first + i, keys[i], parents[i] if has_parent[i] else None, g[i], h[i], depth[i])
+        for i in range(count)
+    ]
@@ -7,10 +7,15 @@ class SpriteSheet:
         self.spritesheet = pygame.image.load(filename).convert_alpha()
         with open(filename.replace('.png', '.json'), 'r') as f:
             self.data = json.load(f)
+        self._sprites = {}
 
     def parse_sprite(self, name):
+        # sprites are cut out of the sheet once and reused afterwards
+        if name in self._sprites:
+            return self._sprites[name]
         sprite_info = self.data['frames'][name]['frame']
         x, y, w, h = sprite_info['x'], sprite_info['y'], sprite_info['w'], sprite_info['h']
         image = pygame.Surface((w, h), pygame.SRCALPHA)
         image.blit(self.spritesheet, (0, 0), (x, y, w, h))
-        return image
\ No newline at end of file
+        self._sprites[name] = image
+        return image
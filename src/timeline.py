@@ -0,0 +1,57 @@
+from board import Board
+from vehicle import Vehicle
+
+
+class Timeline:
+    """
+    A solution materialized once as a list of compact states.
+
+    Each state only holds the (x, y) position of every vehicle, in the same
+    order as the vehicles of the start board, so any step of the solution can
+    be reached directly instead of replaying the moves from the start.
+    """
+
+    def __init__(self, board: Board, moves: list):
+        self.width = board.width
+        self.height = board.height
+        self.moves = moves
+        # (id, length, orientation) never change during a solution
+        self.vehicle_specs = [(v.id, v.length, v.orientation) for v in board.vehicles]
+
+        vehicle_index = {v.id: i for i, v in enumerate(board.vehicles)}
+        positions = [(v.x, v.y) for v in board.vehicles]
+        self.states = [tuple(positions)]
+
+        for move in moves:
+            i = vehicle_index[move.vehicle_id]
+            x, y = positions[i]
+            if self.vehicle_specs[i][2] == "H":
+                positions[i] = (x + move.amount, y)
+            else:
+                positions[i] = (x, y + move.amount)
+            self.states.append(tuple(positions))
+
+        # boards are only built for the steps that are actually displayed
+        self._boards = [None] * len(self.states)
+        self._boards[0] = board
+
+    def __len__(self):
+        return len(self.states)
+
+    @property
+    def last_step(self):
+        return len(self.states) - 1
+
+    def board_at(self, step: int) -> Board:
+        """Return the board after `step` moves of the solution."""
+        board = self._boards[step]
+        if board is None:
+            vehicles = [
+                Vehicle(vehicle_id, x, y, length, orientation)
+                for (vehicle_id, length, orientation), (x, y) in zip(
+                    self.vehicle_specs, self.states[step]
+                )
+            ]
+            board = Board(self.width, self.height, vehicles)
+            self._boards[step] = board
+        return board
@@ -1,4 +1,7 @@
 class Vehicle:
+    # boards share their unmoved vehicles, so a vehicle is never changed in place
+    __slots__ = ("id", "x", "y", "length", "orientation")
+
     def __init__(self, id, x, y, length, orientation):
         if not isinstance(id, str):
             raise TypeError("ID must be a string.")
@@ -20,5 +23,19 @@ class Vehicle:
             raise ValueError("Orientation must be 'H' or 'V'.")
         self.orientation = orientation
 
+    def moved(self, amount):
+        """Return a copy of the vehicle moved `amount` cells along its lane (not validated)."""
+        vehicle = Vehicle.__new__(Vehicle)
+        vehicle.id = self.id
+        vehicle.length = self.length
+        vehicle.orientation = self.orientation
+        if self.orientation == 'H':
+            vehicle.x = self.x + amount
+            vehicle.y = self.y
+        else:
+            vehicle.x = self.x
+            vehicle.y = self.y + amount
+        return vehicle
+
     def __repr__(self):
         return f"Vehicle({self.id}, x={self.x}, y={self.y}, len={self.length}, orient={self.orientation})"